@@ -0,0 +1,56 @@
+"""Throughput of the headless batch jobs (python -m pvcore) by worker count, on synthetic files.
+
+The parent only splits the input into record blocks and writes results; the
+serial share of a job is that time over the in-process run, and bounds the
+speedup any number of workers can give (Amdahl's law). Worker counts above
+the machine's cores measure pool overhead, not scaling.
+
+    python -m benchmarks.bench_batch --cases 200000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from pvcore import batch
+from pvcore.synthetic import icsr_cases, literature_records
+
+
+def _serial_seconds(path, chunksize, sep=","):
+    started = time.perf_counter()
+    for block in batch.read_blocks(path, chunksize, sep):
+        len(block.text)
+    return time.perf_counter() - started
+
+
+def run(n_cases, worker_counts):
+    print(f"{os.cpu_count()} CPUs")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases, articles = os.path.join(tmp, "cases.csv"), os.path.join(tmp, "articles.csv")
+        icsr_cases(n_cases).to_csv(cases, index=False)
+        literature_records(n_cases).to_csv(articles, index=False)
+        small, n_small = os.path.join(tmp, "pdf_cases.csv"), max(n_cases // 500, 64)
+        icsr_cases(n_small).to_csv(small, index=False)
+        jobs = [("validate", cases, n_cases, 50_000), ("screen", articles, n_cases, 50_000),
+                ("obligations", cases, n_cases, 50_000), ("pdf", small, n_small, 64)]
+        print(f"{'job':<12} {'workers':>7} {'rows/sec':>12} {'speedup':>8}  serial share")
+        for job, source, rows, chunksize in jobs:
+            baseline = None
+            for workers in worker_counts:
+                output = os.path.join(tmp, f"{job}.out")
+                started = time.perf_counter()
+                getattr(batch, job)(source, output, chunksize=chunksize, workers=workers)
+                elapsed = time.perf_counter() - started
+                rate = rows / elapsed
+                baseline = baseline or rate
+                serial = _serial_seconds(source, chunksize) / elapsed if workers == 1 else None
+                print(f"{job:<12} {workers:>7} {rate:12,.0f} {rate / baseline:7.2f}x  "
+                      + (f"{serial:.1%} (max speedup {1 / serial:.0f}x)" if serial else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    run(args.cases, args.workers)
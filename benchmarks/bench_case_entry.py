@@ -0,0 +1,117 @@
+"""Reruns and server CPU to enter and save one ICSR on the ICSR Processing page.
+
+Fills every tab through AppTest the way a user would. A widget outside a
+form reruns the script on each change, while a form reruns once when its
+Apply button is pressed. AppTest always reruns the whole script, so when
+the page has a case_entry fragment the same entry is repeated against
+the fragment alone, which is what a fragment rerun costs on a server.
+
+    python -m benchmarks.bench_case_entry --cases 5
+"""
+import argparse
+import logging
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_rerun import ROOT, share_script_cache
+
+ENTRY = [
+    ("selectbox", "Report Type", "Literature"),
+    ("text_input", "Country", "India"),
+    ("selectbox", "Seriousness", "Serious"),
+    ("text_input", "Reporter Name", "Dr. A. Rao"),
+    ("text_input", "Reporter Email", "a.rao@example.org"),
+    ("text_input", "Reporter Contact Number", "+91 98450 00000"),
+    ("text_input", "Reporter Qualification", "Physician"),
+    ("number_input", "Patient Age", 54),
+    ("selectbox", "Gender", "Female"),
+    ("number_input", "Weight (kg)", 68.0),
+    ("number_input", "Height (cm)", 162.0),
+    ("text_area", "Relevant Medical History", "Type 2 diabetes"),
+    ("selectbox", "Parent Case Status", "Closed"),
+    ("text_area", "Adverse Event - Verbatim", "Severe rash on both arms"),
+    ("text_area", "Adverse Event - MedDRA Code", "10037844"),
+    ("selectbox", "Outcome", "Recovering"),
+    ("text_input", "Drug Name", "Amoxicillin"),
+    ("text_input", "Dose", "500 mg TID"),
+    ("selectbox", "Route of Administration", "IV"),
+    ("text_area", "Indication / Reason for Use", "Sinusitis"),
+    ("selectbox", "Causality Assessment Method", "Naranjo"),
+    ("selectbox", "Assessment Result", "Probable"),
+    ("text_area", "Reporter Comments", "Resolved after withdrawal"),
+    ("selectbox", "Dechallenge", "Negative"),
+    ("selectbox", "Rechallenge", "Not Applicable"),
+    ("text_area", "Case Summary", "54-year-old woman developed a severe rash on day 3 of amoxicillin."),
+]
+FRAGMENT_SCRIPT = "from views.icsr import case_entry\ncase_entry()\n"
+
+
+def _widget(at, kind, label):
+    return next(w for w in at.get(kind) if w.label == label)
+
+
+def enter_case(at):
+    """Enter ENTRY and save the case; returns (reruns, CPU seconds)."""
+    reruns, cpu = 0, 0.0
+
+    def rerun():
+        nonlocal reruns, cpu
+        started = time.process_time()
+        at.run()
+        cpu += time.process_time() - started
+        reruns += 1
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    def submit(form_id):
+        next(b for b in at.button if b.form_id == form_id).click()
+        rerun()
+
+    pending = None
+    for kind, label, value in ENTRY:
+        widget = _widget(at, kind, label)
+        if pending and widget.form_id != pending:
+            submit(pending)
+            widget = _widget(at, kind, label)
+        widget.set_value(value)
+        pending = widget.form_id or None
+        if not pending:
+            rerun()
+    if pending:
+        submit(pending)
+    next(b for b in at.button if b.label == "Save Case").click()
+    rerun()
+    return reruns, cpu
+
+
+def measure(at, cases):
+    reruns = cpu = 0
+    for _ in range(cases):
+        case_reruns, case_cpu = enter_case(at)
+        reruns += case_reruns
+        cpu += case_cpu
+    return reruns / cases, cpu / cases * 1000
+
+
+def run(script, cases):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    share_script_cache()
+    page = AppTest.from_file(str(script), default_timeout=120).run()
+    page.sidebar.radio[0].set_value("ICSR Processing").run()
+    results = {"page": measure(page, cases)}
+    print(f"{'reruns scoped to':<20} {'reruns/case':>12} {'CPU/case':>12}")
+    print(f"{'whole page':<20} {results['page'][0]:12.0f} {results['page'][1]:9.0f} ms")
+    if any(w.form_id for w in page.get("text_input")):
+        fragment = AppTest.from_string(FRAGMENT_SCRIPT, default_timeout=120).run()
+        results["fragment"] = measure(fragment, cases)
+        print(f"{'case_entry fragment':<20} {results['fragment'][0]:12.0f} {results['fragment'][1]:9.0f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=ROOT / "PV.py")
+    parser.add_argument("--cases", type=int, default=5)
+    args = parser.parse_args()
+    run(args.script, args.cases)
@@ -0,0 +1,63 @@
+"""Case store bulk insert, lookup and filtered-listing latency.
+
+    python -m benchmarks.bench_case_store --cases 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from pvcore.case_store import CaseStore
+from pvcore.synthetic import COUNTRIES, DRUGS, icsr_cases
+
+
+def _ms(samples):
+    samples = np.asarray(samples) * 1000
+    return f"p50 {np.percentile(samples, 50):6.2f} ms  p95 {np.percentile(samples, 95):6.2f} ms"
+
+
+def run(n_cases, chunksize=100_000, probes=200):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaseStore(os.path.join(tmp, "cases.db"))
+        started = time.perf_counter()
+        for seed, start in enumerate(range(0, n_cases, chunksize)):
+            chunk = icsr_cases(min(chunksize, n_cases - start), seed=seed)
+            chunk["ae_meddra"] = (10_000_000 + np.arange(len(chunk)) % 5000).astype(str)
+            store.upsert_cases(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"bulk insert {n_cases:,} cases in {elapsed:.1f}s ({n_cases / elapsed:,.0f} cases/sec)")
+
+        rng = np.random.default_rng(1)
+        ids = [f"PV-{seed:02d}-{i:08d}" for seed, i in zip(rng.integers(0, max(n_cases // chunksize, 1), probes),
+                                                              rng.integers(0, min(chunksize, n_cases), probes))]
+        timings = []
+        for case_id in ids:
+            started = time.perf_counter()
+            store.get_case(case_id)
+            timings.append(time.perf_counter() - started)
+        print(f"lookup by case_id                        {_ms(timings)}")
+
+        queries = {
+            "newest 100": {},
+            "drug, newest 100": {"suspected_drug": DRUGS[3]},
+            "serious + country, newest 100": {"seriousness": "Serious", "country": COUNTRIES[2]},
+            "MedDRA code + date range": {"ae_meddra": "10001234", "received_from": "2024-06-01", "received_to": "2025-06-30"},
+            "drug + one month": {"suspected_drug": DRUGS[0], "received_from": "2025-01-01", "received_to": "2025-01-31"},
+        }
+        for label, filters in queries.items():
+            timings = []
+            for _ in range(probes // 4):
+                started = time.perf_counter()
+                store.list_cases(limit=100, **filters)
+                timings.append(time.perf_counter() - started)
+            print(f"{label:<40} {_ms(timings)}")
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.cases)
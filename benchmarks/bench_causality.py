@@ -0,0 +1,36 @@
+"""Batch causality pre-assessment (Naranjo and WHO-UMC) over a synthetic case backlog.
+
+    python -m benchmarks.bench_causality --cases 100000
+"""
+import argparse
+import time
+
+from pvcore.causality import assess, assess_case
+from pvcore.literature import ListednessIndex
+from pvcore.synthetic import icsr_cases
+
+
+def run(n_cases, sample):
+    cases = icsr_cases(n_cases)
+    cases["alternative_causes"] = cases.index.map(lambda i: ["Unknown", "Yes", "No"][i % 3])
+    listedness = ListednessIndex()
+    started = time.perf_counter()
+    assessed = assess(cases, listedness)
+    elapsed = time.perf_counter() - started
+    print(f"{n_cases:,} cases in {elapsed:.2f}s  {n_cases / elapsed:,.0f} cases/sec")
+    print(assessed["who_umc_category"].value_counts().to_string())
+
+    records = cases.head(sample).to_dict("records")
+    started = time.perf_counter()
+    for case in records:
+        assess_case(case, listedness)
+    per_case = (time.perf_counter() - started) / sample
+    print(f"one case at a time: {per_case * 1000:.2f} ms/case, {n_cases * per_case:.0f}s for the backlog")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+    run(args.cases, args.sample)
@@ -0,0 +1,77 @@
+"""Cold start of the app and first open of each sidebar page, in fresh interpreters.
+
+Every page gets its own subprocess: one AppTest run of the landing page
+(cold start, after Streamlit itself is imported), then the page is selected, which times the imports and
+one-time setup that page triggers. --importtime adds the slowest imports
+of the whole process, from `python -X importtime`.
+
+    python -m benchmarks.bench_cold_start --importtime
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_rerun import PAGES, ROOT
+
+# Runs in the subprocess; prints one JSON line
+PROBE = """
+import json, logging, sys, time
+from streamlit.testing.v1 import AppTest
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+harness = set(sys.modules)
+started, cpu_started = time.perf_counter(), time.process_time()
+at = AppTest.from_file({script!r}, default_timeout=300).run()
+startup = set(sys.modules)
+result = {{"start_ms": (time.perf_counter() - started) * 1000, "start_cpu_ms": (time.process_time() - cpu_started) * 1000}}
+opened, cpu_opened = time.perf_counter(), time.process_time()
+at.sidebar.radio[0].set_value({page!r}).run()
+assert not at.exception, at.exception
+result.update(open_ms=(time.perf_counter() - opened) * 1000, open_cpu_ms=(time.process_time() - cpu_opened) * 1000,
+              start_modules=sorted(startup - harness), page_modules=sorted(set(sys.modules) - startup))
+print(json.dumps(result))
+"""
+WATCHED = ["fpdf", "sqlite3", "xml.sax", "pvcore.pdf_report", "pvcore.signals", "pvcore.duplicates"]
+
+
+def _importtime(stderr, top):
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def cold_start(script, page, importtime=False):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", PROBE.format(script=str(script), page=page)]
+    env = dict(os.environ, PYTHONPATH=str(Path(script).resolve().parent))
+    done = subprocess.run(command, capture_output=True, text=True, env=env, check=True)
+    result = json.loads(done.stdout.strip().splitlines()[-1])
+    result["imports"] = _importtime(done.stderr, 5) if importtime else []
+    return result
+
+
+def run(script, pages=PAGES, importtime=False):
+    print(f"{'page':<38} {'cold start':>10} {'first open':>11} {'CPU':>8} {'modules':>8}  heavy imports")
+    results = {}
+    for page in pages:
+        result = results[page] = cold_start(script, page, importtime)
+        modules = result["start_modules"] + result["page_modules"]
+        heavy = [name for name in WATCHED if name in modules]
+        print(f"{page:<38} {result['start_ms']:7.0f} ms {result['open_ms']:8.0f} ms {result['open_cpu_ms']:5.0f} ms "
+              f"{len(result['start_modules']):4d}+{len(result['page_modules']):<3d}  {', '.join(heavy)}")
+        for cumulative, name in result["imports"]:
+            print(f"{'':<40}{cumulative / 1000:8.1f} ms {name.strip()}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", type=Path, default=ROOT / "PV.py")
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args()
+    run(args.script, importtime=args.importtime)
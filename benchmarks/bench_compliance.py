@@ -0,0 +1,54 @@
+"""Compliance clock and per-day due buckets over a synthetic open-case backlog.
+
+Dashboard totals for an "as of" date come from DueBuckets (sums over days);
+the comparison recomputes them from the clock table (a pass over every
+obligation), as a dashboard without pre-aggregation would on each rerun.
+
+    python -m benchmarks.bench_compliance --cases 500000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pvcore.compliance import DueBuckets, clock
+from pvcore.obligations import ObligationRules
+from pvcore.synthetic import icsr_cases
+
+
+def _per_rerun(func, repeats=20):
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def run(n_cases):
+    cases = pd.concat([icsr_cases(min(250_000, n_cases - start), seed=i)
+                       for i, start in enumerate(range(0, n_cases, 250_000))], ignore_index=True)
+    obligations = ObligationRules().evaluate(cases)
+    holidays = {"*": np.array(["2025-01-01", "2025-12-25", "2025-12-26"], dtype="datetime64[D]")}
+    started = time.perf_counter()
+    table = clock(obligations, today="2025-06-01", holidays=holidays)
+    clocked = time.perf_counter()
+    buckets = DueBuckets.build(table, obligations.authorities)
+    built = time.perf_counter()
+    print(f"{len(cases):,} open cases, {len(table):,} obligations: clock {clocked - started:.2f}s, "
+          f"buckets {(built - clocked) * 1000:.0f} ms ({buckets.counts.shape[1]:,} days)")
+
+    def from_table():
+        remaining = (table["due_date"].to_numpy().astype("datetime64[D]") - np.datetime64("2025-06-01")).astype(int)
+        status = np.select([remaining < 0, remaining <= 3], ["Overdue", "Due Soon"], "On Track")
+        return pd.crosstab(table["authority"], status)
+
+    print(f"totals as of a date: buckets {_per_rerun(lambda: buckets.totals('2025-06-01')):.2f} ms, "
+          f"from the clock table {_per_rerun(from_table):.1f} ms per rerun")
+    print(f"30-day chart: buckets {_per_rerun(lambda: buckets.per_day('2025-06-01', 30)):.2f} ms per rerun")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500_000)
+    args = parser.parse_args()
+    run(args.cases)
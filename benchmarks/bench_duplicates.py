@@ -0,0 +1,56 @@
+"""Duplicate detection: backlog clustering and per-case lookups on synthetic cases.
+
+A share of the cases is re-entered with reformatted drug and reporter text;
+the run reports time, candidate-set size and how many planted duplicates
+were found.
+
+    python -m benchmarks.bench_duplicates --cases 100000 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from pvcore.duplicates import DuplicateIndex, cluster_duplicates
+from pvcore.synthetic import icsr_cases
+
+
+def synthetic_backlog(n_cases, duplicate_share=0.02, seed=0):
+    cases = icsr_cases(n_cases, seed=seed)
+    cases["reporter_name"] = [f"Dr Reporter {i:07d}" for i in range(n_cases)]
+    copies = cases.sample(frac=duplicate_share, random_state=seed).copy()
+    copies["case_id"] = copies["case_id"] + "-FU"
+    copies["suspected_drug"] = copies["suspected_drug"].str.upper() + " TAB"
+    copies["reporter_name"] = copies["reporter_name"].str.replace("Dr ", "Doctor ")
+    return pd.concat([cases, copies], ignore_index=True), copies
+
+
+def run(n_cases, workers):
+    backlog, copies = synthetic_backlog(n_cases)
+    started = time.perf_counter()
+    clustered = cluster_duplicates(backlog, workers=workers)
+    elapsed = time.perf_counter() - started
+    grouped = clustered.loc[clustered["group_size"] > 1, "case_id"]
+    found = np.isin(copies["case_id"].str[:-3], grouped).mean()
+    print(f"clustered {len(backlog):,} cases in {elapsed:.2f}s ({len(backlog) / elapsed:,.0f} cases/sec), "
+          f"{found:.1%} of planted duplicates grouped")
+
+    index = DuplicateIndex()
+    index.add(backlog.drop(copies.index), workers=workers)
+    probe = copies.head(1000)
+    started = time.perf_counter()
+    for row in range(len(probe)):
+        index.query(probe.iloc[[row]])
+    elapsed = time.perf_counter() - started
+    candidates = np.mean([len(b) for b in index.buckets.values()])
+    print(f"single-case lookups: {elapsed / len(probe) * 1000:.2f} ms per case "
+          f"(mean bucket size {candidates:.1f} vs. {len(index):,} indexed cases)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.cases, args.workers)
@@ -0,0 +1,49 @@
+"""E2B(R3) export and streaming import throughput, with the process peak RSS.
+
+    python -m benchmarks.bench_e2b --cases 20000
+"""
+import argparse
+import os
+import tempfile
+import resource
+import time
+
+from pvcore.e2b import read_e2b, write_e2b
+from pvcore.pdf_report import cases_from_table
+from pvcore.synthetic import icsr_cases
+
+
+def _cases(n_cases, chunksize=5000):
+    # Generated lazily so the export side does not hold the whole batch either
+    for start in range(0, n_cases, chunksize):
+        yield from cases_from_table(icsr_cases(min(chunksize, n_cases - start), seed=start // chunksize))
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(n_cases):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "icsrs.xml")
+
+        print(f"baseline peak RSS {_peak_rss_mb():.0f} MB")
+        started = time.perf_counter()
+        with open(path, "wb") as f:
+            written = write_e2b(_cases(n_cases), f)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+        print(f"export {written:,} ICSRs ({size / 1e6:.0f} MB) in {elapsed:.2f}s  "
+              f"{written / elapsed:,.0f} ICSRs/sec  peak RSS {_peak_rss_mb():.0f} MB")
+
+        started = time.perf_counter()
+        read = sum(len(chunk) for chunk in read_e2b(path, chunksize=1000))
+        elapsed = time.perf_counter() - started
+        print(f"import {read:,} ICSRs in {elapsed:.2f}s  {read / elapsed:,.0f} ICSRs/sec  peak RSS {_peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.cases)
@@ -0,0 +1,45 @@
+"""FAERS quarterly extract ingestion throughput into the case store and warehouse, with the process peak RSS.
+
+    python -m benchmarks.bench_faers --cases 400000
+"""
+import argparse
+import os
+import resource
+import tempfile
+
+from pvcore.case_store import CaseStore
+from pvcore.faers import ingest
+from pvcore.parallel import process_pool
+from pvcore.synthetic import faers_extract
+from pvcore.warehouse import CaseWarehouse
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(n_cases, chunksize):
+    with tempfile.TemporaryDirectory() as tmp:
+        extract = os.path.join(tmp, "ASCII")
+        # Written in another process, so the peak RSS below is the ingestion's
+        with process_pool(1) as pool:
+            pool.submit(faers_extract, extract, n_cases).result()
+        size = sum(os.path.getsize(os.path.join(extract, name)) for name in os.listdir(extract))
+        print(f"extract of {n_cases:,} cases: {size / 1e6:.0f} MB; baseline peak RSS {_peak_rss_mb():.0f} MB")
+
+        for label, store, warehouse in [
+            ("parse and join only", None, None),
+            ("case store + warehouse", CaseStore(os.path.join(tmp, "cases.db")), CaseWarehouse(os.path.join(tmp, "wh"))),
+        ]:
+            summary = ingest(extract, store, warehouse, chunksize=chunksize)
+            print(f"{label:<24} {summary['rows']:,} rows in {summary['seconds']:.1f}s  "
+                  f"{summary['rows_per_sec']:,} rows/sec  {summary['cases']:,} cases  {summary['pairs']:,} pairs  "
+                  f"peak RSS {_peak_rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=400_000)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.cases, args.chunksize)
@@ -0,0 +1,31 @@
+"""Rows/sec of bulk literature screening on a synthetic article file.
+
+    python -m benchmarks.bench_literature --rows 1000000
+"""
+import argparse
+import io
+import time
+
+from pvcore.literature import ListednessIndex, screen_articles
+from pvcore.synthetic import literature_records
+
+
+def run(n_rows, chunksize):
+    source = io.StringIO(literature_records(n_rows).to_csv(index=False))
+    index = ListednessIndex()
+    started = time.perf_counter()
+    screened = flagged = 0
+    for chunk in screen_articles(source, index, chunksize=chunksize):
+        screened += len(chunk)
+        flagged += int((chunk["icsr"] == "Yes").sum())
+    elapsed = time.perf_counter() - started
+    print(f"{screened:,} articles in {elapsed:.2f}s  {screened / elapsed:,.0f} rows/sec  ({flagged:,} ICSRs)")
+    return screened / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args()
+    run(args.rows, args.chunksize)
@@ -0,0 +1,77 @@
+"""MedDRA index build, load, autocomplete latency and bulk recoding over synthetic MedDRA-shaped files.
+
+MedDRA itself is licensed, so pvcore.synthetic.meddra_files writes ASCII
+files with the real layout and release-sized term counts. Lookup latency
+is per query, for prefixes of LLT names and for names with one typo.
+
+    python -m benchmarks.bench_meddra --llts 80000 --queries 1000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from pvcore.meddra import LLT_COLUMNS, MeddraIndex, read_asc
+from pvcore.synthetic import meddra_files
+
+
+def _latency(func, queries):
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        func(query)
+        times.append(time.perf_counter() - started)
+    return np.percentile(times, [50, 95]) * 1000
+
+
+def _typo(name, rng):
+    position = rng.integers(len(name))
+    return name[:position] + name[position + 1:]
+
+
+def run(n_llt, n_queries, n_rows):
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        source, index_dir = os.path.join(tmp, "meddra"), os.path.join(tmp, "index")
+        meddra_files(source, n_llt=n_llt)
+        started = time.perf_counter()
+        MeddraIndex.build(source, index_dir)
+        built = time.perf_counter()
+        index = MeddraIndex.load(index_dir)
+        loaded = time.perf_counter()
+        size = sum(entry.stat().st_size for entry in os.scandir(index_dir))
+        print(f"{len(index):,} LLTs: build {built - started:.2f}s, mmap load {(loaded - built) * 1000:.1f} ms, "
+              f"{size / 1e6:.1f} MB on disk")
+
+        names = read_asc(os.path.join(source, "llt.asc"), LLT_COLUMNS)["llt_name"].to_numpy()
+        sample = [str(name) for name in rng.choice(names, n_queries)]
+        prefixes = [name[:rng.integers(3, 7)] for name in sample]
+        typos = [_typo(name, rng) for name in sample if len(name) > 4]
+        print(f"{'lookup':<24} {'p50':>9} {'p95':>9}")
+        for label, func, queries in [("prefix", index.prefix, prefixes),
+                                     ("autocomplete (prefix)", index.autocomplete, prefixes),
+                                     ("exact", index.code, sample),
+                                     ("typo (n-gram)", index.code, typos)]:
+            p50, p95 = _latency(func, queries)
+            print(f"{label:<24} {p50:6.3f} ms {p95:6.3f} ms")
+
+        # A case batch repeats a few thousand distinct verbatims, some misspelt
+        vocabulary = np.concatenate([rng.choice(names, 3000), typos[:500]])
+        verbatims = pd.Series(rng.choice(vocabulary, n_rows))
+        started = time.perf_counter()
+        coded = index.recode(verbatims)
+        elapsed = time.perf_counter() - started
+        print(f"bulk recode {n_rows:,} rows ({verbatims.nunique():,} distinct) {elapsed:.2f}s  "
+              f"{n_rows / elapsed:,.0f} rows/sec, {(coded['llt_code'] > 0).mean():.1%} coded")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llts", type=int, default=80_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.llts, args.queries, args.rows)
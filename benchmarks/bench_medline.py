@@ -0,0 +1,64 @@
+"""MEDLINE corpus indexing throughput and co-mention query latency, with the process peak RSS.
+
+    python -m benchmarks.bench_medline --articles 1000000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from pvcore.drugs import DrugNormalizer
+from pvcore.literature import ListednessIndex
+from pvcore.medline import LiteratureIndex, corpus_terms, medline_sources
+from pvcore.parallel import process_pool
+from pvcore.synthetic import DRUGS, EVENTS, medline_files
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed(label, query, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = len(query())
+    print(f"{label:<52} {(time.perf_counter() - started) / repeat * 1000:8.2f} ms  {rows:>8,} rows")
+
+
+def run(n_articles, files):
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "medline")
+        # Written in another process, so the peak RSS below is the indexing's
+        with process_pool(1) as pool:
+            pool.submit(medline_files, source, n_articles, files).result()
+        size = sum(os.path.getsize(path) for path in medline_sources(source))
+        print(f"{files} files of {n_articles:,} articles: {size / 1e6:.0f} MB gzipped; "
+              f"baseline peak RSS {_peak_rss_mb():.0f} MB")
+
+        drug_terms, event_terms = corpus_terms(DrugNormalizer.standin(), events=EVENTS)
+        started = time.perf_counter()
+        index = LiteratureIndex.build(medline_sources(source), os.path.join(tmp, "index"), drug_terms, event_terms)
+        elapsed = time.perf_counter() - started
+        on_disk = sum(entry.stat().st_size for entry in os.scandir(os.path.join(tmp, "index")))
+        print(f"indexed in {elapsed:.1f}s ({n_articles / elapsed:,.0f} articles/sec), {on_disk / 1e6:.0f} MB on disk, "
+              f"peak RSS {_peak_rss_mb():.0f} MB")
+        print(index.summary())
+
+        index = LiteratureIndex.load(os.path.join(tmp, "index"))
+        listedness, last = ListednessIndex(), index.summary()["last date"]
+        week = str(index.arrays["doc_dates"].max() - 7)
+        _timed(f"co-mentions, 1 product, week to {last}", lambda: index.co_mentions(DRUGS[:1], listedness, since=week))
+        _timed("co-mentions, 1 product, all dates", lambda: index.co_mentions(DRUGS[:1], listedness))
+        _timed(f"co-mentions, {len(DRUGS)} products, week", lambda: index.co_mentions(DRUGS, listedness, since=week))
+        _timed(f"co-mentions, {len(DRUGS)} products, all dates, listed too",
+               lambda: index.co_mentions(DRUGS, listedness, unlisted_only=False), repeat=3)
+        _timed("search: 2 words + product + event", lambda: index.search(["case report"], DRUGS[:1], EVENTS[-1:]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=4)
+    args = parser.parse_args()
+    run(args.articles, args.files)
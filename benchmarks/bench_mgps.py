@@ -0,0 +1,51 @@
+"""MGPS (EBGM, EB05, EB95) over a synthetic drug-event table of over a million cells, optionally stratified.
+
+    python -m benchmarks.bench_mgps --cases 1500000 --workers 4
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pvcore.mgps import STRATA, add_ebgm, fit_prior, stratified_expected
+from pvcore.signals import contingency_counts, disproportionality
+from pvcore.synthetic import drug_event_reports
+
+
+def run(n_cases, n_drugs, n_events, workers):
+    reports = drug_event_reports(n_cases, n_drugs, n_events)
+    case_ids = reports["case_id"].to_numpy()
+    reports["patient_age"] = (case_ids * 7919 % 95).astype(str)
+    reports["gender"] = np.where(case_ids % 2, "Male", "Female")
+    reports["case_received_date"] = (2015 + case_ids % 10).astype(str) + "-06-30"
+
+    started = time.perf_counter()
+    counts = contingency_counts(reports)
+    table = disproportionality(counts)
+    print(f"counts and PRR/ROR/IC ({len(table):,} cells)   {time.perf_counter() - started:7.2f}s")
+
+    started = time.perf_counter()
+    prior = fit_prior(table["a"], table["expected"])
+    print(f"prior fit                               {time.perf_counter() - started:7.2f}s  {prior}")
+
+    started = time.perf_counter()
+    add_ebgm(table, prior=prior, workers=workers)
+    print(f"EBGM, EB05, EB95                        {time.perf_counter() - started:7.2f}s")
+
+    started = time.perf_counter()
+    expected = stratified_expected(reports, counts, list(STRATA), workers)
+    print(f"expected over age band x gender x year  {time.perf_counter() - started:7.2f}s")
+    started = time.perf_counter()
+    add_ebgm(table, expected, workers=workers)
+    print(f"stratified fit and EBGM                 {time.perf_counter() - started:7.2f}s")
+    print(table.nlargest(5, "eb05")[["drug", "event", "a", "expected", "ebgm", "eb05", "eb95"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_500_000)
+    parser.add_argument("--drugs", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+    run(args.cases, args.drugs, args.events, args.workers)
@@ -0,0 +1,34 @@
+"""Throughput of ICSR PDF rendering: one process vs. the batch ZIP process pool.
+
+    python -m benchmarks.bench_pdf_batch --cases 500 --workers 4
+"""
+import argparse
+import io
+import time
+import zipfile
+
+from pvcore.pdf_report import cases_from_table, write_pdf_zip
+from pvcore.synthetic import icsr_cases
+
+
+def run(n_cases, workers):
+    cases = cases_from_table(icsr_cases(n_cases))
+    results = {}
+    for label, n_workers in [("single process", 1), (f"pool ({workers or 'all'} workers)", workers)]:
+        buffer = io.BytesIO()
+        started = time.perf_counter()
+        written = write_pdf_zip(cases, buffer, workers=n_workers)
+        elapsed = time.perf_counter() - started
+        assert len(zipfile.ZipFile(buffer).namelist()) == written == n_cases
+        results[label] = written / elapsed
+        print(f"{label:<24} {written} PDFs in {elapsed:6.2f}s  {written / elapsed:8.1f} PDFs/sec  "
+              f"ZIP {buffer.tell() / 1e6:.1f} MB")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    run(args.cases, args.workers)
@@ -0,0 +1,91 @@
+"""Per-rerun CPU time and per-session memory of each sidebar page, via AppTest.
+
+Reruns happen exactly as on a widget interaction: the whole script runs
+again in the same session. Pass --script to measure another revision of
+the app, e.g. one checked out with `git show <rev>:PV.py > /tmp/PV_old.py`.
+
+    python -m benchmarks.bench_rerun --reruns 20 --sessions 5
+"""
+import argparse
+import gc
+import logging
+import time
+import tracemalloc
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGES = [
+    "Home",
+    "ICSR Processing",
+    "Literature Monitoring",
+    "Aggregate Reports Preparation",
+    "Signal Management",
+    "Risk Management",
+    "Regulatory Reporting / Submissions",
+    "Automation / PV Technology",
+]
+
+
+def share_script_cache():
+    # A server compiles the script once per process; AppTest recompiles on every
+    # run, which would otherwise dominate the per-rerun numbers
+    shared = ScriptCache()
+    local_script_runner.ScriptCache = lambda: shared
+
+
+def _session(script, page, timeout):
+    at = AppTest.from_file(str(script), default_timeout=timeout).run()
+    at.sidebar.radio[0].set_value(page).run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return at
+
+
+def rerun_cpu(script, page, reruns, timeout=120):
+    """Sorted CPU seconds of reruns of one page in one session."""
+    at = _session(script, page, timeout)
+    cpu = []
+    for _ in range(reruns):
+        started = time.process_time()
+        at.run()
+        cpu.append(time.process_time() - started)
+    return sorted(cpu)
+
+
+def measure_page(script, page, reruns, sessions, timeout=120):
+    cpu = rerun_cpu(script, page, reruns, timeout)
+
+    # Memory retained per additional session on this page
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [_session(script, page, timeout) for _ in range(sessions)]
+    gc.collect()
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / sessions
+    tracemalloc.stop()
+    del kept
+    return {"cpu_ms_p50": cpu[len(cpu) // 2] * 1000, "cpu_ms_p95": cpu[int(len(cpu) * 0.95) - 1] * 1000,
+            "session_kb": per_session / 1024}
+
+
+def run(script, reruns, sessions, pages=PAGES):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    share_script_cache()
+    results = {}
+    print(f"{'page':<38} {'rerun CPU p50':>14} {'p95':>9} {'memory/session':>15}")
+    for page in pages:
+        result = results[page] = measure_page(script, page, reruns, sessions)
+        print(f"{page:<38} {result['cpu_ms_p50']:11.1f} ms {result['cpu_ms_p95']:6.1f} ms {result['session_kb']:12.0f} KB")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", type=Path, default=ROOT / "PV.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=5)
+    args = parser.parse_args()
+    run(args.script, args.reruns, args.sessions)
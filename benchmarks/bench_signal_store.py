@@ -0,0 +1,55 @@
+"""Incremental signal update vs. full recompute.
+
+Loads a synthetic database into a SignalCountStore, then times one batch of
+new cases (with some nullifications) against recomputing everything.
+
+    python -m benchmarks.bench_signal_store --cases 500000 --batch 5000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from pvcore.signal_store import SignalCountStore
+from pvcore.signals import contingency_counts, disproportionality
+from pvcore.synthetic import drug_event_reports
+
+
+def run(n_cases, batch_size, n_drugs, n_events):
+    reports = drug_event_reports(n_cases + batch_size, n_drugs, n_events)
+    existing = reports[reports["case_id"] < n_cases]
+    batch = reports[reports["case_id"] >= n_cases]
+    nullified = range(0, n_cases, max(n_cases // 100, 1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SignalCountStore(Path(tmp) / "signals.db")
+        started = time.perf_counter()
+        store.apply(existing)
+        print(f"initial load of {n_cases:,} cases   {time.perf_counter() - started:7.2f}s")
+
+        started = time.perf_counter()
+        updated = store.apply(batch, removed_case_ids=nullified)
+        incremental = time.perf_counter() - started
+        print(f"batch of {batch_size:,} cases + {len(nullified)} nullified   {incremental:7.2f}s  "
+              f"({len(updated):,} pairs recomputed)")
+
+        started = time.perf_counter()
+        refreshed = store.refresh()
+        print(f"full refresh from the store      {time.perf_counter() - started:7.2f}s  ({len(refreshed):,} pairs)")
+        store.close()
+
+    started = time.perf_counter()
+    disproportionality(contingency_counts(reports))
+    full = time.perf_counter() - started
+    print(f"full in-memory recompute         {full:7.2f}s")
+    return incremental, full
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=500_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--drugs", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.cases, args.batch, args.drugs, args.events)
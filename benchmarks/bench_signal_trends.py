@@ -0,0 +1,50 @@
+"""Appending one month to the signal trends vs. rebuilding them, plus trend and alert queries.
+
+    python -m benchmarks.bench_signal_trends --cases 1000000 --months 36
+"""
+import argparse
+import time
+
+from pvcore.signal_trends import SignalTrends
+from pvcore.synthetic import drug_event_reports
+
+
+def run(n_cases, months, n_drugs, n_events):
+    reports = drug_event_reports(n_cases, n_drugs, n_events, months=months)
+    last = reports["case_received_date"].max()[:7]
+    history = reports[reports["case_received_date"] < last]
+    latest = reports[reports["case_received_date"] >= last]
+
+    started = time.perf_counter()
+    trends = SignalTrends.from_reports(history, freq="M")
+    print(f"build {months - 1} months ({len(history):,} rows)    {time.perf_counter() - started:7.3f}s  "
+          f"({len(trends):,} pairs)")
+
+    started = time.perf_counter()
+    trends.add(latest)
+    appended = time.perf_counter() - started
+    print(f"append month {last} ({len(latest):,} rows)   {appended:7.3f}s")
+
+    started = time.perf_counter()
+    SignalTrends.from_reports(reports, freq="M")
+    rebuilt = time.perf_counter() - started
+    print(f"rebuild all {months} months            {rebuilt:7.3f}s  ({rebuilt / appended:.0f}x the append)")
+
+    started = time.perf_counter()
+    alerts = trends.alerts(window=3)
+    print(f"all-pair table and alerts          {time.perf_counter() - started:7.3f}s  ({len(alerts):,} alerting pairs)")
+    pair = alerts.iloc[0]
+    trends.trend(pair["drug"], pair["event"], window=3)   # builds the label lookups once
+    started = time.perf_counter()
+    trends.trend(pair["drug"], pair["event"], window=3)
+    print(f"one pair's trend                   {(time.perf_counter() - started) * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--drugs", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.cases, args.months, args.drugs, args.events)
@@ -0,0 +1,32 @@
+"""Time the disproportionality engine on a synthetic report table.
+
+    python -m benchmarks.bench_signals --cases 1000000 --drugs 2000 --events 5000
+"""
+import argparse
+import time
+
+from pvcore.signals import contingency_counts, disproportionality
+from pvcore.synthetic import drug_event_reports
+
+
+def run(n_cases, n_drugs, n_events):
+    reports = drug_event_reports(n_cases, n_drugs, n_events)
+    started = time.perf_counter()
+    counts = contingency_counts(reports)
+    counted = time.perf_counter()
+    table = disproportionality(counts)
+    finished = time.perf_counter()
+    print(f"{len(reports):,} report rows, {counts.n_reports:,} cases, {len(counts):,} drug-event pairs")
+    print(f"contingency counts {counted - started:6.2f}s")
+    print(f"statistics         {finished - counted:6.2f}s")
+    print(f"total              {finished - started:6.2f}s  ({int(table['signal'].sum()):,} pairs meet the PRR criteria)")
+    return finished - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    parser.add_argument("--drugs", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+    run(args.cases, args.drugs, args.events)
@@ -0,0 +1,72 @@
+"""Streaming PSUR/PBRER tabulation over a synthetic case CSV, with the process peak RSS.
+
+Times one pass building interval and cumulative tabulations plus the line
+listing, then an interval-only pass merged onto the saved cumulative of
+the previous period, and checks both give the same cumulative counts.
+
+    python -m benchmarks.bench_tabulation --cases 2000000
+"""
+import argparse
+import io
+import os
+import resource
+import tempfile
+import time
+
+import pandas as pd
+
+from pvcore.synthetic import EVENT_SOCS, icsr_cases
+from pvcore.tabulation import LINE_LISTING_COLUMNS, Tabulation, tabulate, tabulate_with_history
+
+INTERVAL_START, DATA_LOCK = "2025-07-01", "2025-12-31"
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _write_cases(path, n_cases, chunksize=50_000):
+    for start in range(0, n_cases, chunksize):
+        icsr_cases(min(chunksize, n_cases - start), seed=start // chunksize).to_csv(path, mode="a", header=start == 0, index=False)
+
+
+def _chunks(path, chunksize):
+    columns = set(LINE_LISTING_COLUMNS)
+    return pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize, usecols=lambda c: c in columns)
+
+
+def run(n_cases, chunksize):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cases.csv")
+        _write_cases(path, n_cases)
+        print(f"{n_cases:,} cases, {os.path.getsize(path) / 1e6:.0f} MB CSV, read in chunks of {chunksize:,}")
+        print(f"baseline peak RSS {_peak_rss_mb():.0f} MB")
+
+        listing = io.StringIO()
+        started = time.perf_counter()
+        interval, cumulative = tabulate_with_history(_chunks(path, chunksize), INTERVAL_START, DATA_LOCK,
+                                                     soc_map=EVENT_SOCS, listing=listing)
+        elapsed = time.perf_counter() - started
+        print(f"one pass (interval + cumulative + line listing) {elapsed:6.2f}s  {n_cases / elapsed:,.0f} cases/sec  "
+              f"peak RSS {_peak_rss_mb():.0f} MB")
+        print(f"  interval {interval.n_events:,} events, cumulative {cumulative.n_events:,} events, "
+              f"{len(cumulative.counts):,} SOC/PT/seriousness cells, line listing {len(listing.getvalue()) / 1e6:.0f} MB")
+
+        # Next period: the saved cumulative of the previous one plus the new interval
+        previous = tabulate(_chunks(path, chunksize), None, "2025-06-30", soc_map=EVENT_SOCS).to_json()
+        started = time.perf_counter()
+        interval = tabulate(_chunks(path, chunksize), INTERVAL_START, DATA_LOCK, soc_map=EVENT_SOCS)
+        scanned = time.perf_counter()
+        merged = Tabulation.from_json(previous).merge(interval)
+        merged_at = time.perf_counter()
+        same = merged.counts.sort_index().equals(cumulative.counts.sort_index())
+        print(f"interval pass {scanned - started:6.2f}s, merge onto saved cumulative {(merged_at - scanned) * 1000:.1f} ms  "
+              f"(matches one-pass cumulative: {same})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.cases, args.chunksize)
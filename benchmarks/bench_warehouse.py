@@ -0,0 +1,57 @@
+"""Case warehouse write, and pruned/projected reads vs. full scans and the SQLite case store.
+
+    python -m benchmarks.bench_warehouse --cases 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from pvcore.case_store import CaseStore
+from pvcore.synthetic import DRUGS, icsr_cases
+from pvcore.tabulation import LINE_LISTING_COLUMNS
+from pvcore.warehouse import CaseWarehouse
+
+COLUMNS = [c for c in LINE_LISTING_COLUMNS if c not in ("pt", "soc")]
+
+
+def _timed(label, read):
+    started = time.perf_counter()
+    rows = read()
+    print(f"{label:<46} {time.perf_counter() - started:7.3f}s  {rows:>10,} rows")
+
+
+def run(n_cases, chunksize=100_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CaseStore(os.path.join(tmp, "cases.db"))
+        for seed, start in enumerate(range(0, n_cases, chunksize)):
+            store.upsert_cases(icsr_cases(min(chunksize, n_cases - start), seed=seed))
+        warehouse = CaseWarehouse(os.path.join(tmp, "warehouse"))
+        started = time.perf_counter()
+        warehouse.write(store.iter_cases(chunksize=chunksize), replace_all=True)
+        elapsed = time.perf_counter() - started
+        print(f"write {n_cases:,} cases in {elapsed:.1f}s ({n_cases / elapsed:,.0f} cases/sec)")
+        print(warehouse.summary().to_string(index=False))
+
+        product, received = DRUGS[0], {"received_from": "2025-01-01", "received_to": "2025-03-31"}
+        _timed("case store: all cases, all columns",
+               lambda: sum(len(chunk) for chunk in store.iter_cases(chunksize=chunksize)))
+        _timed("warehouse: all cases, all columns",
+               lambda: sum(len(chunk) for chunk in warehouse.scan("cases", batch_size=chunksize)))
+        _timed("warehouse: all cases, listing columns",
+               lambda: sum(len(chunk) for chunk in warehouse.scan("cases", COLUMNS, batch_size=chunksize)))
+        _timed(f"case store: {product}, one quarter",
+               lambda: sum(len(chunk) for chunk in store.iter_cases(COLUMNS, chunksize, suspected_drug=product,
+                                                                    **received)))
+        _timed(f"warehouse: {product}, one quarter",
+               lambda: len(warehouse.read("cases", COLUMNS, products=[product], **received)))
+        _timed("warehouse: reports for signal detection",
+               lambda: len(warehouse.read("reports", ["case_id", "drug", "event"])))
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.cases)
@@ -0,0 +1,167 @@
+"""Benchmark suite over the app's hot paths, with JSON results compared against a stored baseline.
+
+Each benchmark times one hot path on synthetic data from pvcore.synthetic
+and records the median wall time of --repeats runs; page benchmarks record
+the median CPU time of a rerun of each sidebar page under AppTest. A
+benchmark slower than its baseline by more than --threshold is a regression,
+and the exit status is then 1. Baselines are machine specific: record one
+with --update-baseline on the machine that will compare against it.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --only literature_screening signal_statistics --threshold 0.1
+    python -m benchmarks.suite --update-baseline
+"""
+import argparse
+import io
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.bench_rerun import PAGES, ROOT, rerun_cpu, share_script_cache
+from pvcore.literature import ListednessIndex, screen_articles
+from pvcore.mgps import add_ebgm
+from pvcore.obligations import ObligationRules
+from pvcore.pdf_report import cases_from_table, render_icsr_pdf
+from pvcore.signals import contingency_counts, disproportionality
+from pvcore.synthetic import drug_event_reports, icsr_cases, literature_records
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+# Each benchmark builds its input at the given scale and returns the function to time
+def literature_screening(scale):
+    text = literature_records(int(200_000 * scale)).to_csv(index=False)
+    index = ListednessIndex()
+    return lambda: sum(len(chunk) for chunk in screen_articles(io.StringIO(text), index))
+
+
+def icsr_pdf_render(scale):
+    cases = cases_from_table(icsr_cases(int(100 * scale)))
+    return lambda: [render_icsr_pdf(case) for case in cases]
+
+
+def signal_statistics(scale):
+    reports = drug_event_reports(int(500_000 * scale), 1000, 2000)
+    return lambda: disproportionality(contingency_counts(reports))
+
+
+def mgps_ebgm(scale):
+    table = disproportionality(contingency_counts(drug_event_reports(int(500_000 * scale), 1000, 2000)))
+    return lambda: add_ebgm(table, workers=1)
+
+
+def reporting_obligations(scale):
+    cases = icsr_cases(int(200_000 * scale))
+    rules = ObligationRules()
+    return lambda: rules.evaluate(cases)
+
+
+BENCHMARKS = {func.__name__: func for func in [literature_screening, icsr_pdf_render, signal_statistics,
+                                               mgps_ebgm, reporting_obligations]}
+PAGE_BENCHMARKS = {"page_rerun:" + page: page for page in PAGES}
+
+
+def _timed(setup, scale, repeats):
+    func = setup(scale)
+    func()   # warm up imports and caches
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def run(names, scale=1.0, repeats=5, reruns=10):
+    """Seconds per benchmark name."""
+    results = {}
+    for name in names:
+        if name in PAGE_BENCHMARKS:
+            share_script_cache()
+            results[name] = statistics.median(rerun_cpu(ROOT / "PV.py", PAGE_BENCHMARKS[name], reruns))
+        else:
+            results[name] = _timed(BENCHMARKS[name], scale, repeats)
+        print(f"{name:<52} {results[name] * 1000:10.1f} ms", flush=True)
+    return results
+
+
+def report(results, scale):
+    return {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"), "python": platform.python_version(),
+            "machine": platform.platform(), "scale": scale, "seconds": results}
+
+
+def compare(results, baseline, threshold, min_delta=0.002):
+    """(rows of name, baseline, current, change, status; names of regressions).
+
+    A regression is slower by more than threshold and by more than min_delta seconds, so
+    millisecond-scale reruns do not fail on timer noise.
+    """
+    rows, regressions = [], []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is None:
+            rows.append((name, None, seconds, None, "new"))
+            continue
+        change = seconds / before - 1
+        slower = change > threshold and seconds - before > min_delta
+        status = "REGRESSION" if slower else "faster" if change < -threshold else "ok"
+        if status == "REGRESSION":
+            regressions.append(name)
+        rows.append((name, before, seconds, change, status))
+    return rows, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS) + list(PAGE_BENCHMARKS), metavar="NAME",
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--skip-pages", action="store_true", help="skip the AppTest page reruns")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier on the synthetic data sizes")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=10, help="reruns per page")
+    parser.add_argument("--output", type=Path, help="write the results JSON here")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs the baseline, e.g. 0.2 = 20%%")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="smallest slowdown that counts as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args(argv)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+    names = args.only or list(BENCHMARKS) + ([] if args.skip_pages else list(PAGE_BENCHMARKS))
+    results = report(run(names, args.scale, args.repeats, args.reruns), args.scale)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.update_baseline:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"seconds": {}}
+        results["seconds"] = {**stored["seconds"], **results["seconds"]}
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("scale") != args.scale:
+        print(f"warning: the baseline was recorded at scale {baseline.get('scale')}, not {args.scale}")
+    rows, regressions = compare(results["seconds"], baseline["seconds"], args.threshold,
+                                   args.min_delta_ms / 1000)
+    print(f"\n{'benchmark':<52} {'baseline':>11} {'current':>11} {'change':>8}")
+    for name, before, seconds, change, status in rows:
+        before = f"{before * 1000:8.1f} ms" if before is not None else f"{'-':>11}"
+        change = f"{change:+7.0%}" if change is not None else f"{'-':>8}"
+        print(f"{name:<52} {before} {seconds * 1000:8.1f} ms {change}  {status}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
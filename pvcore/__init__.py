@@ -0,0 +1 @@
+"""Domain logic for the Pharmacovigilance Hub, kept free of Streamlit calls."""
@@ -0,0 +1,5 @@
+import sys
+
+from pvcore.cli import main
+
+sys.exit(main())
@@ -0,0 +1,199 @@
+"""Batch jobs over case and article files, for nightly runs without the UI.
+
+The parent process only splits the input into blocks of records, as raw
+text cut at line ends outside quoted fields, and writes results. Each block
+is parsed, processed and formatted in a worker of a process pool
+(pvcore.parallel), so throughput grows with the workers rather than being
+capped by the parent. At most two blocks per worker are in flight, and the
+output is written in input order; memory stays at a few blocks whatever the
+file size. With workers=1 everything runs in-process.
+"""
+import functools
+import io
+import time
+import zipfile
+from collections import Counter, deque, namedtuple
+
+import pandas as pd
+
+from pvcore.case_store import get_case_store
+from pvcore.causality import assess
+from pvcore.drugs import get_drug_normalizer
+from pvcore.faers import ingest
+from pvcore.icsr import case_validity
+from pvcore.literature import ListednessIndex, article_separator, article_table, screen_chunk
+from pvcore.meddra import get_meddra_index
+from pvcore.medline import BATCH_ARTICLES, LiteratureIndex, corpus_terms, medline_sources
+from pvcore.obligations import ObligationRules
+from pvcore.parallel import default_workers, process_pool
+from pvcore.pdf_report import cases_from_table, member_name, pdf_file_name, render_icsr_pdf
+from pvcore.warehouse import get_warehouse
+
+JOBS = ["validate", "causality", "screen", "obligations", "pdf", "faers", "medline"]
+
+Block = namedtuple("Block", "number offset header text rows sep")
+
+
+def read_blocks(path, rows, sep=","):
+    """Yield Blocks of up to rows records of a CSV/TSV file, each with the header line."""
+    with open(path, encoding="utf-8", newline="") as file:
+        header, lines, records, offset, quotes, number = None, [], 0, 0, 0, 0
+        for line in file:
+            lines.append(line)
+            quotes += line.count('"')
+            if quotes % 2:
+                continue   # the line ends inside a quoted field
+            quotes = 0
+            if header is None:
+                header, lines = "".join(lines), []
+                continue
+            records += 1
+            if records == rows:
+                yield Block(number, offset, header, "".join(lines), records, sep)
+                number, offset, lines, records = number + 1, offset + records, [], 0
+        if lines:
+            yield Block(number, offset, header or "", "".join(lines), records, sep)
+
+
+def parse(block):
+    return pd.read_csv(io.StringIO(block.header + block.text), sep=block.sep, dtype=str, keep_default_na=False)
+
+
+def map_blocks(func, blocks, workers=None, on_progress=None):
+    """Yield func(block) for each block, in order; on_progress(rows, seconds) follows each result."""
+    started, rows = time.perf_counter(), 0
+
+    def done(block_rows, result):
+        nonlocal rows
+        rows += block_rows
+        if on_progress:
+            on_progress(rows, time.perf_counter() - started)
+        return result
+
+    if workers == 1:
+        for block in blocks:
+            yield done(block.rows, func(block))
+        return
+    with process_pool(workers) as pool:
+        pending = deque()
+        for block in blocks:
+            pending.append((block.rows, pool.submit(func, block)))
+            if len(pending) >= 2 * (workers or default_workers()):
+                block_rows, future = pending.popleft()
+                yield done(block_rows, future.result())
+        while pending:
+            block_rows, future = pending.popleft()
+            yield done(block_rows, future.result())
+
+
+def write_csv(results, path):
+    """Write (CSV text, counts) results to one file; returns the summed counts."""
+    totals = Counter()
+    with open(path, "w", newline="", encoding="utf-8") as output:
+        for text, counts in results:
+            output.write(text)
+            totals.update(counts)
+    return dict(totals)
+
+
+def _csv(table, block, **counts):
+    # The output header is written once, with the first block
+    return table.to_csv(index=False, header=block.number == 0), {"rows": len(table), **counts}
+
+
+def _validate(block):
+    cases = parse(block)
+    table = cases.join(case_validity(cases))
+    return _csv(table, block, valid=int(table["valid"].sum()))
+
+
+@functools.lru_cache(maxsize=None)
+def _listedness():
+    return ListednessIndex()
+
+
+def _causality(block):
+    cases = parse(block)
+    return _csv(cases.join(assess(cases, _listedness())), block)
+
+
+def _screen(data_type, block):
+    table = screen_chunk(article_table(parse(block)), _listedness(), data_type)
+    return _csv(table, block, icsrs=int((table["icsr"] == "Yes").sum()))
+
+
+@functools.lru_cache(maxsize=None)
+def _rules(path):
+    return ObligationRules.from_csv(path) if path else ObligationRules()
+
+
+def _obligations(rules_path, authority, block):
+    return _csv(_rules(rules_path).evaluate(parse(block), _listedness()).table(authority), block)
+
+
+def _render(block):
+    return [(pdf_file_name(case, block.offset + i), render_icsr_pdf(case))
+            for i, case in enumerate(cases_from_table(parse(block)))]
+
+
+def validate(source, output, chunksize=50_000, workers=None, on_progress=None):
+    """Add the VALIDITY_COLUMNS to a case CSV."""
+    counts = write_csv(map_blocks(_validate, read_blocks(source, chunksize), workers, on_progress), output)
+    return {"cases": counts.get("rows", 0), "valid": counts.get("valid", 0),
+            "not_valid": counts.get("rows", 0) - counts.get("valid", 0)}
+
+
+def causality(source, output, chunksize=50_000, workers=None, on_progress=None):
+    """Add the CAUSALITY_COLUMNS (Naranjo score and WHO-UMC category suggestions) to a case CSV."""
+    counts = write_csv(map_blocks(_causality, read_blocks(source, chunksize), workers, on_progress), output)
+    return {"cases": counts.get("rows", 0)}
+
+
+def screen(source, output, data_type="Single Patient", chunksize=50_000, workers=None, on_progress=None):
+    """Screen an article CSV/TSV for ICSRs and listedness."""
+    blocks = read_blocks(source, chunksize, article_separator(source))
+    counts = write_csv(map_blocks(functools.partial(_screen, data_type), blocks, workers, on_progress), output)
+    return {"articles": counts.get("rows", 0), "icsrs": counts.get("icsrs", 0)}
+
+
+def obligations(source, output, authority=None, rules=None, chunksize=50_000, workers=None, on_progress=None):
+    """Reporting obligations (case, authority, report, due date) of a case CSV, for one authority or all."""
+    func = functools.partial(_obligations, str(rules) if rules else None, authority)
+    counts = write_csv(map_blocks(func, read_blocks(source, chunksize), workers, on_progress), output)
+    return {"obligations": counts.get("rows", 0)}
+
+
+def pdf(source, output, chunksize=64, workers=None, on_progress=None):
+    """One ICSR PDF per case of a case CSV, into a ZIP archive."""
+    used = set()
+    # PDF streams are already deflated, so the members are stored as-is
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+        for rendered in map_blocks(_render, read_blocks(source, chunksize), workers, on_progress):
+            for name, data in rendered:
+                archive.writestr(member_name(name, used), data)
+    return {"pdfs": len(used)}
+
+
+def faers(source, output, chunksize=100_000, on_progress=None):
+    """Load the latest case versions of a FAERS quarterly extract (a directory) into a data directory.
+
+    The cases go to its case store (cases.db) and, with products from its
+    drug dictionary, to its case warehouse. Runs in-process.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    return ingest(source, get_case_store(output / "cases.db"), get_warehouse(output / "warehouse"),
+                  get_drug_normalizer(output / "drug_dictionary.csv").canonical, chunksize, on_progress)
+
+
+def medline(source, output, chunksize=BATCH_ARTICLES, on_progress=None):
+    """Index a directory of MEDLINE/PubMed XML files (baseline, then updates) for a data directory's literature search.
+
+    Products come from its drug dictionary and reaction concepts from its
+    MedDRA files, if any; the index goes to literature_index. Runs in-process.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    drug_terms, event_terms = corpus_terms(get_drug_normalizer(output / "drug_dictionary.csv"),
+                                           get_meddra_index(output / "meddra", output / "meddra_index"))
+    index = LiteratureIndex.build(medline_sources(source), output / "literature_index", drug_terms, event_terms,
+                                  chunksize, on_progress)
+    return index.summary()
@@ -0,0 +1,200 @@
+"""Local ICSR case store: SQLite in WAL mode, one row per case.
+
+Connections come from a small pool shared by every session of the process
+(see get_case_store). WAL lets readers run while a bulk insert is writing.
+Listings are served from composite (filter column, received date) indexes,
+so a filtered page of the newest cases stays fast at millions of rows.
+"""
+import queue
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from pvcore.icsr import ICSR_FIELDS
+
+NUMERIC_FIELDS = {"patient_age": "INTEGER", "weight": "REAL", "height": "REAL"}
+# Filterable columns; each gets a (column, case_received_date) index
+FILTER_FIELDS = ["suspected_drug", "ae_meddra", "seriousness", "country", "status"]
+CASE_COLUMNS = ICSR_FIELDS + ["status"]
+
+
+def _column_sql(name):
+    if name == "case_id":
+        return "case_id TEXT PRIMARY KEY"
+    if name in NUMERIC_FIELDS:
+        return f"{name} {NUMERIC_FIELDS[name]}"
+    if name == "status":
+        return "status TEXT NOT NULL DEFAULT 'Open' COLLATE NOCASE"
+    collate = " COLLATE NOCASE" if name in FILTER_FIELDS else ""
+    return f"{name} TEXT{collate}"
+
+
+SCHEMA = (
+    f"CREATE TABLE IF NOT EXISTS cases ({', '.join(map(_column_sql, CASE_COLUMNS))}, "
+    "updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP);\n"
+    "CREATE INDEX IF NOT EXISTS cases_received ON cases (case_received_date);\n"
+    + "".join(f"CREATE INDEX IF NOT EXISTS cases_{name} ON cases ({name}, case_received_date);\n"
+              for name in FILTER_FIELDS)
+)
+
+
+def new_case_id():
+    return f"PV-{date.today():%Y%m%d}-{uuid.uuid4().hex[:8].upper()}"
+
+
+def _value(name, value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if name in NUMERIC_FIELDS:
+        number = pd.to_numeric(value, errors="coerce")
+        return None if pd.isna(number) else (int(number) if NUMERIC_FIELDS[name] == "INTEGER" else float(number))
+    if hasattr(value, "isoformat"):
+        return value.isoformat()[:10] if name.endswith("_date") else value.isoformat()
+    return str(value)
+
+
+def _case_row(case):
+    case = dict(case)
+    case["case_id"] = _value("case_id", case.get("case_id")) or new_case_id()
+    case["status"] = _value("status", case.get("status")) or "Open"
+    return [_value(c, case.get(c)) for c in CASE_COLUMNS]
+
+
+def _frame_rows(cases):
+    # Column by column, each distinct value converted once; row dicts cost more than the inserts
+    columns = []
+    for name in CASE_COLUMNS:
+        if name not in cases:
+            values = np.full(len(cases), None, dtype=object)
+        else:
+            codes, uniques = pd.factorize(cases[name].to_numpy(dtype=object), use_na_sentinel=False)
+            values = np.array([_value(name, u) for u in uniques], dtype=object)[codes]
+        if name == "case_id":
+            values = np.array([value or new_case_id() for value in values], dtype=object)
+        elif name == "status":
+            values = np.array([value or "Open" for value in values], dtype=object)
+        columns.append(values)
+    return zip(*columns)
+
+
+class CaseStore:
+    def __init__(self, path, pool_size=4):
+        self.path = str(path)
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")
+            self._pool.put(conn)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get().close()
+
+    def upsert_cases(self, cases, batch_size=10_000):
+        """Insert or replace cases (iterable of field dicts or a DataFrame); returns the case IDs.
+
+        Cases without a case_id get a new one. Rows go in batches, one
+        transaction each.
+        """
+        rows = _frame_rows(cases) if isinstance(cases, pd.DataFrame) else map(_case_row, cases)
+        columns = CASE_COLUMNS
+        sql = (f"INSERT INTO cases ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+               f"ON CONFLICT (case_id) DO UPDATE SET "
+               + ", ".join(f"{c} = excluded.{c}" for c in columns[1:])
+               + ", updated_at = CURRENT_TIMESTAMP")
+        ids, batch = [], []
+        with self.connection() as conn:
+            for row in rows:
+                ids.append(row[0])
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    with conn:
+                        conn.executemany(sql, batch)
+                    batch = []
+            if batch:
+                with conn:
+                    conn.executemany(sql, batch)
+        return ids
+
+    def set_status(self, case_ids, status):
+        with self.connection() as conn, conn:
+            conn.executemany("UPDATE cases SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE case_id = ?",
+                             [(status, case_id) for case_id in case_ids])
+
+    def get_case(self, case_id):
+        """One case as a field dict, or None."""
+        with self.connection() as conn:
+            conn.row_factory = sqlite3.Row
+            try:
+                row = conn.execute("SELECT * FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+            finally:
+                conn.row_factory = None
+        return dict(row) if row else None
+
+    def _where(self, received_from=None, received_to=None, **filters):
+        clauses, params = [], []
+        if received_from:
+            clauses.append("case_received_date >= ?")
+            params.append(_value("case_received_date", received_from))
+        if received_to:
+            clauses.append("case_received_date <= ?")
+            params.append(_value("case_received_date", received_to))
+        for name, value in filters.items():
+            if name not in FILTER_FIELDS:
+                raise ValueError(f"cannot filter on {name!r}; use one of {FILTER_FIELDS}")
+            if value:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list_cases(self, columns=None, limit=100, offset=0, received_from=None, received_to=None, **filters):
+        """Newest cases first, filtered on received date and any of FILTER_FIELDS (exact, case-insensitive)."""
+        where, params = self._where(received_from, received_to, **filters)
+        selected = ", ".join(columns or CASE_COLUMNS)
+        with self.connection() as conn:
+            return pd.read_sql_query(
+                f"SELECT {selected} FROM cases{where} ORDER BY case_received_date DESC LIMIT ? OFFSET ?",
+                conn, params=params + [limit, offset],
+            )
+
+    def count_cases(self, received_from=None, received_to=None, **filters):
+        where, params = self._where(received_from, received_to, **filters)
+        with self.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM cases{where}", params).fetchone()[0]
+
+    def iter_cases(self, columns=None, chunksize=100_000, **filters):
+        """Stream matching cases as DataFrame chunks, for batch jobs."""
+        where, params = self._where(**filters)
+        selected = ", ".join(columns or CASE_COLUMNS)
+        with self.connection() as conn:
+            yield from pd.read_sql_query(f"SELECT {selected} FROM cases{where}", conn, params=params, chunksize=chunksize)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_case_store(path):
+    """The process-wide CaseStore for a path, created on first use."""
+    key = str(path)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = CaseStore(key)
+        return _stores[key]
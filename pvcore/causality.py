@@ -0,0 +1,93 @@
+"""Causality pre-assessment: Naranjo scores and WHO-UMC categories from structured case fields.
+
+Only the questions the case fields can answer are scored; the rest count
+as "don't know" (0):
+
+- Q1, previous conclusive reports: the event is expected (listed) for the drug
+- Q2, event after the drug: the temporal relation below (+2 plausible, -1 implausible)
+- Q3, dechallenge positive: +1
+- Q4, rechallenge: +2 positive, -1 negative
+- Q5, alternative causes: -1 yes, +2 no
+
+The temporal relation compares event onset (ae_onset_date if present, else
+case_received_date as its latest possible date) with the drug's start_date
+and, when the onset date is known, end_date plus a window. The
+result is a suggestion for the reviewer, not a replacement for medical
+review.
+"""
+import numpy as np
+import pandas as pd
+
+from pvcore.obligations import expectedness
+
+CAUSALITY_COLUMNS = ["temporal_relation", "naranjo_score", "naranjo_category", "who_umc_category"]
+NARANJO_CATEGORIES = [(9, "Definite"), (5, "Probable"), (1, "Possible"), (-np.inf, "Doubtful")]
+WHO_UMC_CATEGORIES = ["Certain", "Probable", "Possible", "Unlikely", "Conditional", "Unassessable"]
+ALTERNATIVE_CAUSES = ["Unknown", "Yes", "No"]
+# Days after the drug was stopped within which an onset is still plausible
+ONSET_WINDOW_DAYS = 30
+
+
+def _values(cases, column):
+    """Stripped, casefolded values of a column (empty where missing), computed once per distinct value."""
+    if column not in cases:
+        return np.full(len(cases), "", dtype=object)
+    codes, uniques = pd.factorize(cases[column].to_numpy(dtype=object), use_na_sentinel=False)
+    return np.array([u.strip().casefold() if isinstance(u, str) else "" for u in uniques], dtype=object)[codes]
+
+
+def _dates(cases, column):
+    """datetime64[D] of a column of dates or date strings; NaT where missing or unparsable."""
+    if column not in cases:
+        return np.full(len(cases), np.datetime64("NaT"), dtype="datetime64[D]")
+    codes, uniques = pd.factorize(cases[column].to_numpy(dtype=object), use_na_sentinel=False)
+    days = pd.to_datetime(pd.Series(uniques, dtype=object).astype(str).str[:10], format="%Y-%m-%d", errors="coerce")
+    return days.to_numpy().astype("datetime64[D]")[codes]
+
+
+def temporal_relation(cases, window_days=ONSET_WINDOW_DAYS):
+    """"plausible", "implausible" or "unknown" per case."""
+    start, end = _dates(cases, "start_date"), _dates(cases, "end_date")
+    onset = _dates(cases, "ae_onset_date")
+    known_onset = ~np.isnat(onset)
+    onset = np.where(known_onset, onset, _dates(cases, "case_received_date"))
+    late = known_onset & ~np.isnat(end) & (onset > end + np.timedelta64(window_days, "D"))
+    unknown = np.isnat(start) | np.isnat(onset)
+    return np.select([unknown, (onset < start) | late], ["unknown", "implausible"], "plausible")
+
+
+def naranjo_category(scores):
+    scores = np.asarray(scores)
+    return np.select([scores >= threshold for threshold, _ in NARANJO_CATEGORIES[:-1]],
+                     [category for _, category in NARANJO_CATEGORIES[:-1]], NARANJO_CATEGORIES[-1][1])
+
+
+def assess(cases, listedness=None, window_days=ONSET_WINDOW_DAYS):
+    """CAUSALITY_COLUMNS for a case table, aligned with its index."""
+    temporal = temporal_relation(cases, window_days)
+    dechallenge, rechallenge = _values(cases, "dechallenge"), _values(cases, "rechallenge")
+    alternative = _values(cases, "alternative_causes")
+    has_drug = _values(cases, "suspected_drug") != ""
+    has_event = (_values(cases, "ae_verbatim") != "") | (_values(cases, "ae_meddra") != "")
+    listed = expectedness(cases, listedness) == "Expected" if {"suspected_drug", "ae_verbatim"} <= set(cases) \
+        else np.zeros(len(cases), dtype=bool)
+
+    score = (listed.astype(int)
+             + np.select([temporal == "plausible", temporal == "implausible"], [2, -1], 0)
+             + (dechallenge == "positive")
+             + np.select([rechallenge == "positive", rechallenge == "negative"], [2, -1], 0)
+             + np.select([alternative == "yes", alternative == "no"], [-1, 2], 0))
+    who_umc = np.select(
+        [~has_drug | ~has_event, temporal == "implausible", temporal == "unknown",
+         (alternative == "no") & (dechallenge == "positive") & (rechallenge == "positive"),
+         (alternative == "no") & (dechallenge == "positive")],
+        ["Unassessable", "Unlikely", "Conditional", "Certain", "Probable"],
+        "Possible",
+    )
+    return pd.DataFrame({"temporal_relation": temporal, "naranjo_score": score,
+                         "naranjo_category": naranjo_category(score), "who_umc_category": who_umc}, index=cases.index)
+
+
+def assess_case(case, listedness=None):
+    """CAUSALITY_COLUMNS of one case (a field -> value mapping), as a dict."""
+    return assess(pd.DataFrame([case]), listedness).iloc[0].to_dict()
@@ -0,0 +1,72 @@
+"""Command-line entry point for the batch jobs (pvcore.batch), for nightly runs without the UI.
+
+    python -m pvcore validate cases.csv valid_cases.csv
+    python -m pvcore causality cases.csv assessed_cases.csv
+    python -m pvcore screen articles.csv screened.csv --data-type "Single Patient"
+    python -m pvcore obligations cases.csv obligations.csv --authority FDA
+    python -m pvcore pdf cases.csv icsrs.zip --workers 8 --chunksize 32
+    python -m pvcore faers faers_ascii_2024Q1/ pv_data/
+    python -m pvcore medline pubmed_baseline/ pv_data/
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from pvcore import batch
+from pvcore.parallel import default_workers
+
+
+def _progress(rows, seconds):
+    print(f"\r{rows:,} rows  {rows / max(seconds, 1e-9):,.0f} rows/sec", end="", file=sys.stderr, flush=True)
+
+
+def parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("input", type=Path)
+    common.add_argument("output", type=Path)
+    common.add_argument("--workers", type=int, default=None, help=f"worker processes (default {default_workers()}; 1 runs in-process)")
+    common.add_argument("--chunksize", type=int, default=None, help="rows per chunk handed to a worker")
+    common.add_argument("--quiet", action="store_true", help="no progress on stderr")
+
+    main = argparse.ArgumentParser(prog="python -m pvcore", description=__doc__.splitlines()[0])
+    jobs = main.add_subparsers(dest="job", required=True)
+    jobs.add_parser("validate", parents=[common], help="check the four minimum criteria of each case")
+    jobs.add_parser("causality", parents=[common], help="suggest Naranjo scores and WHO-UMC categories per case")
+    screen = jobs.add_parser("screen", parents=[common], help="screen literature articles for ICSRs and listedness")
+    screen.add_argument("--data-type", default="Single Patient", choices=["Single Patient", "Aggregate"])
+    obligations = jobs.add_parser("obligations", parents=[common], help="reporting obligations and due dates per case")
+    obligations.add_argument("--authority", help="only this authority (default: all)")
+    obligations.add_argument("--rules", type=Path, help="reporting rules CSV (default: the built-in rules)")
+    jobs.add_parser("pdf", parents=[common], help="render one ICSR PDF per case into a ZIP")
+    jobs.add_parser("faers", parents=[common],
+                    help="load a FAERS quarterly ASCII extract (input directory) into a data directory's case store "
+                         "and warehouse; --workers does not apply")
+    jobs.add_parser("medline", parents=[common],
+                    help="index MEDLINE/PubMed XML files (input directory) for a data directory's literature search; "
+                         "--chunksize is articles per batch, --workers does not apply")
+    return main
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    options = {"workers": args.workers, "on_progress": None if args.quiet else _progress}
+    if args.chunksize:
+        options["chunksize"] = args.chunksize
+    if args.job == "screen":
+        options["data_type"] = args.data_type
+    if args.job == "obligations":
+        options.update(authority=args.authority, rules=args.rules)
+    if args.job in ("faers", "medline"):
+        options.pop("workers")
+    started = time.perf_counter()
+    summary = getattr(batch, args.job)(args.input, args.output, **options)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(json.dumps({"job": args.job, **summary, "seconds": round(time.perf_counter() - started, 2)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Compliance clock: due dates, days remaining and overdue status of reporting obligations.
+
+Day 0 is the clock-start date of an obligation (see pvcore.obligations) and
+the deadline is Day 0 plus the rule's 7, 15 or 90 calendar days, moved to
+the next working day of the authority's calendar when it falls on a weekend
+or holiday. All of it is datetime64[D] column arithmetic over the whole
+open-case set. DueBuckets counts obligations per authority and due day, so
+dashboard totals for any "as of" date are sums over days, not over cases.
+"""
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HOLIDAY_COLUMNS = ["authority", "date"]   # authority "*" applies to every authority
+CLOCK_STATUSES = ["Overdue", "Due Soon", "On Track"]
+WEEKMASK = "1111100"
+
+
+def load_holidays(path):
+    """Holiday dates per authority from a CSV with HOLIDAY_COLUMNS; empty if the file does not exist."""
+    if not Path(path).exists():
+        return {}
+    table = pd.read_csv(path, dtype=str, keep_default_na=False).reindex(columns=HOLIDAY_COLUMNS)
+    table["date"] = pd.to_datetime(table["date"], errors="coerce")
+    table = table.dropna(subset=["date"])
+    return {authority: group["date"].to_numpy().astype("datetime64[D]")
+            for authority, group in table.groupby(table["authority"].str.strip())}
+
+
+def calendars(authorities, holidays=None, weekmask=WEEKMASK):
+    """np.busdaycalendar per authority, with its own holidays and those listed for "*"."""
+    holidays = holidays or {}
+    shared = holidays.get("*", np.array([], dtype="datetime64[D]"))
+    return {authority: np.busdaycalendar(weekmask, np.concatenate([shared, holidays.get(authority, shared[:0])]))
+            for authority in authorities}
+
+
+def _today(today):
+    return np.datetime64(today or date.today(), "D")
+
+
+def clock(obligations, today=None, holidays=None, due_soon=3, completed=None):
+    """One row per open obligation with day_0, due_date, days_remaining and status.
+
+    completed is a DataFrame of case_id and authority pairs already reported
+    (e.g. SubmissionLog.acknowledged_cases()); their obligations are dropped.
+    """
+    table = obligations.table()
+    if completed is not None and len(completed):
+        done = pd.MultiIndex.from_frame(completed[["case_id", "authority"]].astype(str))
+        table = table[~pd.MultiIndex.from_frame(table[["case_id", "authority"]]).isin(done)]
+    due = table["due_date"].to_numpy().astype("datetime64[D]")
+    day_0 = due - table["due_days"].to_numpy().astype("timedelta64[D]")
+    authorities = table["authority"].to_numpy()
+    for authority, calendar in calendars(obligations.authorities, holidays).items():
+        rows = authorities == authority
+        if rows.any():
+            due[rows] = np.busday_offset(due[rows], 0, roll="forward", busdaycal=calendar)
+    remaining = (due - _today(today)).astype(np.int64)
+    status = np.select([remaining < 0, remaining <= due_soon], CLOCK_STATUSES[:2], CLOCK_STATUSES[2])
+    return table.assign(day_0=day_0, due_date=due, days_remaining=remaining, status=status).reset_index(drop=True)
+
+
+def at_risk(table, today=None, due_soon=3, limit=1000):
+    """The most urgent obligations of a clock table as of today: overdue or due within due_soon days."""
+    due = table["due_date"].to_numpy().astype("datetime64[D]")
+    urgent = np.flatnonzero(due <= _today(today) + np.timedelta64(due_soon, "D"))
+    urgent = urgent[np.argsort(due[urgent], kind="stable")[:limit]]
+    remaining = (due[urgent] - _today(today)).astype(np.int64)
+    return table.iloc[urgent].assign(days_remaining=remaining, status=np.where(remaining < 0, "Overdue", "Due Soon"))
+
+
+@dataclass
+class DueBuckets:
+    authorities: list
+    first_day: np.datetime64
+    counts: np.ndarray    # (authorities, days) obligations due on each day from first_day
+
+    @classmethod
+    def build(cls, table, authorities=None):
+        """Per-day counts of a clock table's due dates."""
+        authorities = list(authorities or dict.fromkeys(table["authority"]))
+        codes = pd.Categorical(table["authority"], categories=authorities).codes.astype(np.int64)
+        days = table["due_date"].to_numpy().astype("datetime64[D]").astype(np.int64)
+        first = days.min() if len(days) else _today(None).astype(np.int64)
+        span = int(days.max() - first + 1) if len(days) else 1
+        counts = np.bincount(codes * span + (days - first), minlength=len(authorities) * span)
+        return cls(authorities, np.datetime64(int(first), "D"), counts.reshape(len(authorities), span))
+
+    def _offset(self, day):
+        return int((np.datetime64(day, "D") - self.first_day).astype(np.int64))
+
+    def totals(self, today=None, due_soon=3):
+        """Overdue, due-soon and on-track counts per authority as of today."""
+        cumulative = np.concatenate([np.zeros((len(self.authorities), 1), np.int64), self.counts.cumsum(axis=1)], axis=1)
+        span = self.counts.shape[1]
+        before_today = cumulative[:, np.clip(self._offset(_today(today)), 0, span)]
+        through_soon = cumulative[:, np.clip(self._offset(_today(today)) + due_soon + 1, 0, span)]
+        return pd.DataFrame({"Authority": self.authorities, "Overdue": before_today,
+                             "Due Soon": through_soon - before_today, "On Track": cumulative[:, -1] - through_soon})
+
+    def per_day(self, start=None, days=30):
+        """Obligations due per day and authority for days days from start."""
+        offset = self._offset(_today(start))
+        columns = np.arange(offset, offset + days)
+        inside = (columns >= 0) & (columns < self.counts.shape[1])
+        counts = np.zeros((len(self.authorities), days), np.int64)
+        counts[:, inside] = self.counts[:, columns[inside]]
+        index = pd.date_range(pd.Timestamp(_today(start)), periods=days, freq="D", name="due_date")
+        return pd.DataFrame(counts.T, index=index, columns=self.authorities)
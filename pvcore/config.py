@@ -0,0 +1,10 @@
+"""Local paths shared by the persisted stores."""
+import os
+from pathlib import Path
+
+DATA_DIR = Path(os.environ.get("PV_DATA_DIR", "pv_data"))
+
+
+def data_path(name):
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / name
@@ -0,0 +1,164 @@
+"""Static page content shared by the app shell and the page modules."""
+
+APP_STYLE = """
+<style>
+/* Page background: soft sandy/light gradient */
+[data-testid="stAppViewContainer"] {
+    background: linear-gradient(135deg, 
+        #f4e1c1,   /* light sand */
+        #f9f2e7,   /* ivory */
+        #ffe7c4,   /* pale orange */
+        #fef9f0    /* cream */
+    );
+    background-size: 400% 400%;  /* gradient animation */
+    animation: gradientShift 25s ease infinite;
+    position: relative;
+}
+
+/* Sidebar background with similar sandy gradient */
+[data-testid="stSidebar"] {
+    background: linear-gradient(180deg, 
+        #f4e1c1, #f9f2e7, #ffe7c4, #fef9f0
+    );
+}
+
+/* Floating pill style */
+.pill {
+    position: fixed;
+    font-size: 50px;
+    animation: float 12s linear infinite;
+    opacity: 0.25;
+    text-shadow: 0 0 10px #fff, 0 0 20px #ff69b4, 0 0 30px #87CEEB;
+}
+
+/* Different positions and animation durations */
+.pill1 { left: 5%; animation-duration: 14s; }
+.pill2 { left: 20%; animation-duration: 18s; }
+.pill3 { left: 40%; animation-duration: 16s; }
+.pill4 { left: 60%; animation-duration: 20s; }
+.pill5 { left: 80%; animation-duration: 15s; }
+
+/* Floating animation */
+@keyframes float {
+    0% { top: 110%; transform: rotate(0deg); }
+    100% { top: -10%; transform: rotate(360deg); }
+}
+
+/* Gradient animation */
+@keyframes gradientShift {
+    0% { background-position: 0% 50%; }
+    50% { background-position: 100% 50%; }
+    100% { background-position: 0% 50%; }
+}
+</style>
+
+<div class="pill pill1">🟠</div>
+<div class="pill pill2">💊</div>
+<div class="pill pill3">🔵</div>
+<div class="pill pill4">🟢</div>
+<div class="pill pill5">📄</div>
+"""
+
+CASE_WORKFLOW = {
+    "Case Intake": "Initial receipt of the case from healthcare provider, patient, literature, or other sources; "
+                   "collection of all relevant information including demographics, medical history, suspect and concomitant drugs, and event details.",
+    "Triage": "Assessment of the case to determine priority and next steps. Includes evaluating seriousness, expectedness, and completeness, and routing to the appropriate team for processing.",
+    "Duplicate Check": "Comparison of the case with existing cases in the database to identify potential duplicates and prevent redundant reporting. Cases are marked as duplicate or unique.",
+    "Data Entry": "Accurate entry of case information into the safety database, including patient details, drug information, adverse events, lab results, and other relevant data.",
+    "Quality Review": "Medical review to evaluate clinical plausibility, completeness, and appropriate coding (e.g., MedDRA for events, WHO Drug for drugs). Ensures case is medically sound and complete.",
+    "Quality Control": "Verification of data accuracy, consistency, and compliance with internal SOPs and regulatory requirements. May overlap with quality review but focuses on correctness and completeness.",
+    "Regulatory Submission": "Preparation and submission of the case to regulatory authorities according to local and global regulations (e.g., CIOMS, E2B(R3) format). Includes tracking submissions and acknowledgments for serious or reportable cases."
+}
+
+URL_PSUR_GVP_MODULE_7 = "https://www.ema.europa.eu/en/documents/scientific-guideline/guideline-good-pharmacovigilance-practices-gvp-module-vii-periodic-safety-update-report_en.pdf"
+URL_PBRER_ICH_E2C_R2 = "https://database.ich.org/sites/default/files/E2C_R2_Guideline.pdf"
+URL_DSUR_ICH_E2F = "https://database.ich.org/sites/default/files/E2F_Guideline.pdf"
+
+AGGREGATE_REPORTS = {
+    "PSUR": {
+        "Frequency": "Periodic (6 months–3 years depending on lifecycle stage)",
+        "Regulatory_Region_Example": ["EU", "India", "Other global regulators"],
+        "Purpose": "Safety-focused: monitor cumulative safety data, detect new safety signals, evaluate risk-benefit",
+        "Key_Notes": [
+            "Primarily safety-oriented",
+            "Structured as per ICH E2C(R2) guidelines",
+            "Being gradually replaced in some regions by PBRER"
+        ],
+        "Link": [URL_PSUR_GVP_MODULE_7]
+    },
+    "PBRER": {
+        "Frequency": "Periodic (aligned with product lifecycle, similar to PSUR)",
+        "Regulatory_Region_Example": ["EMA", "FDA", "Global harmonized standard"],
+        "Purpose": "Integrated benefit-risk evaluation including safety and efficacy data",
+        "Key_Notes": [
+            "Modern standard replacing PSUR in many regions",
+            "Includes missing information and cumulative benefit-risk analysis",
+            "Based on ICH E2C(R2) guidelines"
+        ],
+        "Link": [URL_PBRER_ICH_E2C_R2]
+    },
+    "DSUR": {
+        "Frequency": "Annual",
+        "Regulatory_Region_Example": ["USA", "EU", "Global"],
+        "Purpose": "Safety monitoring during clinical development of investigational drugs",
+        "Key_Notes": [
+            "Pre-marketing report for clinical trials",
+            "Summarizes adverse events (AEs/SAEs) and risk evaluation",
+            "Based on ICH E2F guidelines"
+        ],
+        "Link": [URL_DSUR_ICH_E2F]
+    }
+}
+
+
+AUTHORITY_DETAILS = {
+    "FDA": {
+        "Region": "USA",
+        "Full Form": "Food and Drug Administration",
+        "Reporting Requirements": "IND Safety Reports (clinical trials), **PADER** (Periodic Adverse Drug Experience Report for marketed drugs)",
+        "Regulations": "21 CFR Part 312, 21 CFR Part 314",
+        "Submission Methods": "Electronic via FAERS (FDA Adverse Event Reporting System)",
+    },
+    "EMA": {
+        "Region": "Europe",
+        "Full Form": "European Medicines Agency",
+        "Reporting Requirements": "**PBRER (Periodic Benefit-Risk Evaluation Report)** for marketed drugs, SUSARs for clinical trials",
+        "Regulations": "EU Clinical Trials Regulation, Good Pharmacovigilance Practices (GVP)",
+        "Submission Methods": "EudraVigilance system",
+    },
+    "MHRA": {
+        "Region": "UK",
+        "Full Form": "Medicines and Healthcare products Regulatory Agency",
+        "Reporting Requirements": "Yellow Card Scheme for adverse events, PSUR/PBRER as applicable",
+        "Regulations": "UK Pharmacovigilance Legislation (post-Brexit)",
+        "Submission Methods": "MHRA Gateway",
+    },
+    "PMDA": {
+        "Region": "Japan",
+        "Full Form": "Pharmaceuticals and Medical Devices Agency",
+        "Reporting Requirements": "ADR reports, PBRER for marketed drugs",
+        "Regulations": "Japanese GCP, Japanese Pharmacovigilance Guidelines",
+        "Submission Methods": "PMDA portal electronic submission",
+    },
+    "Health Canada": {
+        "Region": "Canada",
+        "Full Form": "Health Canada",
+        "Reporting Requirements": "ADR reports, PBRER/PSUR as applicable, Special Access Program notifications",
+        "Regulations": "Food and Drugs Act, Canadian GVP guidelines",
+        "Submission Methods": "Canada Vigilance Program portal",
+    },
+    "CDSCO": {
+        "Region": "India",
+        "Full Form": "Central Drugs Standard Control Organization",
+        "Reporting Requirements": "ADR reports, PBRER/PSUR as applicable",
+        "Regulations": "Indian Pharmacovigilance Guidelines",
+        "Submission Methods": "CDSCO portal",
+    },
+    "TGA": {
+        "Region": "Australia",
+        "Full Form": "Therapeutic Goods Administration",
+        "Reporting Requirements": "ADR reports, PBRER/PSUR as applicable",
+        "Regulations": "Australian GVP guidelines",
+        "Submission Methods": "TGA portal",
+    },
+}
@@ -0,0 +1,177 @@
+"""Drug-name normalization: verbatim drug text to a canonical product.
+
+The dictionary (WHO-Drug style, one row per name with the ID and preferred
+name of its product) is loaded from a CSV. Verbatims are cleaned of
+strengths, dosage forms and salts ("PARACETAMOL 500MG TAB" -> "paracetamol")
+and matched exactly against the cleaned dictionary names, then by any single
+word, then by character n-gram similarity. Resolved verbatims are kept in a
+bounded LRU cache, and a batch resolves each distinct uncached verbatim once.
+"""
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pvcore.literature import normalize_term
+from pvcore.ngram import NgramIndex
+
+DICTIONARY_COLUMNS = ["drug_id", "preferred_name", "name"]
+# Columns added by DrugNormalizer.normalize_many; unresolved rows keep the verbatim as drug_name
+DRUG_COLUMNS = ["drug_id", "drug_name", "drug_match_score"]
+
+# Stand-in dictionary for the synthetic drugs, used when no dictionary file is loaded
+STANDIN_DICTIONARY = {
+    "D0001": ("Paracetamol", ["Acetaminophen", "APAP", "Tylenol", "Panadol", "Calpol"]),
+    "D0002": ("Ibuprofen", ["Advil", "Motrin", "Nurofen", "Brufen"]),
+    "D0003": ("Amoxicillin", ["Amoxycillin", "Amoxil"]),
+    "D0004": ("Metformin", ["Glucophage"]),
+    "D0005": ("Atorvastatin", ["Lipitor"]),
+    "D0006": ("Omeprazole", ["Prilosec", "Losec"]),
+    "D0007": ("Amlodipine", ["Norvasc", "Istin"]),
+    "D0008": ("Lisinopril", ["Zestril", "Prinivil"]),
+    "D0009": ("Sertraline", ["Zoloft", "Lustral"]),
+    "D0010": ("Warfarin", ["Coumadin", "Marevan"]),
+}
+
+_STRENGTH = re.compile(r"\b\d+(?:[.,]\d+)?\s*(?:mg|mcg|ug|µg|g|kg|ml|l|iu|units?|%)?(?:\s*/\s*\d*\s*(?:mg|ml|g|l|dose))?\b")
+_NOISE_WORDS = frozenset("""
+    tab tabs tablet tablets cap caps capsule capsules inj injection injections syrup susp suspension solution soln
+    sol oral po iv im sc cream ointment gel drops drop er sr xr xl cr dr ec mr film coated chewable dispersible
+    effervescent powder for infusion patch inhaler spray vial vials ampoule ampoules pfs pen liquid elixir
+    hydrochloride hcl sodium potassium calcium magnesium besylate besilate maleate mesylate succinate tartrate
+    citrate sulfate sulphate phosphate acetate bromide fumarate monohydrate dihydrate trihydrate
+""".split())
+
+
+def clean_drug_name(text):
+    """Normalized drug text without strengths, dosage forms and salts."""
+    words = _STRENGTH.sub(" ", normalize_term(text)).split()
+    kept = [word for word in words if word not in _NOISE_WORDS]
+    return " ".join(kept or words)
+
+
+class _LRUCache:
+    """Bounded mapping that evicts the least recently used entry; thread safe."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, keys):
+        """Cached values of keys, with None for the misses."""
+        found = []
+        with self._lock:
+            for key in keys:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                found.append(value)
+            self.hits += sum(value is not None for value in found)
+            self.misses += sum(value is None for value in found)
+        return found
+
+    def put_many(self, items):
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class DrugNormalizer:
+    def __init__(self, dictionary, cache_size=100_000, min_score=0.7):
+        dictionary = dictionary.reindex(columns=DICTIONARY_COLUMNS).fillna("").astype(str)
+        # A product's preferred name is one of its names
+        preferred = dictionary[["drug_id", "preferred_name"]].drop_duplicates().assign(name=lambda t: t["preferred_name"])
+        names = pd.concat([preferred, dictionary], ignore_index=True)
+        names["key"] = [clean_drug_name(name) for name in names["name"]]
+        names = names[names["key"] != ""].drop_duplicates("key").reset_index(drop=True)
+        self.drug_ids = names["drug_id"].to_numpy(dtype=object)
+        self.preferred_names = names["preferred_name"].to_numpy(dtype=object)
+        self.keys = pd.Index(names["key"])
+        self.ngrams = NgramIndex.build(list(names["key"]))
+        self.min_score = min_score
+        self.cache = _LRUCache(cache_size)
+
+    @classmethod
+    def from_csv(cls, path, **options):
+        """Load a dictionary CSV with drug_id, preferred_name and name columns."""
+        return cls(pd.read_csv(path, dtype=str, keep_default_na=False), **options)
+
+    @classmethod
+    def standin(cls, **options):
+        rows = [(drug_id, preferred, name) for drug_id, (preferred, synonyms) in STANDIN_DICTIONARY.items()
+                for name in [preferred] + synonyms]
+        return cls(pd.DataFrame(rows, columns=DICTIONARY_COLUMNS), **options)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _resolve(self, verbatims):
+        # Dictionary positions and scores of cleaned verbatims; -1 where unresolved
+        cleaned = [clean_drug_name(text) for text in verbatims]
+        positions = self.keys.get_indexer(cleaned)
+        scores = np.where(positions >= 0, 1.0, 0.0)
+        pending = np.flatnonzero(positions < 0)
+        if len(pending):
+            # Any one word that is a dictionary name, e.g. "paracetamol gsk"
+            words = pd.Series([cleaned[i].split() for i in pending], index=pending).explode().dropna()
+            word_positions = pd.Series(self.keys.get_indexer(words), index=words.index)
+            word_positions = word_positions[word_positions >= 0]
+            first = word_positions[~word_positions.index.duplicated()]
+            positions[first.index.to_numpy()] = first.to_numpy()
+            scores[first.index.to_numpy()] = 1.0
+        for i in np.flatnonzero(positions < 0):
+            if cleaned[i]:
+                found, found_scores = self.ngrams.search(cleaned[i], 1, self.min_score)
+                if len(found):
+                    positions[i], scores[i] = found[0], found_scores[0]
+        return positions, scores
+
+    def normalize_many(self, verbatims):
+        """DRUG_COLUMNS for a column of verbatim drug names, aligned with the input."""
+        codes, uniques = pd.factorize(pd.Series(verbatims, dtype=object).fillna("").astype(str))
+        resolved = self.cache.get_many(uniques)
+        missing = [i for i, value in enumerate(resolved) if value is None]
+        if missing:
+            positions, scores = self._resolve([uniques[i] for i in missing])
+            new = [(self.drug_ids[p], self.preferred_names[p], score) if p >= 0 else ("", uniques[i].strip(), 0.0)
+                   for i, p, score in zip(missing, positions, scores)]
+            self.cache.put_many(zip((uniques[i] for i in missing), new))
+            for i, value in zip(missing, new):
+                resolved[i] = value
+        table = pd.DataFrame(resolved, columns=DRUG_COLUMNS).iloc[codes] if len(uniques) \
+            else pd.DataFrame(columns=DRUG_COLUMNS)
+        table.index = verbatims.index if isinstance(verbatims, pd.Series) else pd.RangeIndex(len(codes))
+        return table
+
+    def normalize(self, text):
+        """DRUG_COLUMNS of one verbatim drug name, as a dict."""
+        return self.normalize_many([text]).iloc[0].to_dict()
+
+    def canonical(self, verbatims):
+        """Preferred product names of a column of verbatims; unresolved ones are kept as given."""
+        return self.normalize_many(verbatims)["drug_name"]
+
+
+_normalizers = {}
+_normalizers_lock = threading.Lock()
+
+
+def get_drug_normalizer(path):
+    """The process-wide DrugNormalizer for a dictionary CSV, or for the stand-in one if it does not exist."""
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns if path.exists() else None)
+    with _normalizers_lock:
+        if key not in _normalizers:
+            _normalizers[key] = DrugNormalizer.from_csv(path) if path.exists() else DrugNormalizer.standin()
+        return _normalizers[key]
@@ -0,0 +1,300 @@
+"""ICSR duplicate detection with blocking and MinHash/LSH candidate generation.
+
+Each case is reduced to a MinHash signature of the character 3-grams of its
+suspected drug, AE verbatim and reporter. Signatures are cut into LSH bands
+and only cases sharing a band bucket within the same blocking key (normalized
+country by default; any of gender, country or the text fields) become
+candidates, so a new case is scored against a handful of cases rather than
+the whole database. Candidates are scored field by field
+(age, gender, country, drug, event, reporter, dates) and pairs at or above
+the threshold are duplicates.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from pvcore.literature import normalize_terms
+from pvcore.parallel import process_pool
+
+TEXT_FIELDS = ["suspected_drug", "ae_verbatim", "reporter_name"]
+DATE_FIELDS = ["case_received_date", "start_date"]
+WEIGHTS = {
+    "suspected_drug": 2.0, "ae_verbatim": 2.0, "reporter_name": 1.0, "patient_age": 1.0,
+    "gender": 0.5, "country": 0.5, "case_received_date": 0.5, "start_date": 1.0,
+}
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK = np.uint64((1 << 32) - 1)
+
+
+def _permutations(num_perm, seed):
+    rng = np.random.default_rng(seed)
+    return (rng.integers(1, 1 << 32, num_perm, dtype=np.uint64),
+            rng.integers(0, 1 << 32, num_perm, dtype=np.uint64))
+
+
+def _shingle_hashes(text, n=3):
+    padded = f" {text} "
+    return [zlib.crc32(padded[i:i + n].encode()) for i in range(max(len(padded) - n + 1, 1))]
+
+
+def minhash(texts, num_perm=64, seed=1, block_shingles=50_000):
+    """MinHash signatures (len(texts) x num_perm, uint32); empty texts get all-max rows."""
+    # Drug and event verbatims repeat a lot: hash each distinct text once
+    codes, texts = pd.factorize(pd.Series(texts, dtype=object))
+    texts = list(texts)
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    a, b = _permutations(num_perm, seed)
+    position = 0
+    while position < len(texts):
+        # Hash a slice of records at a time to bound the permutation matrix
+        rows, hashes, lengths = [], [], []
+        while position < len(texts) and len(hashes) < block_shingles:
+            if texts[position]:
+                shingles = _shingle_hashes(texts[position])
+                rows.append(position)
+                hashes.extend(shingles)
+                lengths.append(len(shingles))
+            position += 1
+        if not rows:
+            continue
+        values = np.asarray(hashes, dtype=np.uint64)
+        # (a * x + b) mod p, truncated to 32 bits
+        permuted = (((a[:, None] * values[None, :] + b[:, None]) % _PRIME) & _MASK).astype(np.uint32)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[rows] = np.minimum.reduceat(permuted, starts, axis=1).T
+    return signatures[codes]
+
+
+def prepare_cases(cases):
+    """Normalized matching columns for a case table (any subset of the ICSR fields)."""
+    def column(name):
+        return cases[name] if name in cases else pd.Series("", index=cases.index)
+
+    prepared = pd.DataFrame(index=cases.index)
+    for name in TEXT_FIELDS + ["gender", "country"]:
+        prepared[name] = normalize_terms(column(name))
+    prepared.loc[prepared["gender"] == "unknown", "gender"] = ""
+    prepared["patient_age"] = pd.to_numeric(column("patient_age"), errors="coerce")
+    for name in DATE_FIELDS:
+        prepared[name] = pd.to_datetime(column(name), errors="coerce")
+    return prepared.reset_index(drop=True)
+
+
+def _signatures(prepared, num_perm, field_perm):
+    # One signature over the combined text for LSH, one small one per field for scoring
+    combined = prepared["suspected_drug"] + " | " + prepared["ae_verbatim"] + " | " + prepared["reporter_name"]
+    combined = combined.where(prepared[TEXT_FIELDS].ne("").any(axis=1), "")
+    fields = {name: minhash(prepared[name].tolist(), field_perm, seed=i + 2) for i, name in enumerate(TEXT_FIELDS)}
+    return minhash(combined.tolist(), num_perm), fields
+
+
+def _chunked_signatures(prepared, num_perm, field_perm, workers, chunksize=20_000):
+    chunks = [prepared.iloc[i:i + chunksize] for i in range(0, len(prepared), chunksize)]
+    if workers == 1 or len(chunks) < 2:
+        results = [_signatures(chunk, num_perm, field_perm) for chunk in chunks]
+    else:
+        with process_pool(workers) as pool:
+            results = list(pool.map(_signatures, chunks, [num_perm] * len(chunks), [field_perm] * len(chunks)))
+    if not results:
+        return np.empty((0, num_perm), np.uint32), {n: np.empty((0, field_perm), np.uint32) for n in TEXT_FIELDS}
+    return (np.concatenate([r[0] for r in results]),
+            {name: np.concatenate([r[1][name] for r in results]) for name in TEXT_FIELDS})
+
+
+def band_keys(signatures, bands):
+    """One uint64 key per (case, band); rows of a band are folded with odd multipliers."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    folded = signatures[:, :bands * rows].reshape(n, bands, rows).astype(np.uint64)
+    multipliers = (np.arange(rows, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+    keys = (folded * multipliers).sum(axis=2, dtype=np.uint64)
+    return keys ^ (np.arange(bands, dtype=np.uint64) << np.uint64(56))
+
+
+def _field_scores(left, right, prepared_left, prepared_right, sig_left, sig_right):
+    # Weighted similarity over the fields present on both sides
+    total = np.zeros(len(left))
+    weight = np.zeros(len(left))
+
+    def add(name, similarity, present):
+        w = WEIGHTS[name] * present
+        np.add(total, w * np.where(present, similarity, 0), out=total)
+        np.add(weight, w, out=weight)
+
+    for name in TEXT_FIELDS:
+        a, b = sig_left[name][left], sig_right[name][right]
+        present = (np.asarray(prepared_left[name])[left] != "") & (np.asarray(prepared_right[name])[right] != "")
+        add(name, (a == b).mean(axis=1), present)
+    for name in ["gender", "country"]:
+        a, b = np.asarray(prepared_left[name])[left], np.asarray(prepared_right[name])[right]
+        add(name, a == b, (a != "") & (b != ""))
+    a, b = np.asarray(prepared_left["patient_age"])[left], np.asarray(prepared_right["patient_age"])[right]
+    add("patient_age", np.abs(a - b) <= 1, ~np.isnan(a) & ~np.isnan(b))
+    for name in DATE_FIELDS:
+        a, b = np.asarray(prepared_left[name])[left], np.asarray(prepared_right[name])[right]
+        days = np.abs((a - b) / np.timedelta64(1, "D"))
+        add(name, np.select([days <= 3, days <= 30], [1.0, 0.5], 0.0), ~np.isnan(days))
+
+    with np.errstate(invalid="ignore"):
+        return np.where(weight > 0, total / weight, 0.0)
+
+
+def _score_chunk(args):
+    left, right, prepared, field_sigs = args
+    return _field_scores(left, right, prepared, prepared, field_sigs, field_sigs)
+
+
+def _connected_labels(n, left, right):
+    # Min-label propagation with pointer jumping
+    labels = np.arange(n)
+    while True:
+        low = np.minimum(labels[left], labels[right])
+        before = labels.copy()
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+def _appended(array, values, size):
+    # array[:size] followed by values; the capacity doubles when full, so n appends copy O(n) rows in all
+    if size + len(values) > len(array):
+        grown = np.empty((max(2 * len(array), size + len(values), 1024),) + array.shape[1:], dtype=array.dtype)
+        grown[:size] = array[:size]
+        array = grown
+    array[size:size + len(values)] = values
+    return array
+
+
+class DuplicateIndex:
+    """Cases indexed by LSH band bucket, for checking new cases as they arrive."""
+
+    def __init__(self, num_perm=64, bands=16, field_perm=32, threshold=0.8, block_on=("country",)):
+        self.num_perm, self.bands, self.field_perm = num_perm, bands, field_perm
+        self.threshold, self.block_on = threshold, list(block_on)
+        self.case_ids = []
+        # Matching columns and field signatures of the indexed cases, with spare rows to grow into
+        self._columns = {name: values.to_numpy(dtype=np.float64 if name == "patient_age" else values.dtype)
+                         for name, values in prepare_cases(pd.DataFrame()).items()}
+        self._field_sigs = {name: np.empty((0, field_perm), np.uint32) for name in TEXT_FIELDS}
+        self.buckets = {}
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    @property
+    def prepared(self):
+        """prepare_cases columns of the indexed cases, as arrays."""
+        return {name: values[:len(self)] for name, values in self._columns.items()}
+
+    @property
+    def field_sigs(self):
+        return {name: values[:len(self)] for name, values in self._field_sigs.items()}
+
+    def _keys(self, prepared, signatures):
+        keys = band_keys(signatures, self.bands)
+        if self.block_on:
+            blocks = prepared[self.block_on].astype(str).agg("|".join, axis=1)
+            keys ^= np.array([zlib.crc32(b.encode()) for b in blocks], dtype=np.uint64)[:, None] << np.uint64(24)
+        keys[(signatures == np.iinfo(np.uint32).max).all(axis=1)] = 0  # no text: never a candidate
+        return keys
+
+    def add(self, cases, id_col="case_id", workers=1):
+        """Index a case table; returns the positions assigned to its rows."""
+        prepared = prepare_cases(cases)
+        signatures, field_sigs = _chunked_signatures(prepared, self.num_perm, self.field_perm, workers)
+        start = len(self.case_ids)
+        keys = self._keys(prepared, signatures)
+        for offset, row in enumerate(keys.tolist()):
+            for key in row:
+                if key:
+                    self.buckets.setdefault(key, []).append(start + offset)
+
+        for name, values in self._columns.items():
+            self._columns[name] = _appended(values, prepared[name].to_numpy(dtype=values.dtype), start)
+        for name in TEXT_FIELDS:
+            self._field_sigs[name] = _appended(self._field_sigs[name], field_sigs[name], start)
+        ids = cases[id_col].astype(str).tolist() if id_col in cases else [str(start + i) for i in range(len(cases))]
+        self.case_ids.extend(ids)
+        return np.arange(start, start + len(cases))
+
+    def query(self, cases, min_score=None):
+        """Score each case against its LSH candidates among the indexed cases.
+
+        Returns one row per candidate pair at or above min_score (default: the
+        index threshold) with the query row position, the matched case_id and
+        the score.
+        """
+        min_score = self.threshold if min_score is None else min_score
+        prepared = prepare_cases(cases)
+        signatures, field_sigs = _signatures(prepared, self.num_perm, self.field_perm)
+        keys = self._keys(prepared, signatures)
+
+        left, right = [], []
+        for position, row in enumerate(keys.tolist()):
+            candidates = {match for key in row if key for match in self.buckets.get(key, ())}
+            left.extend([position] * len(candidates))
+            right.extend(candidates)
+        left, right = np.asarray(left, dtype=np.int64), np.asarray(right, dtype=np.int64)
+        scores = _field_scores(left, right, prepared, self.prepared, field_sigs, self.field_sigs)
+        keep = scores >= min_score
+        return pd.DataFrame({
+            "query_row": left[keep],
+            "duplicate_of": [self.case_ids[i] for i in right[keep].tolist()],
+            "score": scores[keep],
+        }).sort_values(["query_row", "score"], ascending=[True, False], ignore_index=True)
+
+
+def candidate_pairs(keys, max_window=50):
+    """Distinct (i, j) pairs, i < j, sharing a band key; huge buckets are windowed."""
+    n, bands = keys.shape
+    flat = keys.ravel()
+    rows = np.repeat(np.arange(n), bands)
+    used = flat != 0
+    flat, rows = flat[used], rows[used]
+    order = np.argsort(flat, kind="stable")
+    flat, rows = flat[order], rows[order]
+
+    pairs = []
+    for step in range(1, max_window + 1):
+        same = flat[step:] == flat[:-step]
+        if not same.any():
+            break
+        i, j = rows[:-step][same], rows[step:][same]
+        pairs.append(np.minimum(i, j) * n + np.maximum(i, j))
+    if not pairs:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    codes = np.sort(np.concatenate(pairs))
+    codes = codes[np.concatenate(([True], codes[1:] != codes[:-1])) & (codes // n != codes % n)]
+    return codes // n, codes % n
+
+
+def cluster_duplicates(cases, workers=None, threshold=0.8, num_perm=64, bands=16, field_perm=32,
+                       block_on=("country",), pair_chunk=500_000):
+    """Cluster a whole backlog; adds duplicate_group (smallest member row) and group_size columns.
+
+    Signatures and pair scoring run across worker processes.
+    """
+    index = DuplicateIndex(num_perm, bands, field_perm, threshold, block_on)
+    prepared = prepare_cases(cases)
+    signatures, field_sigs = _chunked_signatures(prepared, num_perm, field_perm, workers)
+    left, right = candidate_pairs(index._keys(prepared, signatures))
+
+    chunks = [(left[i:i + pair_chunk], right[i:i + pair_chunk], prepared, field_sigs)
+              for i in range(0, len(left), pair_chunk)]
+    if workers == 1 or len(chunks) < 2:
+        scores = [_score_chunk(chunk) for chunk in chunks]
+    else:
+        with process_pool(workers) as pool:
+            scores = list(pool.map(_score_chunk, chunks))
+    scores = np.concatenate(scores) if scores else np.empty(0)
+
+    duplicate = scores >= threshold
+    labels = _connected_labels(len(cases), left[duplicate], right[duplicate])
+    clustered = cases.reset_index(drop=True).copy()
+    clustered["duplicate_group"] = labels
+    clustered["group_size"] = np.bincount(labels, minlength=len(cases))[labels]
+    return clustered
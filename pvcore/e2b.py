@@ -0,0 +1,380 @@
+"""Streaming ICH E2B(R3) import and export for the dashboard's ICSR fields.
+
+Covers the subset of E2B(R3) data elements the ICSR Processing tabs
+collect (C.1 identification, C.2 primary source, D patient, E reaction,
+G drug, G.k.9 causality, H narrative). Dashboard fields with no E2B(R3)
+element of their own (dechallenge, parent case status) travel as
+local-code observations so a file written here reads back unchanged.
+
+Both directions work one ICSR message at a time: the importer uses
+iterparse and clears every message once it is read, the exporter writes
+each case as soon as it gets it. Memory stays flat whatever the file size.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime
+from xml.etree import ElementTree
+from xml.sax.saxutils import XMLGenerator
+
+import pandas as pd
+
+from pvcore.icsr import ICSR_FIELDS
+
+HL7 = "urn:hl7-org:v3"
+XSI = "http://www.w3.org/2001/XMLSchema-instance"
+NS = {"h": HL7}
+
+OID_CASE_ID = "2.16.840.1.113883.3.989.2.1.3.1"
+OID_BATCH_ID = "2.16.840.1.113883.3.989.2.1.3.22"
+OID_OBSERVATION = "2.16.840.1.113883.3.989.2.1.1.19"
+OID_ORGANIZER = "2.16.840.1.113883.3.989.2.1.1.20"
+OID_CHARACTERISTIC = "2.16.840.1.113883.3.989.2.1.1.23"
+OID_REPORT_TYPE = "2.16.840.1.113883.3.989.2.1.1.2"
+OID_OUTCOME = "2.16.840.1.113883.3.989.2.1.1.11"
+OID_RECHALLENGE = "2.16.840.1.113883.3.989.2.1.1.16"
+OID_ROUTE = "0.4.0.127.0.16.1.1.2.1"
+OID_MEDDRA = "2.16.840.1.113883.6.163"
+OID_SEX = "1.0.5218"
+OID_QUALIFICATION = "2.16.840.1.113883.3.989.2.1.1.6"
+OID_LOCAL = "2.16.840.1.113883.3.989.5.1.3.2.1.1"  # sender-defined codes
+
+REPORT_TYPES = {"Spontaneous": "1", "Clinical Trial": "2", "Other": "3", "Literature": "1"}
+SEXES = {"Male": "1", "Female": "2"}
+OUTCOMES = {"Recovered": "1", "Recovering": "2", "Not Recovered": "3", "Fatal": "5", "Unknown": "0"}
+ROUTES = {"Oral": "048", "IV": "042", "IM": "030", "Subcutaneous": "058", "Other": "050"}
+RECHALLENGES = {"Positive": "1", "Negative": "2", "Not Applicable": "4"}
+SERIOUSNESS_CODES = {
+    "Death": "34", "Life Threatening": "21", "Inpatient Hospitalization": "33",
+    "Disability": "35", "Congenital Anomaly": "12", "Medically Significant": "26",
+}
+AGE_CODE, WEIGHT_CODE, HEIGHT_CODE, REACTION_CODE, OUTCOME_CODE = "3", "7", "17", "29", "27"
+INDICATION_CODE, RECHALLENGE_CODE, CAUSALITY_CODE, HISTORY_CODE = "19", "31", "39", "18"
+DRUG_ORGANIZER, HISTORY_ORGANIZER = "4", "1"
+
+
+def _hl7_date(value):
+    if value in (None, "") or pd.isna(value):
+        return ""
+    if isinstance(value, (date, datetime, pd.Timestamp)):
+        return value.strftime("%Y%m%d")
+    return str(value).replace("-", "")[:8]
+
+
+def _iso_date(value):
+    return f"{value[:4]}-{value[4:6]}-{value[6:8]}" if value and len(value) >= 8 else value or ""
+
+
+def _text(value):
+    return "" if value is None or (not isinstance(value, str) and pd.isna(value)) else str(value)
+
+
+# ---------------- EXPORT ----------------
+
+class _Writer:
+    def __init__(self, fileobj):
+        self._xml = XMLGenerator(fileobj, encoding="utf-8", short_empty_elements=True)
+
+    def start(self):
+        self._xml.startDocument()
+
+    def end(self):
+        self._xml.endDocument()
+
+    @contextmanager
+    def element(self, tag, **attrs):
+        # xsi__type -> xsi:type; empty attributes are left out
+        self._xml.startElement(tag, {k.replace("__", ":"): v for k, v in attrs.items() if v != ""})
+        yield
+        self._xml.endElement(tag)
+
+    def empty(self, tag, **attrs):
+        with self.element(tag, **attrs):
+            pass
+
+    def text(self, tag, value, **attrs):
+        with self.element(tag, **attrs):
+            self._xml.characters(value)
+
+    def coded(self, tag, code, code_system, original_text="", **attrs):
+        # Coded value; originalText keeps the dashboard label for round trips
+        with self.element(tag, code=code, codeSystem=code_system, **attrs):
+            if original_text:
+                self.text("originalText", original_text)
+
+    def observation(self, obs_code, obs_code_system=OID_OBSERVATION, original_text="", **value_attrs):
+        with self.element("observation", classCode="OBS", moodCode="EVN"):
+            self.empty("code", code=obs_code, codeSystem=obs_code_system)
+            with self.element("value", **value_attrs):
+                if original_text:
+                    self.text("originalText", original_text)
+
+
+def _write_case(w, case):
+    get = lambda key: _text(case.get(key))  # noqa: E731
+    case_id = get("case_id")
+    received = _hl7_date(case.get("case_received_date"))
+
+    with w.element("PORR_IN049016UV"):
+        w.empty("id", root=OID_CASE_ID, extension=case_id)
+        w.empty("creationTime", value=datetime.now().strftime("%Y%m%d%H%M%S"))
+        with w.element("controlActProcess", classCode="CACT", moodCode="EVN"), \
+                w.element("subject", typeCode="SUBJ"), \
+                w.element("investigationEvent", classCode="INVSTG", moodCode="EVN"):
+            w.empty("id", root=OID_CASE_ID, extension=case_id)
+            w.text("text", get("case_summary"))
+            with w.element("effectiveTime"):
+                w.empty("low", value=received)
+            w.empty("availabilityTime", value=received)
+
+            with w.element("component", typeCode="COMP"), \
+                    w.element("adverseEventAssessment", classCode="INVSTG", moodCode="EVN"):
+                with w.element("subject1", typeCode="SBJ"), w.element("primaryRole", classCode="INVSBJ"):
+                    _write_patient(w, get)
+                with w.element("component1", typeCode="COMP"), \
+                        w.element("causalityAssessment", classCode="OBS", moodCode="EVN"):
+                    w.empty("code", code=CAUSALITY_CODE, codeSystem=OID_OBSERVATION)
+                    w.text("value", get("causality_result"), xsi__type="ST")
+                    with w.element("methodCode"):
+                        w.text("originalText", get("causality_method"))
+                    w.text("text", get("reporter_comments"))
+
+            with w.element("outboundRelationship", typeCode="SPRT"), \
+                    w.element("relatedInvestigation", classCode="INVSTG", moodCode="EVN"):
+                w.empty("code", code="2", codeSystem="2.16.840.1.113883.3.989.2.1.1.22")
+                with w.element("subjectOf2", typeCode="SUBJ"), \
+                        w.element("controlActEvent", classCode="CACT", moodCode="EVN"), \
+                        w.element("author", typeCode="AUT"), \
+                        w.element("assignedEntity", classCode="ASSIGNED"):
+                    w.empty("telecom", value=f"tel:{get('reporter_contact')}")
+                    w.empty("telecom", value=f"mailto:{get('reporter_email')}")
+                    with w.element("assignedPerson", classCode="PSN", determinerCode="INSTANCE"):
+                        with w.element("name"):
+                            w.text("given", get("reporter_name"))
+                        with w.element("asQualifiedEntity", classCode="QUAL"):
+                            w.coded("code", "", OID_QUALIFICATION, get("reporter_qualification"))
+                        with w.element("asLocatedEntity", classCode="LOCE"), w.element("location"):
+                            w.empty("code", code=get("country"), codeSystem="1.0.3166.1.2.2")
+
+            with w.element("outboundRelationship", typeCode="REFR"), \
+                    w.element("relatedInvestigation", classCode="INVSTG", moodCode="EVN"):
+                w.empty("id", root=OID_CASE_ID, extension=get("parent_case_id"))
+                w.text("text", get("related_cases"))
+                w.coded("statusCode", "", OID_LOCAL, get("parent_case_status"))
+
+            with w.element("subjectOf2", typeCode="SUBJ"), \
+                    w.element("investigationCharacteristic", classCode="OBS", moodCode="EVN"):
+                w.empty("code", code="1", codeSystem=OID_CHARACTERISTIC)
+                w.coded("value", REPORT_TYPES.get(get("report_type"), "3"), OID_REPORT_TYPE, get("report_type"),
+                        xsi__type="CE")
+
+
+def _write_patient(w, get):
+    with w.element("player1", classCode="PSN", determinerCode="INSTANCE"):
+        gender = get("gender")
+        if gender in SEXES:
+            w.coded("administrativeGenderCode", SEXES[gender], OID_SEX, gender)
+        else:
+            with w.element("administrativeGenderCode", nullFlavor="UNK"):
+                w.text("originalText", gender)
+    for code, key, unit in [(AGE_CODE, "patient_age", "a"), (WEIGHT_CODE, "weight", "kg"), (HEIGHT_CODE, "height", "cm")]:
+        if get(key):
+            with w.element("subjectOf2", typeCode="SBJ"):
+                w.observation(code, xsi__type="PQ", value=get(key), unit=unit)
+
+    with w.element("subjectOf2", typeCode="SBJ"), w.element("organizer", classCode="CATEGORY", moodCode="EVN"):
+        w.empty("code", code=HISTORY_ORGANIZER, codeSystem=OID_ORGANIZER)
+        with w.element("component", typeCode="COMP"):
+            w.observation(HISTORY_CODE, xsi__type="ED", original_text=get("medical_history"))
+
+    with w.element("subjectOf2", typeCode="SBJ"), w.element("observation", classCode="OBS", moodCode="EVN"):
+        w.empty("code", code=REACTION_CODE, codeSystem=OID_OBSERVATION)
+        w.coded("value", get("ae_meddra"), OID_MEDDRA, get("ae_verbatim"), xsi__type="CE")
+        seriousness_detail = get("seriousness_detail")
+        if get("seriousness") == "Serious" and seriousness_detail in SERIOUSNESS_CODES:
+            with w.element("outboundRelationship2", typeCode="PERT"):
+                w.observation(SERIOUSNESS_CODES[seriousness_detail], xsi__type="BL", value="true")
+        with w.element("outboundRelationship2", typeCode="PERT"):
+            w.observation(OUTCOME_CODE, xsi__type="CE", code=OUTCOMES.get(get("ae_outcome"), "0"),
+                          codeSystem=OID_OUTCOME, original_text=get("ae_outcome"))
+
+    with w.element("subjectOf2", typeCode="SBJ"), w.element("organizer", classCode="CATEGORY", moodCode="EVN"):
+        w.empty("code", code=DRUG_ORGANIZER, codeSystem=OID_ORGANIZER)
+        with w.element("component", typeCode="COMP"), \
+                w.element("substanceAdministration", classCode="SBADM", moodCode="EVN"):
+            with w.element("consumable", typeCode="CSM"), w.element("instanceOfKind", classCode="INST"), \
+                    w.element("kindOfProduct", classCode="MMAT", determinerCode="KIND"):
+                w.text("name", get("suspected_drug"))
+            with w.element("outboundRelationship2", typeCode="COMP"), \
+                    w.element("substanceAdministration", classCode="SBADM", moodCode="EVN"):
+                w.text("text", get("dose"))
+                with w.element("effectiveTime", xsi__type="IVL_TS"):
+                    w.empty("low", value=_hl7_date(get("start_date")))
+                    w.empty("high", value=_hl7_date(get("end_date")))
+                w.coded("routeCode", ROUTES.get(get("route"), "050"), OID_ROUTE, get("route"))
+            with w.element("inboundRelationship", typeCode="RSON"):
+                w.observation(INDICATION_CODE, xsi__type="CE", original_text=get("indication"))
+            with w.element("outboundRelationship1", typeCode="PERT"):
+                w.observation(RECHALLENGE_CODE, xsi__type="CE", code=RECHALLENGES.get(get("rechallenge"), "4"),
+                              codeSystem=OID_RECHALLENGE, original_text=get("rechallenge"))
+            with w.element("outboundRelationship1", typeCode="PERT"):
+                w.observation("dechallenge", OID_LOCAL, xsi__type="CE", original_text=get("dechallenge"))
+
+
+def write_e2b(cases, fileobj, batch_id="PVHUB-BATCH"):
+    """Write cases (an iterable of field dicts) as one E2B(R3) batch to a binary file.
+
+    Returns the number of ICSR messages written.
+    """
+    w = _Writer(fileobj)
+    w.start()
+    count = 0
+    with w.element("MCCI_IN200100UV01", xmlns=HL7, xmlns__xsi=XSI, ITSVersion="XML_1.0"):
+        w.empty("id", root=OID_BATCH_ID, extension=batch_id)
+        w.empty("creationTime", value=datetime.now().strftime("%Y%m%d%H%M%S"))
+        for case in cases:
+            _write_case(w, case)
+            count += 1
+    w.end()
+    return count
+
+
+# ---------------- IMPORT ----------------
+
+def _find(elem, path, attr=None):
+    node = elem.find(path, NS)
+    if node is None:
+        return ""
+    return node.get(attr, "") if attr else (node.text or "")
+
+
+def _coded_label(node, labels):
+    # Dashboard label from originalText, else from the code
+    if node is None:
+        return ""
+    text = node.find("h:originalText", NS)
+    if text is not None and text.text:
+        return text.text
+    by_code = {code: label for label, code in labels.items()}
+    return by_code.get(node.get("code", ""), "")
+
+
+def _observations(parent, path):
+    return {
+        obs.find("h:code", NS).get("code"): obs
+        for obs in parent.iterfind(path, NS)
+        if obs.find("h:code", NS) is not None
+    }
+
+
+def _organizer(role, code):
+    for organizer in role.iterfind("h:subjectOf2/h:organizer", NS):
+        if _find(organizer, "h:code", "code") == code:
+            return organizer
+    return None
+
+
+def parse_icsr(message):
+    """Dashboard fields of one PORR_IN049016UV element."""
+    event = message.find("h:controlActProcess/h:subject/h:investigationEvent", NS)
+    if event is None:
+        return {}
+    role = event.find("h:component/h:adverseEventAssessment/h:subject1/h:primaryRole", NS)
+    causality = event.find("h:component/h:adverseEventAssessment/h:component1/h:causalityAssessment", NS)
+    reporter = event.find(
+        "h:outboundRelationship[@typeCode='SPRT']/h:relatedInvestigation/h:subjectOf2/"
+        "h:controlActEvent/h:author/h:assignedEntity", NS)
+    parent = event.find("h:outboundRelationship[@typeCode='REFR']/h:relatedInvestigation", NS)
+
+    case = dict.fromkeys(ICSR_FIELDS, "")
+    case["case_id"] = _find(event, "h:id", "extension")
+    case["case_received_date"] = _iso_date(_find(event, "h:availabilityTime", "value"))
+    case["case_summary"] = _find(event, "h:text")
+    case["report_type"] = _coded_label(
+        event.find("h:subjectOf2/h:investigationCharacteristic/h:value", NS), REPORT_TYPES)
+
+    if reporter is not None:
+        for telecom in reporter.iterfind("h:telecom", NS):
+            scheme, _, value = telecom.get("value", "").partition(":")
+            case["reporter_email" if scheme == "mailto" else "reporter_contact"] = value
+        case["reporter_name"] = _find(reporter, "h:assignedPerson/h:name/h:given")
+        case["reporter_qualification"] = _find(reporter, "h:assignedPerson/h:asQualifiedEntity/h:code/h:originalText")
+        case["country"] = _find(reporter, "h:assignedPerson/h:asLocatedEntity/h:location/h:code", "code")
+
+    if parent is not None:
+        case["parent_case_id"] = _find(parent, "h:id", "extension")
+        case["related_cases"] = _find(parent, "h:text")
+        case["parent_case_status"] = _find(parent, "h:statusCode/h:originalText")
+
+    if role is not None:
+        _parse_patient(role, case)
+
+    if causality is not None:
+        case["causality_result"] = _find(causality, "h:value")
+        case["causality_method"] = _find(causality, "h:methodCode/h:originalText")
+        case["reporter_comments"] = _find(causality, "h:text")
+    return case
+
+
+def _parse_patient(role, case):
+    gender = role.find("h:player1/h:administrativeGenderCode", NS)
+    case["gender"] = _coded_label(gender, SEXES) or "Unknown"
+    patient = _observations(role, "h:subjectOf2/h:observation")
+    for code, key in [(AGE_CODE, "patient_age"), (WEIGHT_CODE, "weight"), (HEIGHT_CODE, "height")]:
+        if code in patient:
+            case[key] = _find(patient[code], "h:value", "value")
+    history = _organizer(role, HISTORY_ORGANIZER)
+    if history is not None:
+        case["medical_history"] = _find(history, "h:component/h:observation/h:value/h:originalText")
+
+    reaction = patient.get(REACTION_CODE)
+    if reaction is not None:
+        value = reaction.find("h:value", NS)
+        case["ae_verbatim"] = _find(value, "h:originalText") if value is not None else ""
+        case["ae_meddra"] = value.get("code", "") if value is not None else ""
+        related = _observations(reaction, "h:outboundRelationship2/h:observation")
+        outcome = related.get(OUTCOME_CODE)
+        case["ae_outcome"] = _coded_label(outcome.find("h:value", NS) if outcome is not None else None, OUTCOMES)
+        serious = [label for label, code in SERIOUSNESS_CODES.items()
+                   if code in related and _find(related[code], "h:value", "value") == "true"]
+        case["seriousness"] = "Serious" if serious else "Non Serious"
+        case["seriousness_detail"] = serious[0] if serious else "Non Serious"
+
+    drugs = _organizer(role, DRUG_ORGANIZER)
+    drug = drugs.find("h:component/h:substanceAdministration", NS) if drugs is not None else None
+    if drug is not None:
+        case["suspected_drug"] = _find(drug, "h:consumable/h:instanceOfKind/h:kindOfProduct/h:name")
+        dosage = drug.find("h:outboundRelationship2/h:substanceAdministration", NS)
+        if dosage is not None:
+            case["dose"] = _find(dosage, "h:text")
+            case["start_date"] = _iso_date(_find(dosage, "h:effectiveTime/h:low", "value"))
+            case["end_date"] = _iso_date(_find(dosage, "h:effectiveTime/h:high", "value"))
+            case["route"] = _coded_label(dosage.find("h:routeCode", NS), ROUTES)
+        case["indication"] = _find(drug, "h:inboundRelationship/h:observation/h:value/h:originalText")
+        related = _observations(drug, "h:outboundRelationship1/h:observation")
+        if RECHALLENGE_CODE in related:
+            case["rechallenge"] = _coded_label(related[RECHALLENGE_CODE].find("h:value", NS), RECHALLENGES)
+        if "dechallenge" in related:
+            case["dechallenge"] = _find(related["dechallenge"], "h:value/h:originalText")
+
+
+def iter_e2b(source):
+    """Yield one field dict per ICSR message in an E2B(R3) file, with bounded memory."""
+    message_tag = f"{{{HL7}}}PORR_IN049016UV"
+    context = ElementTree.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+    for event, elem in context:
+        if event == "end" and elem.tag == message_tag:
+            yield parse_icsr(elem)
+            # Drop the finished message (and anything before it) from the tree
+            root.clear()
+
+
+def read_e2b(source, chunksize=10_000):
+    """Yield DataFrames of up to chunksize cases from an E2B(R3) file."""
+    batch = []
+    for case in iter_e2b(source):
+        batch.append(case)
+        if len(batch) >= chunksize:
+            yield pd.DataFrame(batch, columns=ICSR_FIELDS)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch, columns=ICSR_FIELDS)
@@ -0,0 +1,243 @@
+"""Ingestion of FAERS quarterly ASCII extracts into the case store and the case warehouse.
+
+An extract has one `$`-delimited file per table (DEMO24Q1.txt, DRUG24Q1.txt,
+REAC24Q1.txt, OUTC24Q1.txt), linked by primaryid (one case version) and
+caseid. Every file is read in chunks with compact dtypes (integers for IDs,
+categoricals for codes and names) and only the columns mapped below:
+
+- DEMO pass 1: (caseid, caseversion, primaryid) to find the latest version
+  of each case in the extract
+- DRUG, REAC, OUTC: rows of the latest versions only; suspect drugs (PS,
+  SS), reactions and outcomes are kept as compact columns
+- DEMO pass 2: cases of the latest versions in chunks, each joined to its
+  primary suspect drug, first reaction and outcomes, plus every suspect
+  drug x reaction pair for the warehouse's reports
+
+Memory is bounded by the retained suspect drug, reaction and outcome rows
+(a few integers and category codes each), not by the file sizes.
+
+The received date is fda_dt, the date FDA received the version, so a
+quarter's cases fall in that quarter. Case IDs are "FAERS-<caseid>": in
+both the case store and the warehouse, a later version replaces the
+earlier one from a previous extract, and the other cases of earlier
+extracts are kept.
+"""
+import csv
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from pvcore.case_store import CASE_COLUMNS
+
+FAERS_TABLES = {
+    "DEMO": {"primaryid": "int64", "caseid": "int64", "caseversion": "category", "fda_dt": "category",
+             "rept_cod": "category", "age": "category", "age_cod": "category", "sex": "category", "wt": "category",
+             "wt_cod": "category", "occp_cod": "category", "occr_country": "category"},
+    "DRUG": {"primaryid": "int64", "drug_seq": "int32", "role_cod": "category", "drugname": "category",
+             "route": "category", "dose_vbm": "category", "dechal": "category", "rechal": "category"},
+    "REAC": {"primaryid": "int64", "pt": "category"},
+    "OUTC": {"primaryid": "int64", "outc_cod": "category"},
+}
+REQUIRED_TABLES = ["DEMO", "DRUG", "REAC"]
+SUSPECT_ROLES = ["PS", "SS"]   # primary and secondary suspect; C (concomitant) and I (interacting) are left out
+AGE_YEARS = {"YR": 1, "DEC": 10, "MON": 1 / 12, "WK": 1 / 52, "DY": 1 / 365, "HR": 1 / 8760}
+WEIGHT_KG = {"KG": 1, "LBS": 0.45359237, "GMS": 0.001}
+SEX = {"M": "Male", "F": "Female"}
+QUALIFICATIONS = {"MD": "Physician", "PH": "Pharmacist", "OT": "Other health professional", "HP": "Health professional",
+                  "LW": "Lawyer", "CN": "Consumer"}
+CHALLENGE = {"Y": "Positive", "N": "Negative", "D": "Not Applicable", "U": "Unknown"}
+OUTCOMES = {"DE": "Death", "LT": "Life Threatening", "HO": "Inpatient Hospitalization", "DS": "Disability",
+            "CA": "Congenital Anomaly", "RI": "Required Intervention", "OT": "Medically Significant"}
+
+
+def faers_files(directory):
+    """Paths of an extract's tables ({"DEMO": .../DEMO24Q1.txt, ...}), searching subdirectories such as ASCII/."""
+    files = {}
+    for path in sorted(Path(directory).rglob("*")):
+        match = re.fullmatch(r"(DEMO|DRUG|REAC|OUTC)\d{2}Q\d\.txt", path.name, re.IGNORECASE)
+        if match and path.is_file():
+            files.setdefault(match.group(1).upper(), path)
+    missing = [name for name in REQUIRED_TABLES if name not in files]
+    if missing:
+        raise FileNotFoundError(f"No {', '.join(missing)} file (e.g. {missing[0]}24Q1.txt) under {directory}.")
+    return files
+
+
+def read_faers(path, table, chunksize=500_000, columns=None):
+    """Chunks (an iterator of DataFrames) of the FAERS_TABLES columns of one extract file, or of the given ones."""
+    dtypes = {name: FAERS_TABLES[table][name] for name in columns or FAERS_TABLES[table]}
+    # Free text holds stray quotes, so quoting is off; lines with extra `$` separators are skipped
+    return pd.read_csv(path, sep="$", usecols=list(dtypes), dtype=dtypes, keep_default_na=False, na_values=[""],
+                       quoting=csv.QUOTE_NONE, encoding="latin-1", on_bad_lines="skip", chunksize=chunksize)
+
+
+def _mapped(values, func):
+    # Codes and names are categoricals, so func runs once per category; missing values map like ""
+    categories = pd.Series(values.cat.categories.astype(str).tolist() + [""], dtype=object)
+    return func(categories).to_numpy()[values.cat.codes.to_numpy()]
+
+
+def _numbers(values):
+    return _mapped(values, lambda categories: pd.to_numeric(categories, errors="coerce")).astype(np.float64)
+
+
+def _iso_dates(categories):
+    # FAERS dates are YYYYMMDD; partial ones (YYYY, YYYYMM) are left empty
+    full = categories.str.fullmatch(r"\d{8}")
+    return (categories.str[:4] + "-" + categories.str[4:6] + "-" + categories.str[6:8]).where(full, "")
+
+
+def _concat(frames, table):
+    # Categories differ from chunk to chunk; their union keeps the columns categorical
+    if not frames:
+        return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in FAERS_TABLES[table].items()})
+    return pd.DataFrame({name: union_categoricals([frame[name] for frame in frames])
+                         if isinstance(frames[0][name].dtype, pd.CategoricalDtype)
+                         else np.concatenate([frame[name].to_numpy() for frame in frames]) for name in frames[0]})
+
+
+def latest_versions(path, chunksize=500_000):
+    """Sorted primaryids of the latest version of each case in a DEMO file: highest caseversion, then primaryid."""
+    parts = [(chunk["caseid"].to_numpy(), np.nan_to_num(_numbers(chunk["caseversion"])), chunk["primaryid"].to_numpy())
+             for chunk in read_faers(path, "DEMO", chunksize, ["primaryid", "caseid", "caseversion"])]
+    if not parts:
+        return np.zeros(0, dtype=np.int64)
+    case, version, primary = (np.concatenate(arrays) for arrays in zip(*parts))
+    order = np.lexsort((primary, version, case))
+    last = np.append(case[order][1:] != case[order][:-1], True)
+    return np.sort(primary[order][last])
+
+
+def _member(ids, sorted_ids):
+    # np.isin hashes both arrays on every call; sorted_ids is searched instead
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=bool)
+    found = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[found] == ids
+
+
+def _retained(path, table, latest, chunksize, progress, keep=None):
+    frames = []
+    for chunk in read_faers(path, table, chunksize):
+        progress(len(chunk))
+        mask = _member(chunk["primaryid"].to_numpy(), latest)
+        if keep is not None:
+            mask &= keep(chunk)
+        frames.append(chunk[mask])
+    return _concat(frames, table)
+
+
+def _outcome_bits(outcomes):
+    # One bit per OUTCOMES code, or-ed per primaryid
+    bits = _mapped(outcomes["outc_cod"], lambda categories: categories.str.upper().map(
+        {code: 1 << i for i, code in enumerate(OUTCOMES)}).fillna(0)).astype(np.int64)
+    unique = pd.DataFrame({"primaryid": outcomes["primaryid"].to_numpy(), "bit": bits}).drop_duplicates()
+    return unique.groupby("primaryid")["bit"].sum()
+
+
+def _outcome_labels(masks):
+    codes, uniques = pd.factorize(masks)
+    labels = [", ".join(label for i, label in enumerate(OUTCOMES.values()) if mask >> i & 1) for mask in uniques]
+    return np.array(labels, dtype=object)[codes]
+
+
+def faers_cases(directory, chunksize=100_000, on_progress=None):
+    """Yield (cases, pairs) chunks of the latest case versions of an extract directory.
+
+    cases has the CASE_COLUMNS, one row per case with its primary suspect
+    drug and first reaction; pairs has a (case_id, drug, event) row per
+    suspect drug and reaction of those cases. on_progress(rows, seconds)
+    follows each chunk read.
+    """
+    files = faers_files(directory)
+    started, rows = time.perf_counter(), 0
+
+    def progress(read):
+        nonlocal rows
+        rows += read
+        if on_progress:
+            on_progress(rows, time.perf_counter() - started)
+
+    latest = latest_versions(files["DEMO"], chunksize)
+    drugs = _retained(files["DRUG"], "DRUG", latest, chunksize, progress,
+                      lambda chunk: chunk["role_cod"].isin(SUSPECT_ROLES).to_numpy())
+    reactions = _retained(files["REAC"], "REAC", latest, chunksize, progress)
+    outcomes = _outcome_bits(_retained(files["OUTC"], "OUTC", latest, chunksize, progress)
+                             if "OUTC" in files else _concat([], "OUTC"))
+    # The primary suspect (PS before SS, then by drug_seq) and the first reaction describe each case
+    order = np.lexsort((drugs["drug_seq"].to_numpy(), (drugs["role_cod"] != "PS").to_numpy(),
+                        drugs["primaryid"].to_numpy()))
+    primary = drugs.iloc[order].drop_duplicates("primaryid").set_index("primaryid")
+    first_reaction = reactions.drop_duplicates("primaryid").set_index("primaryid")["pt"]
+
+    for demo in read_faers(files["DEMO"], "DEMO", chunksize):
+        progress(len(demo))
+        demo = demo[_member(demo["primaryid"].to_numpy(), latest)].drop_duplicates("primaryid")
+        ids = demo["primaryid"].to_numpy()
+        suspect = primary.reindex(ids)
+        masks = outcomes.reindex(ids, fill_value=0).to_numpy()
+        age = np.floor(_numbers(demo["age"]) * _mapped(demo["age_cod"], lambda c: c.str.upper().map(AGE_YEARS)))
+        weight = _numbers(demo["wt"]) * _mapped(demo["wt_cod"], lambda c: c.str.upper().map(WEIGHT_KG))
+        case_ids = "FAERS-" + demo["caseid"].astype(str).to_numpy(dtype=object)
+        cases = pd.DataFrame({
+            "case_id": case_ids,
+            "case_received_date": _mapped(demo["fda_dt"], _iso_dates),
+            "report_type": "Spontaneous",
+            "country": _mapped(demo["occr_country"], lambda c: c),
+            "seriousness": np.where(masks > 0, "Serious", "Non Serious"),
+            "seriousness_detail": np.where(masks > 0, _outcome_labels(masks), "Non Serious"),
+            "reporter_qualification": _mapped(demo["occp_cod"], lambda c: c.str.upper().map(QUALIFICATIONS).fillna("")),
+            "patient_age": np.where((age >= 0) & (age < 130), age, np.nan),
+            "gender": _mapped(demo["sex"], lambda c: c.str.upper().map(SEX).fillna("Unknown")),
+            "weight": np.round(weight, 1),
+            "ae_verbatim": _mapped(first_reaction.reindex(ids), lambda c: c),
+            "ae_outcome": np.where(masks & 1, "Fatal", "Unknown"),
+            "suspected_drug": _mapped(suspect["drugname"], lambda c: c),
+            "dose": _mapped(suspect["dose_vbm"], lambda c: c),
+            "route": _mapped(suspect["route"], lambda c: c),
+            "dechallenge": _mapped(suspect["dechal"], lambda c: c.str.upper().map(CHALLENGE).fillna("")),
+            "rechallenge": _mapped(suspect["rechal"], lambda c: c.str.upper().map(CHALLENGE).fillna("")),
+            "status": "Open",
+        }).reindex(columns=CASE_COLUMNS).fillna({name: "" for name in CASE_COLUMNS
+                                                 if name not in ("patient_age", "weight", "height")})
+
+        in_chunk = np.sort(ids)
+        pairs = drugs.loc[_member(drugs["primaryid"].to_numpy(), in_chunk), ["primaryid", "drugname"]].merge(
+            reactions.loc[_member(reactions["primaryid"].to_numpy(), in_chunk), ["primaryid", "pt"]], on="primaryid")
+        pairs = pairs.drop_duplicates()
+        yield cases, pd.DataFrame({"case_id": case_ids[pd.Index(ids).get_indexer(pairs["primaryid"])],
+                                   "drug": pairs["drugname"].to_numpy(), "event": pairs["pt"].to_numpy()})
+
+
+def ingest(directory, store=None, warehouse=None, canonical=None, chunksize=100_000, on_progress=None):
+    """Load the latest case versions of an extract into a CaseStore and/or a CaseWarehouse.
+
+    Returns the file rows read, cases and drug-event pairs loaded, seconds
+    and rows/sec. canonical maps drug names to products in the warehouse.
+    """
+    started, totals = time.perf_counter(), {"rows": 0, "cases": 0, "pairs": 0}
+
+    def progress(rows, seconds):
+        totals["rows"] = rows
+        if on_progress:
+            on_progress(rows, seconds)
+
+    def chunks():
+        for cases, pairs in faers_cases(directory, chunksize, progress):
+            if store is not None:
+                store.upsert_cases(cases)
+            totals["cases"] += len(cases)
+            totals["pairs"] += len(pairs)
+            yield cases, pairs
+
+    if warehouse is not None:
+        warehouse.write(chunks(), canonical)
+    else:
+        for _ in chunks():
+            pass
+    seconds = time.perf_counter() - started
+    return {**totals, "seconds": round(seconds, 2), "rows_per_sec": round(totals["rows"] / max(seconds, 1e-9))}
@@ -0,0 +1,117 @@
+"""Local stand-in for the authorities' E2B gateways, for demos and load tests.
+
+Real ICSR gateways (FDA ESG, EudraVigilance, MHRA, ...) take an E2B(R3)
+message over AS2 and answer with an acknowledgment. This server speaks
+plain HTTP/1.1 with the same shape: POST /submissions with the message as
+the body, the authority in an AS2-To header and an Idempotency-Key header.
+It answers 200 with an ACK (a repeated key gets the first ACK back), 429
+with Retry-After above its per-authority rate, and 503 for a configurable
+share of requests, after a random latency. Nothing leaves the machine.
+"""
+import asyncio
+import json
+import random
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+async def read_message(reader):
+    """(start line, lower-cased headers, body) of one HTTP/1.1 message, or None at end of stream."""
+    start = await reader.readline()
+    if not start:
+        return None
+    headers = {}
+    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return start.decode("latin-1").strip(), headers, body
+
+
+def write_message(writer, start, headers, body=b""):
+    head = [start] + [f"{name}: {value}" for name, value in {**headers, "Content-Length": len(body)}.items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+@dataclass
+class StandInGateway:
+    latency: float = 0.02         # mean seconds per request (exponential)
+    failure_rate: float = 0.01    # share of requests answered 503
+    rate_limit: float = 0.0       # requests/sec per authority before 429; 0 means unlimited
+    seed: int = 0
+    acks: dict = field(default_factory=dict)        # idempotency key -> ACK
+    requests: dict = field(default_factory=dict)    # response status -> count
+
+    def __post_init__(self):
+        self._random = random.Random(self.seed)
+        self._windows = {}   # authority -> (second, requests in it)
+
+    def _over_rate(self, authority):
+        if not self.rate_limit:
+            return False
+        second = int(asyncio.get_running_loop().time())
+        start, count = self._windows.get(authority, (second, 0))
+        count = count + 1 if start == second else 1
+        self._windows[authority] = (second, count)
+        return count > self.rate_limit
+
+    async def respond(self, start, headers, body):
+        """(status, headers, body) for one request."""
+        method, path, _ = (start.split(" ") + ["", ""])[:3]
+        if method != "POST" or path != "/submissions":
+            return 404, {}, b""
+        authority, key = headers.get("as2-to", ""), headers.get("idempotency-key", "")
+        if not authority or not key:
+            return 400, {}, b"AS2-To and Idempotency-Key headers are required"
+        await asyncio.sleep(self._random.expovariate(1 / self.latency) if self.latency else 0)
+        if self._over_rate(authority):
+            return 429, {"Retry-After": "1"}, b""
+        if self._random.random() < self.failure_rate:
+            return 503, {}, b""
+        ack = self.acks.get(key)
+        if ack is None:
+            # AA: accepted; AR: rejected (not an E2B message), which no retry can fix
+            ack = {"ack_id": f"ACK-{uuid.uuid4().hex[:16].upper()}", "authority": authority,
+                   "code": "AA" if body.lstrip().startswith(b"<?xml") else "AR"}
+            self.acks[key] = ack
+            return 200, {"Content-Type": "application/json"}, json.dumps(ack).encode()
+        return 200, {"Content-Type": "application/json"}, json.dumps({**ack, "duplicate": True}).encode()
+
+    async def _serve(self, reader, writer):
+        try:
+            while (message := await read_message(reader)) is not None:
+                status, headers, body = await self.respond(*message)
+                self.requests[status] = self.requests.get(status, 0) + 1
+                write_message(writer, f"HTTP/1.1 {status} {REASONS[status]}", headers, body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving on the running loop; returns the base URL."""
+        self.server = await asyncio.start_server(self._serve, host, port)
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+
+def start_gateway_thread(**options):
+    """A StandInGateway serving from its own thread and event loop; returns (gateway, url)."""
+    gateway = StandInGateway(**options)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    result = {}
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        result["url"] = loop.run_until_complete(gateway.start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, name="pv-gateway", daemon=True).start()
+    started.wait()
+    return gateway, result["url"]
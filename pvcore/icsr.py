@@ -0,0 +1,99 @@
+"""ICSR case fields, grouped the way the ICSR Processing tabs group them."""
+import numpy as np
+import pandas as pd
+
+ICSR_SECTIONS = {
+    "General Case Information": [
+        ("case_id", "Case ID"),
+        ("case_received_date", "Case Received Date"),
+        ("report_type", "Report Type"),
+        ("country", "Country"),
+        ("seriousness", "Seriousness"),
+        ("seriousness_detail", "Seriousness Criteria"),
+    ],
+    "Reporter Information": [
+        ("reporter_name", "Reporter Name"),
+        ("reporter_email", "Reporter Email"),
+        ("reporter_contact", "Reporter Contact Number"),
+        ("reporter_qualification", "Reporter Qualification"),
+    ],
+    "Patient Information": [
+        ("patient_age", "Patient Age"),
+        ("gender", "Gender"),
+        ("weight", "Weight (kg)"),
+        ("height", "Height (cm)"),
+        ("medical_history", "Relevant Medical History"),
+    ],
+    "Parent Case Information": [
+        ("parent_case_id", "Parent Case ID"),
+        ("parent_case_status", "Parent Case Status"),
+        ("related_cases", "Related Cases"),
+    ],
+    "Adverse Event Information": [
+        ("ae_verbatim", "Adverse Event - Verbatim"),
+        ("ae_meddra", "Adverse Event - MedDRA Code"),
+        ("ae_outcome", "Outcome"),
+    ],
+    "Suspected Drug Information": [
+        ("suspected_drug", "Drug Name"),
+        ("dose", "Dose"),
+        ("route", "Route of Administration"),
+        ("start_date", "Start Date"),
+        ("end_date", "End Date"),
+        ("indication", "Indication / Reason for Use"),
+    ],
+    "Causality Assessment": [
+        ("causality_method", "Causality Assessment Method"),
+        ("causality_result", "Assessment Result"),
+        ("reporter_comments", "Reporter Comments"),
+        ("dechallenge", "Dechallenge"),
+        ("rechallenge", "Rechallenge"),
+    ],
+    "Narrative and Analysis": [
+        ("case_summary", "Case Summary"),
+    ],
+}
+
+ICSR_FIELDS = [key for fields in ICSR_SECTIONS.values() for key, _ in fields]
+
+# The four minimum criteria of a valid ICSR (GVP Module VI): each is met when any of its fields is filled
+# (an age of 0 or more, a gender other than unknown)
+VALIDITY_CRITERIA = {
+    "identifiable_reporter": ["reporter_name", "reporter_email", "reporter_contact", "reporter_qualification"],
+    "identifiable_patient": ["patient_age", "gender"],
+    "suspect_product": ["suspected_drug"],
+    "adverse_event": ["ae_verbatim", "ae_meddra"],
+}
+VALIDITY_COLUMNS = list(VALIDITY_CRITERIA) + ["valid", "missing_criteria"]
+# Values that say nothing about the patient: form defaults and "unknown" codes
+UNKNOWN_VALUES = {"gender": {"unknown", "unk"}}
+NON_NEGATIVE_FIELDS = {"patient_age"}   # 0 is an infant's age in years, not a missing one
+
+
+def _filled(field, value):
+    if isinstance(value, str):
+        if field not in NON_NEGATIVE_FIELDS:
+            return value.strip() != "" and value.strip().casefold() not in UNKNOWN_VALUES.get(field, ())
+        value = pd.to_numeric(value.strip(), errors="coerce")
+    if field in NON_NEGATIVE_FIELDS:
+        return bool(pd.notna(value) and value >= 0)
+    return pd.notna(value)
+
+
+def case_validity(cases):
+    """VALIDITY_COLUMNS for a case table: each criterion, overall validity and the unmet criteria."""
+    result = pd.DataFrame(index=cases.index)
+    for criterion, fields in VALIDITY_CRITERIA.items():
+        met = np.zeros(len(cases), dtype=bool)
+        for field in fields:
+            if field in cases:
+                # Decided once per distinct value
+                codes, uniques = pd.factorize(cases[field].to_numpy(dtype=object), use_na_sentinel=False)
+                met |= np.array([_filled(field, u) for u in uniques], dtype=bool)[codes]
+        result[criterion] = met
+    result["valid"] = result[list(VALIDITY_CRITERIA)].all(axis=1)
+    missing = np.full(len(cases), "", dtype=object)
+    for criterion in VALIDITY_CRITERIA:
+        missing = missing + np.where(result[criterion].to_numpy(), "", criterion.replace("_", " ") + "; ")
+    result["missing_criteria"] = pd.Series(missing, index=cases.index, dtype=object).str.removesuffix("; ")
+    return result
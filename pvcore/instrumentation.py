@@ -0,0 +1,208 @@
+"""Opt-in render-time and rerun metrics, switched on with PV_METRICS=1.
+
+Each rerun records its page, its trigger (the session-state keys that
+changed since the previous rerun), the render time of the page (or of the
+fragment that reran on its own) and of each section the page marks, the session-state size and the process peak memory.
+Samples are kept in a bounded ring buffer. Counters and p50/p95 render times
+are written every few seconds to PV_METRICS_FILE (default metrics.prom in
+the data directory) as Prometheus text, or as JSON if the name ends in .json.
+Only the standard library is imported here, so the cold start is unchanged.
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:   # Windows
+    resource = None
+
+from pvcore.config import data_path
+
+ENABLED = os.environ.get("PV_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+WHOLE_PAGE = "(page)"
+FRAGMENT = "(fragment) "   # prefix of the section of a fragment's own rerun, e.g. "(fragment) case_entry"
+
+
+@dataclass
+class Sample:
+    timestamp: float
+    session: str
+    page: str
+    section: str      # WHOLE_PAGE for the page's full render, FRAGMENT + name for a fragment rerun
+    trigger: str
+    seconds: float
+
+
+SAMPLE_COLUMNS = [f.name for f in fields(Sample)]
+
+
+def peak_memory():
+    """Peak resident memory of the process in bytes, or None where it is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def approximate_size(value, depth=3):
+    """Rough bytes held by value: frame and array buffers, strings, and containers down to depth levels."""
+    if hasattr(value, "memory_usage") and hasattr(value, "ndim"):   # DataFrame or Series
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if value.ndim == 2 else int(usage)
+    if hasattr(value, "nbytes") and hasattr(value, "dtype"):        # NumPy array
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        items = [item for pair in list(value.items())[:1000] for item in pair]
+        total = len(value) * 2
+    elif isinstance(value, (list, tuple, set, frozenset, deque)):
+        items, total = list(value)[:1000], len(value)
+    elif hasattr(value, "__dict__"):
+        return size + approximate_size(vars(value), depth - 1)
+    else:
+        return size
+    # Large containers are estimated from their first 1000 items
+    sampled = sum(approximate_size(item, depth - 1) for item in items)
+    return size + (sampled * total // len(items) if items else 0)
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                    for name, value in labels.items())
+
+
+class Recorder:
+    def __init__(self, path=None, capacity=20_000, flush_interval=5.0):
+        self.path = Path(path) if path else None
+        self.samples = deque(maxlen=capacity)
+        self.reruns = Counter()           # page -> reruns
+        self.session_reruns = Counter()   # session -> reruns
+        self.state_bytes = {}             # session -> session-state bytes at its last rerun
+        self.renders = Counter()          # (page, section) -> renders, for the cumulative counts
+        self.render_seconds = Counter()   # (page, section) -> total seconds
+        self.flush_interval = flush_interval
+        self.started = time.time()
+        self._flushed = 0.0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def rerun(self, session, page, state_bytes):
+        with self._lock:
+            self.reruns[page] += 1
+            self.session_reruns[session] += 1
+            self.state_bytes[session] = state_bytes
+        self.flush()
+
+    def record(self, session, page, section, trigger, seconds):
+        with self._lock:
+            self.samples.append(Sample(time.time(), session, page, section, trigger, seconds))
+            self.renders[page, section] += 1
+            self.render_seconds[page, section] += seconds
+
+    def sample_rows(self):
+        """The ring buffer as a list of dicts with SAMPLE_COLUMNS."""
+        with self._lock:
+            return [asdict(sample) for sample in self.samples]
+
+    def latency(self, by=("page", "section")):
+        """Count, p50, p95 and max render seconds in the ring buffer, grouped by sample fields."""
+        groups = {}
+        with self._lock:
+            for sample in self.samples:
+                groups.setdefault(tuple(getattr(sample, name) for name in by), []).append(sample.seconds)
+        rows = []
+        for key, seconds in sorted(groups.items()):
+            seconds.sort()
+            rows.append({**dict(zip(by, key)), "count": len(seconds), "p50": _percentile(seconds, 0.5),
+                         "p95": _percentile(seconds, 0.95), "max": seconds[-1]})
+        return rows
+
+    def snapshot(self):
+        """Counters and latencies as a JSON-serializable dict."""
+        with self._lock:
+            reruns, sessions = dict(self.reruns), dict(self.session_reruns)
+            state = list(self.state_bytes.values())
+        return {
+            "started": self.started, "written": time.time(), "reruns": reruns, "sessions": len(sessions),
+            "reruns_per_session_max": max(sessions.values(), default=0),
+            "session_state_bytes_max": max(state, default=0), "session_state_bytes_total": sum(state),
+            "peak_memory_bytes": peak_memory(), "latency": self.latency(),
+            "latency_by_trigger": self.latency(("page", "trigger")),
+        }
+
+    def prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = ["# HELP pv_reruns_total Script reruns per page.", "# TYPE pv_reruns_total counter"]
+        lines += [f"pv_reruns_total{{{_labels(page=page)}}} {count}" for page, count in sorted(snapshot["reruns"].items())]
+        lines += ["# HELP pv_render_seconds Render time per page and section (quantiles over the recent samples).",
+                  "# TYPE pv_render_seconds summary"]
+        with self._lock:
+            totals = {key: (self.renders[key], self.render_seconds[key]) for key in self.renders}
+        for row in snapshot["latency"]:
+            labels = _labels(page=row["page"], section=row["section"])
+            count, total = totals[row["page"], row["section"]]
+            lines += [f'pv_render_seconds{{{labels},quantile="0.5"}} {row["p50"]:.6f}',
+                      f'pv_render_seconds{{{labels},quantile="0.95"}} {row["p95"]:.6f}',
+                      f"pv_render_seconds_sum{{{labels}}} {total:.6f}", f"pv_render_seconds_count{{{labels}}} {count}"]
+        lines += ["# HELP pv_sessions Sessions that have rerun the script.", "# TYPE pv_sessions gauge",
+                  f"pv_sessions {snapshot['sessions']}",
+                  "# HELP pv_session_state_bytes Approximate session-state size, largest session and all sessions.",
+                  "# TYPE pv_session_state_bytes gauge",
+                  f'pv_session_state_bytes{{stat="max"}} {snapshot["session_state_bytes_max"]}',
+                  f'pv_session_state_bytes{{stat="total"}} {snapshot["session_state_bytes_total"]}']
+        if snapshot["peak_memory_bytes"] is not None:
+            lines += ["# HELP pv_peak_memory_bytes Peak resident memory of the process.", "# TYPE pv_peak_memory_bytes gauge",
+                      f"pv_peak_memory_bytes {snapshot['peak_memory_bytes']}"]
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force=False):
+        """Write the metrics file, at most once per flush_interval unless forced.
+
+        An unforced flush is skipped while another session's thread is writing.
+        """
+        if self.path is None or not self._flush_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            if not force and now - self._flushed < self.flush_interval:
+                return
+            self._flushed = now
+            text = json.dumps(self.snapshot(), indent=2) if self.path.suffix == ".json" else self.prometheus()
+            with tempfile.NamedTemporaryFile("w", dir=self.path.parent, prefix=self.path.name + ".",
+                                             suffix=".tmp", delete=False) as temporary:
+                temporary.write(text)
+            try:
+                os.replace(temporary.name, self.path)
+            except OSError:
+                os.unlink(temporary.name)
+                raise
+        finally:
+            self._flush_lock.release()
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_recorder():
+    """The process-wide Recorder, writing to PV_METRICS_FILE or metrics.prom in the data directory."""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = Recorder(os.environ.get("PV_METRICS_FILE") or data_path("metrics.prom"))
+        return _recorder
@@ -0,0 +1,152 @@
+"""Literature screening: ICSR qualification and listedness, per article or in bulk.
+
+Listedness is looked up in a precompiled index of normalized label terms, so
+"NAUSEA", " nausea " and "Rashes" match the label terms "Nausea" and "Rash".
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+# Example label used when no product-specific label is loaded
+LISTED_ADVERSE_EVENTS = ["Nausea", "Headache", "Rash", "Dizziness", "Fatigue", "Diarrhea"]
+
+NOT_MARKETED = "Drug not marketed in reporter's country. ICSR screening not applicable."
+NOT_ICSR = "Not an ICSR: Missing one or more required fields."
+NO_REACTION = "Aggregate data missing adverse reaction information."
+LISTED = "No potential safety information; listed adverse event."
+UNLISTED = "Potential safety information identified. Further assessment required."
+
+# Columns of a bulk article file, after lower-casing and replacing spaces with "_"
+ARTICLE_COLUMNS = ["pmid", "article_title", "drug", "reaction", "reporter", "patient_identifier"]
+COLUMN_ALIASES = {"title": "article_title", "reporter_name": "reporter", "patient": "patient_identifier",
+                  "adverse_reaction": "reaction", "mah_marketing": "mah_marketed"}
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_term(text):
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", str(text).casefold())).strip()
+
+
+def normalize_terms(values):
+    # Vectorized normalize_term for a Series
+    return (values.fillna("").astype(str).str.casefold()
+            .str.replace(_PUNCTUATION, " ", regex=True)
+            .str.replace(_SPACES, " ", regex=True)
+            .str.strip())
+
+
+def _inflections(term):
+    forms = {term, term + "s", term + "es"}
+    if term.endswith("y"):
+        forms.add(term[:-1] + "ies")
+    return forms
+
+
+class ListednessIndex:
+    """Normalized label terms per drug, plus a default label for unlisted drugs."""
+
+    def __init__(self, labels=None, default=LISTED_ADVERSE_EVENTS):
+        self.default = self._compile(default)
+        self.labels = {normalize_term(drug): self._compile(terms) for drug, terms in (labels or {}).items()}
+
+    @staticmethod
+    def _compile(terms):
+        return frozenset(form for term in terms for form in _inflections(normalize_term(term)) if term)
+
+    @classmethod
+    def from_table(cls, table, drug_col="drug", event_col="event", default=LISTED_ADVERSE_EVENTS):
+        """Build from a label table with one row per drug and listed event."""
+        return cls(table.groupby(drug_col)[event_col].apply(list).to_dict(), default)
+
+    def is_listed(self, drug, reaction):
+        return normalize_term(reaction) in self.labels.get(normalize_term(drug), self.default)
+
+    def listed_mask(self, drugs, reactions):
+        reactions = normalize_terms(reactions)
+        listed = reactions.isin(self.default).to_numpy()
+        if self.labels:
+            drugs = normalize_terms(drugs)
+            for drug in drugs.unique():
+                terms = self.labels.get(drug)
+                if terms is not None:
+                    rows = (drugs == drug).to_numpy()
+                    listed[rows] = reactions[rows].isin(terms).to_numpy()
+        return listed
+
+
+def _filled(chunk, column):
+    if column not in chunk:
+        return np.zeros(len(chunk), dtype=bool)
+    return (chunk[column].fillna("").astype(str).str.strip() != "").to_numpy()
+
+
+def screen_chunk(chunk, index, data_type="Single Patient"):
+    """Screen a block of articles; adds icsr, listed and finding columns.
+
+    A "data_type" column, when present, overrides data_type per row, and a
+    missing "mah_marketed" column means the drug is marketed. Labels are
+    looked up by the normalized "drug_name" column when there is one.
+    """
+    single = (chunk["data_type"].fillna(data_type) == "Single Patient").to_numpy() if "data_type" in chunk \
+        else np.full(len(chunk), data_type == "Single Patient")
+    marketed = (~chunk["mah_marketed"].fillna("Yes").astype(str).str.strip().str.lower().str.startswith("n")).to_numpy() \
+        if "mah_marketed" in chunk else np.ones(len(chunk), dtype=bool)
+    has_reaction = _filled(chunk, "reaction")
+    qualifies = _filled(chunk, "reporter") & _filled(chunk, "patient_identifier") & _filled(chunk, "drug") & has_reaction
+    listed = index.listed_mask(chunk["drug_name"] if "drug_name" in chunk else chunk["drug"], chunk["reaction"]) & has_reaction
+
+    screened = chunk.copy()
+    screened["icsr"] = np.select([~single, ~marketed, qualifies], ["Not applicable", "Not applicable", "Yes"], "No")
+    screened["listed"] = listed
+    screened["finding"] = np.select(
+        [single & ~marketed, single & ~qualifies, ~single & ~has_reaction, listed],
+        [NOT_MARKETED, NOT_ICSR, NO_REACTION, LISTED],
+        UNLISTED,
+    )
+    return screened
+
+
+def screen_article(index, data_type, drug, reaction, reporter="", patient_identifier="", mah_marketed="Yes"):
+    """Screen one article; returns (qualifies as ICSR, finding)."""
+    row = pd.DataFrame([{
+        "drug": drug, "reaction": reaction, "reporter": reporter,
+        "patient_identifier": patient_identifier, "mah_marketed": mah_marketed,
+    }])
+    screened = screen_chunk(row, index, data_type).iloc[0]
+    return screened["icsr"] == "Yes", screened["finding"]
+
+
+def article_separator(source):
+    name = str(getattr(source, "name", source)).lower()
+    return "\t" if name.endswith((".tsv", ".tab", ".txt")) else ","
+
+
+def article_table(chunk):
+    """An article table with normalized column names and every ARTICLE_COLUMNS column."""
+    chunk.columns = [_SPACES.sub("_", str(c).strip().lower()) for c in chunk.columns]
+    chunk = chunk.rename(columns=COLUMN_ALIASES)
+    for column in ARTICLE_COLUMNS:
+        if column not in chunk:
+            chunk[column] = ""
+    return chunk
+
+
+def read_articles(source, chunksize=50_000, sep=None):
+    """Stream an article CSV/TSV in chunks with normalized column names."""
+    for chunk in pd.read_csv(source, sep=sep or article_separator(source), dtype=str, chunksize=chunksize,
+                             keep_default_na=False):
+        yield article_table(chunk)
+
+
+def screen_articles(source, index, data_type="Single Patient", chunksize=50_000, sep=None, drugs=None):
+    """Yield screened chunks of an article file.
+
+    With a drugs.DrugNormalizer, each chunk also gets its DRUG_COLUMNS.
+    """
+    for chunk in read_articles(source, chunksize, sep):
+        if drugs is not None:
+            chunk = chunk.join(drugs.normalize_many(chunk["drug"]))
+        yield screen_chunk(chunk, index, data_type)
@@ -0,0 +1,270 @@
+"""MedDRA terminology index built from the ASCII distribution files.
+
+llt.asc and mdhier.asc (plus meddra_release.asc for the version) are read
+once and turned into flat NumPy arrays: LLT codes and names, and each LLT's
+PT with that PT's primary HLT, HLGT and SOC as integer positions. The
+arrays are saved as .npy files and memory-mapped by every process that
+opens the index. Lookups are binary searches over sorted normalized LLT
+names (prefix and exact) and an n-gram index over the same names (typos).
+Only current LLTs are offered for coding.
+"""
+import csv
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pvcore import ngram
+from pvcore.literature import normalize_term
+from pvcore.ngram import NgramIndex
+
+LLT_COLUMNS = ["llt_code", "llt_name", "pt_code", "llt_whoart_code", "llt_harts_code", "llt_costart_sym",
+               "llt_icd9_code", "llt_icd9cm_code", "llt_icd10_code", "llt_currency", "llt_jart_code"]
+MDHIER_COLUMNS = ["pt_code", "hlt_code", "hlgt_code", "soc_code", "pt_name", "hlt_name", "hlgt_name", "soc_name",
+                  "soc_abbrev", "null_field", "pt_soc_code", "primary_soc_fg"]
+LEVELS = ["pt", "hlt", "hlgt", "soc"]
+# Columns added by MeddraIndex.recode; pt and soc feed the summary tabulations
+RECODE_COLUMNS = ["llt_code", "llt_name", "pt_code", "pt", "hlt", "hlgt", "soc", "match_score"]
+SOURCE_FILES = ["llt.asc", "mdhier.asc", "meddra_release.asc"]
+
+
+def read_asc(path, columns):
+    """One $-delimited MedDRA ASCII file as a string DataFrame."""
+    table = pd.read_csv(path, sep="$", header=None, usecols=range(len(columns)), dtype=str, keep_default_na=False,
+                        quoting=csv.QUOTE_NONE, encoding_errors="replace")
+    table.columns = columns
+    return table
+
+
+def _names(values):
+    return np.array([str(value).encode() for value in values], dtype=bytes)
+
+
+def _sources(source_dir):
+    stamps = {}
+    for name in SOURCE_FILES:
+        path = Path(source_dir) / name
+        if path.exists():
+            stat = path.stat()
+            stamps[name] = [stat.st_size, stat.st_mtime_ns]
+    return stamps
+
+
+class MeddraIndex:
+    def __init__(self, arrays, meta):
+        self.arrays = arrays
+        self.meta = meta
+        self.ngrams = NgramIndex(*(arrays[f"ngram_{name}"] for name in ngram.ARRAYS))
+        self.current = arrays["llt_current"]
+
+    @classmethod
+    def build(cls, source_dir, index_dir):
+        """Parse the ASCII files in source_dir and write the arrays to index_dir."""
+        source_dir, index_dir = Path(source_dir), Path(index_dir)
+        llts = read_asc(source_dir / "llt.asc", LLT_COLUMNS)
+        llts["llt_code"] = llts["llt_code"].astype(np.int32)
+        llts = llts.sort_values("llt_code", kind="stable").reset_index(drop=True)
+        hierarchy = read_asc(source_dir / "mdhier.asc", MDHIER_COLUMNS)
+        primary = hierarchy[hierarchy["primary_soc_fg"] == "Y"].drop_duplicates("pt_code")
+
+        arrays = {}
+        for level in LEVELS:
+            terms = hierarchy[[f"{level}_code", f"{level}_name"]].drop_duplicates(f"{level}_code")
+            terms = terms.assign(code=terms[f"{level}_code"].astype(np.int32)).sort_values("code")
+            arrays[f"{level}_code"] = terms["code"].to_numpy(np.int32)
+            arrays[f"{level}_name"] = _names(terms[f"{level}_name"])
+        for level in LEVELS[1:]:
+            positions = np.searchsorted(arrays[f"{level}_code"], primary[f"{level}_code"].astype(np.int32))
+            by_pt = np.full(len(arrays["pt_code"]), -1, dtype=np.int32)
+            by_pt[np.searchsorted(arrays["pt_code"], primary["pt_code"].astype(np.int32))] = positions
+            arrays[f"pt_{level}"] = by_pt
+
+        arrays["llt_code"] = llts["llt_code"].to_numpy(np.int32)
+        arrays["llt_name"] = _names(llts["llt_name"])
+        pt_codes = llts["pt_code"].astype(np.int32).to_numpy()
+        llt_pt = np.minimum(np.searchsorted(arrays["pt_code"], pt_codes), len(arrays["pt_code"]) - 1)
+        arrays["llt_pt"] = np.where(arrays["pt_code"][llt_pt] == pt_codes, llt_pt, -1).astype(np.int32)
+        arrays["llt_current"] = (llts["llt_currency"] == "Y").to_numpy()
+
+        normalized = [normalize_term(name) for name in llts["llt_name"]]
+        search_keys = _names(normalized)
+        # Sorted by name, current LLTs before non-current ones with the same name
+        order = np.lexsort((~arrays["llt_current"], search_keys)).astype(np.int32)
+        arrays["search_keys"], arrays["search_order"] = search_keys[order], order
+        for name, values in NgramIndex.build(normalized).arrays().items():
+            arrays[f"ngram_{name}"] = values
+
+        meta = {"version": None, "sources": _sources(source_dir)}
+        if (source_dir / "meddra_release.asc").exists():
+            meta["version"] = read_asc(source_dir / "meddra_release.asc", ["version"])["version"].iloc[0]
+
+        # Written next to the index and swapped in, so readers never see half an index
+        staging = index_dir.with_name(index_dir.name + ".building")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name, values in arrays.items():
+            np.save(staging / f"{name}.npy", values)
+        (staging / "meta.json").write_text(json.dumps(meta))
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(staging, index_dir)
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir, mmap_mode="r"):
+        index_dir = Path(index_dir)
+        # Plain ndarray views of the mapping; np.memmap slicing is several times slower
+        arrays = {path.stem: np.load(path, mmap_mode=mmap_mode).view(np.ndarray) for path in index_dir.glob("*.npy")}
+        return cls(arrays, json.loads((index_dir / "meta.json").read_text()))
+
+    @classmethod
+    def open(cls, source_dir, index_dir):
+        """Load the index, rebuilding it first if the ASCII files changed since it was built."""
+        meta_path = Path(index_dir) / "meta.json"
+        if meta_path.exists() and json.loads(meta_path.read_text())["sources"] == _sources(source_dir):
+            return cls.load(index_dir)
+        return cls.build(source_dir, index_dir)
+
+    def __len__(self):
+        return len(self.arrays["llt_code"])
+
+    @property
+    def version(self):
+        return self.meta["version"]
+
+    def _hierarchy(self, llt_ids):
+        # Positions of each LLT's PT, HLT, HLGT and SOC; -1 where unknown
+        a = self.arrays
+        llt_ids = np.asarray(llt_ids, dtype=np.int64)
+        pt = np.where(llt_ids >= 0, a["llt_pt"][np.maximum(llt_ids, 0)], -1)
+        levels = {"pt": pt}
+        for level in LEVELS[1:]:
+            levels[level] = np.where(pt >= 0, a[f"pt_{level}"][np.maximum(pt, 0)], -1)
+        return llt_ids, levels
+
+    def terms(self, llt_ids, scores=None):
+        """Hierarchy of LLT positions as a RECODE_COLUMNS table; -1 gives an empty row."""
+        a = self.arrays
+        llt_ids, levels = self._hierarchy(llt_ids)
+        found = llt_ids >= 0
+
+        def names(level, positions):
+            labels = np.char.decode(a[f"{level}_name"][np.maximum(positions, 0)]).astype(object)
+            return np.where(positions >= 0, labels, "")
+
+        columns = {
+            "llt_code": np.where(found, a["llt_code"][np.maximum(llt_ids, 0)], 0),
+            "llt_name": names("llt", llt_ids),
+            "pt_code": np.where(levels["pt"] >= 0, a["pt_code"][np.maximum(levels["pt"], 0)], 0),
+        }
+        columns.update((level, names(level, levels[level])) for level in LEVELS)
+        columns["match_score"] = np.where(found, 1.0 if scores is None else scores, 0.0)
+        return pd.DataFrame(columns, columns=RECODE_COLUMNS)
+
+    def term(self, llt_id, score=1.0):
+        """Hierarchy of one LLT position as a RECODE_COLUMNS dict, without building a table."""
+        a = self.arrays
+        _, levels = self._hierarchy([llt_id])
+        record = {"llt_code": int(a["llt_code"][llt_id]), "llt_name": a["llt_name"][llt_id].decode(),
+                  "pt_code": int(a["pt_code"][levels["pt"][0]]) if levels["pt"][0] >= 0 else 0}
+        for level in LEVELS:
+            position = levels[level][0]
+            record[level] = a[f"{level}_name"][position].decode() if position >= 0 else ""
+        record["match_score"] = float(score)
+        return record
+
+    def lookup(self, llt_code):
+        """Hierarchy of one LLT code, or None."""
+        codes = self.arrays["llt_code"]
+        position = int(np.searchsorted(codes, int(llt_code)))
+        if position == len(codes) or codes[position] != int(llt_code):
+            return None
+        return self.term(position)
+
+    def prefix(self, text, limit=10, scan=500):
+        """Current LLTs whose normalized name starts with text, shortest names first."""
+        key = normalize_term(text).encode()
+        if not key:
+            return np.zeros(0, dtype=np.int32)
+        keys = self.arrays["search_keys"]
+        low = np.searchsorted(keys, key)
+        high = min(np.searchsorted(keys, key + b"\xff"), low + scan)
+        ids = self.arrays["search_order"][low:high]
+        ids = ids[self.current[ids]]
+        lengths = np.char.str_len(self.arrays["llt_name"][ids])
+        return ids[np.argsort(lengths, kind="stable")][:limit]
+
+    def autocomplete(self, text, limit=10):
+        """Prefix matches first, then the closest spellings, as a RECODE_COLUMNS table."""
+        ids = list(self.prefix(text, limit))
+        scores = [1.0] * len(ids)
+        if len(ids) < limit:
+            fuzzy_ids, fuzzy_scores = self.ngrams.search(normalize_term(text), limit, 0.2, self.current)
+            for llt, score in zip(fuzzy_ids, fuzzy_scores):
+                if len(ids) < limit and llt not in ids:
+                    ids.append(llt)
+                    scores.append(score)
+        return self.terms(ids, np.array(scores))
+
+    def _exact(self, keys):
+        # Vectorized exact match of normalized names; -1 where there is none
+        search_keys = self.arrays["search_keys"]
+        width = search_keys.dtype.itemsize
+        queries = np.array([key if len(key) <= width else b"" for key in keys], dtype=search_keys.dtype)
+        positions = np.minimum(np.searchsorted(search_keys, queries), len(search_keys) - 1)
+        ids = self.arrays["search_order"][positions]
+        matched = (search_keys[positions] == queries) & (queries != b"") & self.current[ids]
+        return np.where(matched, ids, -1)
+
+    def _match(self, normalized, min_score):
+        # Exact normalized name first, then the best n-gram match scoring at least min_score
+        ids = self._exact([term.encode() for term in normalized])
+        scores = np.where(ids >= 0, 1.0, 0.0)
+        for position in np.flatnonzero(ids < 0):
+            if normalized[position]:
+                found, found_scores = self.ngrams.search(normalized[position], 1, min_score, self.current)
+                if len(found):
+                    ids[position], scores[position] = found[0], found_scores[0]
+        return ids, scores
+
+    def recode(self, verbatims, min_score=0.6):
+        """Code a column of verbatim terms; returns RECODE_COLUMNS aligned with the input.
+
+        Each distinct verbatim is matched once and the result broadcast back.
+        """
+        codes, uniques = pd.factorize(pd.Series(verbatims, dtype=object).fillna("").astype(str))
+        ids, scores = self._match([normalize_term(term) for term in uniques], min_score)
+        table = self.terms(ids, scores).iloc[codes]
+        table.index = verbatims.index if isinstance(verbatims, pd.Series) else pd.RangeIndex(len(codes))
+        return table
+
+    def code(self, text, min_score=0.6):
+        """Best coding of one verbatim term as a dict, or None."""
+        ids, scores = self._match([normalize_term(text)], min_score)
+        return self.term(ids[0], scores[0]) if ids[0] >= 0 else None
+
+    def pt_soc_map(self):
+        """Primary SOC name of every PT name."""
+        a = self.arrays
+        socs = a["pt_soc"]
+        pts = np.char.decode(a["pt_name"][socs >= 0]).tolist()
+        return dict(zip(pts, np.char.decode(a["soc_name"][socs[socs >= 0]]).tolist()))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_meddra_index(source_dir, index_dir):
+    """The process-wide MeddraIndex for source_dir, reopened when its ASCII files change; None if they are missing."""
+    if not all((Path(source_dir) / name).exists() for name in SOURCE_FILES[:2]):
+        return None
+    stamp = _sources(source_dir)
+    key = (str(source_dir), str(index_dir))
+    with _indexes_lock:
+        if key not in _indexes or _indexes[key][0] != stamp:
+            _indexes[key] = (stamp, MeddraIndex.open(source_dir, index_dir))
+        return _indexes[key][1]
@@ -0,0 +1,481 @@
+"""Local MEDLINE/PubMed literature corpus with an inverted index for drug-reaction co-mention screening.
+
+Baseline and update XML files (plain or .gz) are parsed one PubmedArticle
+at a time with iterparse, and the articles are indexed in batches under
+three kinds of keys:
+
+- word: normalized title and abstract words (see literature.normalize_term),
+  without STOP_WORDS
+- drug: dictionary products whose names occur in the text as whole words
+- event: reaction concepts (MedDRA PTs) whose terms occur likewise
+
+Names of up to MAX_PHRASE_WORDS words are matched by hashing every run of
+consecutive words. Each kind is a flat posting list (offsets per key,
+ascending article numbers) saved as .npy files and memory-mapped, like the
+MedDRA index. Postings are written per batch and merged into place at the
+end, so a build holds one batch and the vocabulary in memory, not the
+corpus. A forward list of each article's events answers co-mention queries:
+the articles of a product are a slice of its postings, filtered on date,
+and their events are read from the forward list.
+
+An article's date is the date it entered PubMed (the "pubmed" history date,
+what weekly literature searches filter on), else its completion, revision
+or publication date. A PMID seen again (a revised citation) replaces the
+earlier record, and DeleteCitation entries remove it.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pvcore.literature import normalize_term
+
+KINDS = ["word", "drug", "event"]
+MAX_PHRASE_WORDS = 5
+BATCH_ARTICLES = 20_000
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by can for from had has have in into is it its may not of on or our than that the
+    their there these this those to was we were which who will with
+""".split())
+CORPUS_COLUMNS = ["pmid", "date", "title", "journal"]
+CO_MENTION_COLUMNS = CORPUS_COLUMNS + ["product", "event", "listed"]
+SOURCE_PATTERNS = ["*.xml", "*.xml.gz"]
+_DOC_SCHEMA = pa.schema([("pmid", pa.int64()), ("date", pa.date32()), ("title", pa.string()), ("journal", pa.string())])
+_MONTHS = {name: number for number, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+# The words normalize_term keeps; findall is faster than its substitutions on long texts
+_WORD = re.compile(r"\w+")
+_PRIME = 1099511628211
+_MASK = (1 << 64) - 1
+
+
+# ---------------- PARSING ----------------
+
+def _date(node):
+    # Year, Month (number or name) and Day children; None if there is no usable year
+    if node is None or not (node.findtext("Year") or "").isdigit():
+        return None
+    month, day = (node.findtext("Month") or "1").strip(), (node.findtext("Day") or "1").strip()
+    try:
+        return date(int(node.findtext("Year")), int(month) if month.isdigit() else _MONTHS[month[:3].lower()],
+                    int(day) if day.isdigit() else 1)
+    except (KeyError, ValueError):
+        return None
+
+
+def _text(node):
+    # Text with inline markup (<i>, <sup>) flattened
+    return "".join(node.itertext()).strip() if node is not None else ""
+
+
+def parse_article(elem):
+    """pmid, date, title, abstract and journal of one PubmedArticle element."""
+    citation = elem.find("MedlineCitation")
+    article = citation.find("Article")
+    candidates = [elem.find("PubmedData/History/PubMedPubDate[@PubStatus='pubmed']"), citation.find("DateCompleted"),
+                  citation.find("DateRevised")]
+    if article is not None:
+        candidates += [article.find("ArticleDate"), article.find("Journal/JournalIssue/PubDate")]
+    return {
+        "pmid": int(citation.findtext("PMID")),
+        "date": next((found for found in map(_date, candidates) if found), None),
+        "title": _text(article.find("ArticleTitle")) if article is not None else "",
+        "abstract": " ".join(_text(part) for part in article.iterfind("Abstract/AbstractText"))
+        if article is not None else "",
+        "journal": (article.findtext("Journal/Title") or "") if article is not None else "",
+    }
+
+
+def iter_medline(source):
+    """Yield the articles of a MEDLINE XML file (plain or .gz) one at a time, with bounded memory.
+
+    Articles are parse_article dicts; each PMID of a DeleteCitation comes
+    as {"pmid": ..., "deleted": True}.
+    """
+    with (gzip.open(source) if str(source).endswith(".gz") else open(source, "rb")) as file:
+        context = ElementTree.iterparse(file, events=("start", "end"))
+        _, root = next(context)
+        for event, elem in context:
+            if event != "end":
+                continue
+            if elem.tag == "PubmedArticle":
+                yield parse_article(elem)
+                # Drop the finished article (and anything before it) from the tree
+                root.clear()
+            elif elem.tag == "DeleteCitation":
+                for pmid in elem.iterfind("PMID"):
+                    yield {"pmid": int(pmid.text), "deleted": True}
+                root.clear()
+
+
+def medline_sources(source_dir):
+    """The MEDLINE XML files of a directory, in name order (baseline before updates)."""
+    return sorted(path for pattern in SOURCE_PATTERNS for path in Path(source_dir).glob(pattern))
+
+
+# ---------------- VOCABULARIES ----------------
+
+def dictionary_terms(drugs):
+    """{normalized name: product} of a drugs.DrugNormalizer's dictionary."""
+    return dict(zip(drugs.keys, drugs.preferred_names))
+
+
+def meddra_terms(index):
+    """{normalized LLT name: PT name} of a meddra.MeddraIndex's current LLTs."""
+    a = index.arrays
+    current = np.flatnonzero(a["llt_current"] & (a["llt_pt"] >= 0))
+    pts = np.char.decode(a["pt_name"][a["llt_pt"][current]]).tolist()
+    return {normalize_term(name): pt for name, pt in zip(np.char.decode(a["llt_name"][current]).tolist(), pts)}
+
+
+def corpus_terms(drugs, meddra=None, events=()):
+    """drug_terms and event_terms for LiteratureIndex.build: dictionary names, and MedDRA's LLTs or else events."""
+    return dictionary_terms(drugs), meddra_terms(meddra) if meddra is not None else {
+        normalize_term(event): event for event in events}
+
+
+def _distinct(values):
+    # Sorted distinct values; np.unique hashes int64 arrays, which is far slower than sorting them
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+
+def _word_hash(word):
+    return int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+
+
+def _phrases(terms, vocab):
+    # Sorted phrase hashes, their concept numbers and the concept names of a {term: concept name} mapping
+    names = sorted(set(terms.values()))
+    concept = {name: i for i, name in enumerate(names)}
+    keys = {}
+    for term, name in terms.items():
+        words = normalize_term(term).split()
+        if not words or len(words) > MAX_PHRASE_WORDS or len(" ".join(words)) < 3:
+            continue
+        key = 0
+        for word in words:
+            key = ((key * _PRIME) & _MASK) ^ (vocab.setdefault(word, len(vocab)) + 1)
+        keys.setdefault(key, concept[name])
+    order = sorted(keys)
+    return np.array(order, dtype=np.uint64), np.array([keys[key] for key in order], dtype=np.int64), names
+
+
+def _phrase_hits(word_ids, docs, keys, concepts):
+    # (concept << 32 | doc) of every phrase occurrence; a run of words must lie within one article
+    found_hits = []
+    runs = np.zeros(len(word_ids), dtype=np.uint64)
+    for n in range(1, MAX_PHRASE_WORDS + 1):
+        span = len(word_ids) - n + 1
+        if span <= 0 or not len(keys):
+            break
+        runs = runs[:span] * np.uint64(_PRIME) ^ (word_ids[n - 1:].astype(np.uint64) + np.uint64(1))
+        positions = np.minimum(np.searchsorted(keys, runs), len(keys) - 1)
+        found = (keys[positions] == runs) & (docs[:span] == docs[n - 1:])
+        found_hits.append(concepts[positions[found]] << 32 | docs[:span][found])
+    return _distinct(np.concatenate(found_hits)) if found_hits else np.zeros(0, dtype=np.int64)
+
+
+# ---------------- INDEX ----------------
+
+def _sources(paths):
+    return {str(path): [path.stat().st_size, path.stat().st_mtime_ns] for path in paths}
+
+
+def terms_fingerprint(drug_terms, event_terms):
+    """Digest of the vocabularies an index is built with, for LiteratureIndex.is_current."""
+    digest = hashlib.blake2b(digest_size=16)
+    for terms in (drug_terms, event_terms):
+        digest.update(json.dumps(sorted(terms.items())).encode())
+    return digest.hexdigest()
+
+
+class _Builder:
+    """Batch-by-batch index construction into a staging directory."""
+
+    def __init__(self, staging, drug_terms, event_terms):
+        self.staging = staging
+        self.vocab = {}
+        self.phrases = {"drug": _phrases(drug_terms, self.vocab), "event": _phrases(event_terms, self.vocab)}
+        self.counts = {kind: np.zeros(0, dtype=np.int64) for kind in KINDS}
+        self.segments = {kind: [] for kind in KINDS}
+        self.pmids, self.dates, self.doc_event_counts, self.doc_events = [], [], [], []
+        self.deleted = {}       # pmid -> number of articles read before its deletion
+        self.n_docs = 0
+        self.writer = pa.ipc.new_file(str(staging / "articles.arrow"), _DOC_SCHEMA)
+
+    def _segment(self, kind, pairs):
+        # pairs: sorted (key << 32 | doc); saved for the final merge, counted per key
+        keys = pairs >> 32
+        counts = np.bincount(keys, minlength=len(self.counts[kind]))
+        counts[:len(self.counts[kind])] += self.counts[kind]
+        self.counts[kind] = counts
+        path = self.staging / f"segment-{kind}-{len(self.segments[kind]):05d}.npy"
+        np.save(path, pairs)
+        self.segments[kind].append(path)
+
+    def add(self, articles):
+        first = self.n_docs
+        docs = np.arange(first, first + len(articles), dtype=np.int64)
+        self.n_docs += len(articles)
+        self.pmids.append(np.array([article["pmid"] for article in articles], dtype=np.int64))
+        self.dates.append(np.array([article["date"] for article in articles], dtype="datetime64[D]"))
+        self.writer.write_batch(pa.RecordBatch.from_pydict(
+            {name: [article[name] for article in articles] for name in CORPUS_COLUMNS}, schema=_DOC_SCHEMA))
+
+        words = [_WORD.findall(f"{a['title']} {a['abstract']}".casefold()) for a in articles]
+        lengths = np.array([len(text) for text in words], dtype=np.int64)
+        flat = [word for text in words for word in text]
+        codes, uniques = pd.factorize(pd.Series(flat, dtype=object))
+        word_ids = np.array([self.vocab.setdefault(word, len(self.vocab)) for word in uniques], dtype=np.int64)[codes] \
+            if len(uniques) else np.zeros(0, dtype=np.int64)
+        word_docs = np.repeat(docs, lengths)
+
+        indexed = np.array([len(word) > 1 and word not in STOP_WORDS for word in uniques], dtype=bool)[codes] \
+            if len(uniques) else np.zeros(0, dtype=bool)
+        self._segment("word", _distinct(word_ids[indexed] << 32 | word_docs[indexed]))
+        self._segment("drug", _phrase_hits(word_ids, word_docs, *self.phrases["drug"][:2]))
+        events = _phrase_hits(word_ids, word_docs, *self.phrases["event"][:2])
+        self._segment("event", events)
+
+        # Forward list: each article's events, in article order
+        by_doc = np.sort((events & 0xFFFFFFFF) << 32 | events >> 32)
+        self.doc_event_counts.append(np.bincount((by_doc >> 32) - first, minlength=len(articles)))
+        self.doc_events.append((by_doc & 0xFFFFFFFF).astype(np.int32))
+
+    def delete(self, pmid):
+        self.deleted[pmid] = self.n_docs
+
+    def _merge(self, kind):
+        counts = self.counts[kind]
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        postings = np.lib.format.open_memmap(self.staging / f"{kind}_postings.npy", mode="w+", dtype=np.int32,
+                                             shape=(int(offsets[-1]),))
+        filled = offsets[:-1].copy()
+        for path in self.segments[kind]:
+            pairs = np.load(path)
+            keys = pairs >> 32
+            # A key's articles follow its earlier segments' ones; within a segment they are sorted already
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if len(keys) \
+                else np.zeros(0, dtype=np.int64)
+            sizes = np.diff(np.append(starts, len(keys)))
+            rank = np.arange(len(keys)) - np.repeat(starts, sizes)
+            postings[filled[keys] + rank] = pairs & 0xFFFFFFFF
+            filled[keys[starts]] += sizes
+            path.unlink()
+        postings.flush()
+        del postings
+        np.save(self.staging / f"{kind}_offsets.npy", offsets)
+
+    def finish(self, meta):
+        self.writer.close()
+        for kind in KINDS:
+            self._merge(kind)
+        pmids = np.concatenate(self.pmids) if self.pmids else np.zeros(0, dtype=np.int64)
+        dates = np.concatenate(self.dates) if self.dates else np.zeros(0, dtype="datetime64[D]")
+        # The last record of a PMID counts, unless the PMID was deleted after it
+        live = ~pd.Series(pmids).duplicated(keep="last").to_numpy()
+        deleted_at = pd.Series(pmids).map(self.deleted).to_numpy(dtype=np.float64)
+        live &= ~(np.arange(len(pmids)) < np.nan_to_num(deleted_at, nan=-1))
+        event_counts = np.concatenate(self.doc_event_counts) if self.doc_event_counts else np.zeros(0, dtype=np.int64)
+        arrays = {"doc_pmids": pmids, "doc_dates": dates, "doc_live": live,
+                  "doc_event_offsets": np.concatenate(([0], np.cumsum(event_counts))).astype(np.int64),
+                  "doc_events": np.concatenate(self.doc_events) if self.doc_events else np.zeros(0, dtype=np.int32)}
+        # Words are looked up by hash: sorted hashes and the word number of each
+        words = list(self.vocab)
+        hashes = np.array([_word_hash(word) for word in words], dtype=np.uint64)
+        order = np.argsort(hashes, kind="stable")
+        arrays["word_hashes"], arrays["word_numbers"] = hashes[order], order.astype(np.int32)
+        for name, values in arrays.items():
+            np.save(self.staging / f"{name}.npy", values)
+        meta.update(drug_names=self.phrases["drug"][2], event_names=self.phrases["event"][2],
+                    articles=int(live.sum()), words=len(words))
+        (self.staging / "meta.json").write_text(json.dumps(meta))
+
+
+class LiteratureIndex:
+    def __init__(self, arrays, articles, meta):
+        self.arrays = arrays
+        self.table = articles
+        self.meta = meta
+        self.names = {kind: np.array(meta[f"{kind}_names"], dtype=object) for kind in KINDS[1:]}
+        self._numbers = {kind: {name: i for i, name in enumerate(meta[f"{kind}_names"])} for kind in KINDS[1:]}
+
+    @classmethod
+    def build(cls, sources, index_dir, drug_terms, event_terms, batch_size=BATCH_ARTICLES, on_progress=None):
+        """Index MEDLINE XML files (in order) into index_dir; returns the loaded index.
+
+        drug_terms and event_terms map normalized names to products and
+        reaction concepts (see dictionary_terms, meddra_terms).
+        on_progress(articles, seconds) follows each batch.
+        """
+        started = time.perf_counter()
+        sources, index_dir = [Path(path) for path in sources], Path(index_dir)
+        # Written next to the index and swapped in, so readers never see half an index
+        staging = index_dir.with_name(index_dir.name + ".building")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        builder = _Builder(staging, drug_terms, event_terms)
+        batch = []
+        for source in sources:
+            for article in iter_medline(source):
+                if article.get("deleted"):
+                    if batch:
+                        builder.add(batch)
+                        batch = []
+                    builder.delete(article["pmid"])
+                    continue
+                batch.append(article)
+                if len(batch) >= batch_size:
+                    builder.add(batch)
+                    batch = []
+                    if on_progress:
+                        on_progress(builder.n_docs, time.perf_counter() - started)
+        if batch:
+            builder.add(batch)
+        builder.finish({"sources": _sources(sources), "terms": terms_fingerprint(drug_terms, event_terms)})
+        retired = index_dir.with_name(index_dir.name + ".retired")
+        shutil.rmtree(retired, ignore_errors=True)
+        if index_dir.exists():
+            os.replace(index_dir, retired)
+        os.replace(staging, index_dir)
+        shutil.rmtree(retired, ignore_errors=True)
+        return cls.load(index_dir)
+
+    @classmethod
+    def load(cls, index_dir, mmap_mode="r"):
+        index_dir = Path(index_dir)
+        # Plain ndarray views of the mapping; np.memmap slicing is several times slower
+        arrays = {path.stem: np.load(path, mmap_mode=mmap_mode).view(np.ndarray) for path in index_dir.glob("*.npy")}
+        articles = pa.ipc.open_file(pa.memory_map(str(index_dir / "articles.arrow"))).read_all()
+        return cls(arrays, articles, json.loads((index_dir / "meta.json").read_text()))
+
+    @staticmethod
+    def is_current(index_dir, sources, terms):
+        """Whether index_dir was built from these files and the vocabularies with this terms_fingerprint."""
+        meta_path = Path(index_dir) / "meta.json"
+        if not meta_path.exists():
+            return False
+        meta = json.loads(meta_path.read_text())
+        return meta["sources"] == _sources(sources) and meta["terms"] == terms
+
+    def __len__(self):
+        return int(self.meta["articles"])
+
+    def summary(self):
+        dates = self.arrays["doc_dates"][self.arrays["doc_live"]]
+        dates = dates[~np.isnat(dates)]
+        return {"articles": len(self), "words": self.meta["words"], "products": len(self.names["drug"]),
+                "reaction concepts": len(self.names["event"]),
+                "postings": sum(len(self.arrays[f"{kind}_postings"]) for kind in KINDS),
+                "first date": str(dates.min()) if len(dates) else "",
+                "last date": str(dates.max()) if len(dates) else ""}
+
+    def _keys(self, kind, names):
+        if kind != "word":
+            return [self._numbers[kind][name] for name in names if name in self._numbers[kind]]
+        hashes = self.arrays["word_hashes"]
+        keys = []
+        for name in names:
+            for word in normalize_term(name).split():
+                position = int(np.searchsorted(hashes, np.uint64(_word_hash(word))))
+                keys.append(int(self.arrays["word_numbers"][position])
+                            if position < len(hashes) and hashes[position] == _word_hash(word) else -1)
+        return keys
+
+    def postings(self, kind, name):
+        """Ascending article numbers of a word, product or reaction concept (all articles, live or not)."""
+        keys = self._keys(kind, [name])
+        if not keys or keys[0] < 0:
+            return np.zeros(0, dtype=np.int32)
+        offsets = self.arrays[f"{kind}_offsets"]
+        return self.arrays[f"{kind}_postings"][offsets[keys[0]]:offsets[keys[0] + 1]]
+
+    def _any(self, kind, names):
+        lists = [self.postings(kind, name) for name in names]
+        return _distinct(np.concatenate(lists)) if lists else np.zeros(0, dtype=np.int32)
+
+    def _in_range(self, docs, since=None, until=None):
+        keep = self.arrays["doc_live"][docs]
+        dates = self.arrays["doc_dates"][docs]
+        if since:
+            keep &= dates >= np.datetime64(str(since)[:10], "D")
+        if until:
+            keep &= dates <= np.datetime64(str(until)[:10], "D")
+        return docs[keep]
+
+    def search(self, words=(), products=(), events=(), since=None, until=None):
+        """Article numbers with all the words, any of the products and any of the events, dated since-until."""
+        # Stop words have no postings, so they cannot narrow the search
+        sets = [self.postings("word", word) for text in words for word in normalize_term(text).split()
+                if len(word) > 1 and word not in STOP_WORDS]
+        if products:
+            sets.append(self._any("drug", products))
+        if events:
+            sets.append(self._any("event", events))
+        if not sets:
+            docs = np.arange(len(self.arrays["doc_pmids"]), dtype=np.int32)
+        else:
+            # Smallest list first, so each intersection is at most its size
+            sets.sort(key=len)
+            docs = sets[0]
+            for other in sets[1:]:
+                docs = docs[np.isin(docs, other, assume_unique=True)]
+        return self._in_range(docs, since, until)
+
+    def articles(self, docs):
+        """CORPUS_COLUMNS of article numbers, in their order."""
+        return self.table.take(pa.array(np.asarray(docs, dtype=np.int64))).to_pandas(date_as_object=False)
+
+    def co_mentions(self, products, listedness=None, since=None, until=None, words=(), unlisted_only=True):
+        """CO_MENTION_COLUMNS: one row per article, product and reaction concept mentioned together, newest first.
+
+        Articles are those search finds for each product with the words.
+        listed comes from a literature.ListednessIndex (False without one);
+        with unlisted_only, listed pairs are left out.
+        """
+        offsets, events = self.arrays["doc_event_offsets"], self.arrays["doc_events"]
+        parts = []
+        for product in products:
+            docs = self.search(words, [product], since=since, until=until).astype(np.int64)
+            starts, sizes = offsets[docs], offsets[docs + 1] - offsets[docs]
+            positions = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+            parts.append(pd.DataFrame({"doc": np.repeat(docs, sizes), "product": product,
+                                       "event": self.names["event"][events[positions]] if len(positions) else []}))
+        pairs = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["doc", "product", "event"])
+        pairs["listed"] = listedness.listed_mask(pairs["product"], pairs["event"]) if listedness is not None \
+            and len(pairs) else False
+        if unlisted_only:
+            pairs = pairs[~pairs["listed"].astype(bool)]
+        table = self.articles(pairs["doc"]).assign(product=pairs["product"].to_numpy(), event=pairs["event"].to_numpy(),
+                                                   listed=pairs["listed"].to_numpy(dtype=bool))
+        return table.sort_values(["date", "pmid"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_literature_index(index_dir):
+    """The process-wide LiteratureIndex of a directory, reloaded after a rebuild; None before the first build."""
+    meta_path = Path(index_dir) / "meta.json"
+    if not meta_path.exists():
+        return None
+    stamp = meta_path.stat().st_mtime_ns
+    key = str(index_dir)
+    with _indexes_lock:
+        if key not in _indexes or _indexes[key][0] != stamp:
+            _indexes[key] = (stamp, LiteratureIndex.load(index_dir))
+        return _indexes[key][1]
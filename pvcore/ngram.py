@@ -0,0 +1,74 @@
+"""Character n-gram index for typo-tolerant lookup over a fixed list of terms.
+
+Terms are indexed by the CRC32 hashes of their padded character n-grams.
+The postings are kept as flat arrays (sorted gram keys, offsets, term ids),
+so an index can be saved as .npy files and memory-mapped. A query scores
+the terms sharing its grams by Dice similarity. Terms are expected to be
+normalized already (see literature.normalize_term).
+"""
+import zlib
+
+import numpy as np
+
+ARRAYS = ["gram_keys", "gram_offsets", "postings", "term_sizes"]
+
+
+def ngrams(text, n=3):
+    """Distinct n-gram hashes of a term, padded with one space on each side."""
+    padded = f" {text} "
+    return np.unique(np.array([zlib.crc32(padded[i:i + n].encode()) for i in range(max(len(padded) - n + 1, 1))],
+                              dtype=np.uint32))
+
+
+class NgramIndex:
+    def __init__(self, gram_keys, gram_offsets, postings, term_sizes, n=3):
+        self.gram_keys = gram_keys        # sorted distinct gram hashes
+        self.gram_offsets = gram_offsets  # postings of gram_keys[i] are postings[offsets[i]:offsets[i + 1]]
+        self.postings = postings          # term ids
+        self.term_sizes = term_sizes      # distinct grams per term
+        self.n = n
+
+    @classmethod
+    def build(cls, terms, n=3):
+        grams = [ngrams(term, n) for term in terms]
+        sizes = np.array([len(g) for g in grams], dtype=np.int32)
+        keys = np.concatenate(grams) if grams else np.zeros(0, dtype=np.uint32)
+        ids = np.repeat(np.arange(len(grams), dtype=np.int32), sizes)
+        order = np.argsort(keys, kind="stable")
+        keys, ids = keys[order], ids[order]
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1]))) if len(keys) else np.zeros(0, dtype=np.int64)
+        offsets = np.append(starts, len(keys)).astype(np.int64)
+        return cls(keys[starts], offsets, ids, sizes, n)
+
+    def arrays(self):
+        return {name: getattr(self, name) for name in ARRAYS}
+
+    def __len__(self):
+        return len(self.term_sizes)
+
+    def search(self, text, limit=10, min_score=0.0, candidates=None):
+        """Term ids and Dice scores of the best matches, best first.
+
+        candidates (a boolean mask over term ids) restricts the search.
+        """
+        query = ngrams(text, self.n)
+        if not len(self.gram_keys):
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        found = np.minimum(np.searchsorted(self.gram_keys, query), len(self.gram_keys) - 1)
+        found = found[self.gram_keys[found] == query]
+        if not len(found):
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        hits = np.concatenate([self.postings[self.gram_offsets[i]:self.gram_offsets[i + 1]] for i in found])
+        shared = np.bincount(hits, minlength=len(self.term_sizes))
+        # Whatever a term's size, a Dice score of min_score needs this many shared grams
+        ids = np.flatnonzero(shared >= max(min_score * len(query) / (2 - min_score), 1))
+        if candidates is not None:
+            ids = ids[candidates[ids]]
+        scores = 2 * shared[ids] / (len(query) + self.term_sizes[ids])
+        keep = scores >= min_score
+        ids, scores = ids[keep], scores[keep]
+        if len(ids) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+            ids, scores = ids[top], scores[top]
+        order = np.lexsort((ids, -scores))
+        return ids[order], scores[order]
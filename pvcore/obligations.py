@@ -0,0 +1,199 @@
+"""Which cases must be reported to which authority, and by when.
+
+Reporting obligations are a declarative rules table: one row per authority
+and report, with the report types, seriousness, seriousness criteria,
+expectedness and origin (domestic or foreign to the authority) it applies
+to, the case date that starts the clock and the days allowed. "*" matches
+anything and "|" separates alternatives. The table is compiled once into
+sets of accepted values, and a case backlog is evaluated rule by rule over
+factorized columns, so the cost grows with rules x cases in NumPy rather
+than with per-case branching. Where several rules of an authority apply,
+the earliest due date wins.
+
+The default rules are a simplified reading of the expedited reporting
+timelines (FDA 21 CFR 312.32/314.80, EU GVP VI and CTR, ...), not a
+substitute for the regulations.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from pvcore.literature import ListednessIndex
+
+RULE_COLUMNS = ["authority", "report", "report_types", "seriousness", "criteria", "expectedness", "origin",
+                "clock_start", "due_days"]
+POSTMARKETING = "Spontaneous|Literature|Other"
+FATAL_OR_LIFE_THREATENING = "Death|Life Threatening"
+REPORTING_RULES = [
+    ("FDA", "IND safety report (fatal/life-threatening)", "Clinical Trial", "Serious", FATAL_OR_LIFE_THREATENING, "Unexpected", "*", "case_received_date", 7),
+    ("FDA", "IND safety report", "Clinical Trial", "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("FDA", "15-day Alert report", POSTMARKETING, "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("EMA", "SUSAR (fatal/life-threatening)", "Clinical Trial", "Serious", FATAL_OR_LIFE_THREATENING, "Unexpected", "*", "case_received_date", 7),
+    ("EMA", "SUSAR", "Clinical Trial", "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("EMA", "Serious ICSR", POSTMARKETING, "Serious", "*", "*", "*", "case_received_date", 15),
+    ("EMA", "Non-serious ICSR", POSTMARKETING, "Non Serious", "*", "*", "domestic", "case_received_date", 90),
+    ("MHRA", "SUSAR (fatal/life-threatening)", "Clinical Trial", "Serious", FATAL_OR_LIFE_THREATENING, "Unexpected", "*", "case_received_date", 7),
+    ("MHRA", "SUSAR", "Clinical Trial", "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("MHRA", "Serious ICSR", POSTMARKETING, "Serious", "*", "*", "*", "case_received_date", 15),
+    ("MHRA", "Non-serious ICSR", POSTMARKETING, "Non Serious", "*", "*", "domestic", "case_received_date", 90),
+    ("PMDA", "Serious unexpected ADR", "*", "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("PMDA", "Serious expected ADR", POSTMARKETING, "Serious", "*", "Expected", "domestic", "case_received_date", 30),
+    ("Health Canada", "Clinical trial ADR (fatal/life-threatening)", "Clinical Trial", "Serious", FATAL_OR_LIFE_THREATENING, "Unexpected", "*", "case_received_date", 7),
+    ("Health Canada", "Clinical trial ADR", "Clinical Trial", "Serious", "*", "Unexpected", "*", "case_received_date", 15),
+    ("Health Canada", "Serious domestic ADR", POSTMARKETING, "Serious", "*", "*", "domestic", "case_received_date", 15),
+    ("Health Canada", "Serious unexpected foreign ADR", POSTMARKETING, "Serious", "*", "Unexpected", "foreign", "case_received_date", 15),
+    ("CDSCO", "Serious ADR", "*", "Serious", "*", "*", "domestic", "case_received_date", 15),
+    ("TGA", "Clinical trial SUSAR (fatal/life-threatening)", "Clinical Trial", "Serious", FATAL_OR_LIFE_THREATENING, "Unexpected", "domestic", "case_received_date", 7),
+    ("TGA", "Clinical trial SUSAR", "Clinical Trial", "Serious", "*", "Unexpected", "domestic", "case_received_date", 15),
+    ("TGA", "Serious ADR", POSTMARKETING, "Serious", "*", "*", "domestic", "case_received_date", 15),
+]
+
+_EEA = ["Austria", "Belgium", "Bulgaria", "Croatia", "Cyprus", "Czechia", "Czech Republic", "Denmark", "Estonia",
+        "Finland", "France", "Germany", "Greece", "Hungary", "Ireland", "Italy", "Latvia", "Lithuania", "Luxembourg",
+        "Malta", "Netherlands", "Poland", "Portugal", "Romania", "Slovakia", "Slovenia", "Spain", "Sweden",
+        "Iceland", "Liechtenstein", "Norway"]
+# Country names (any case) that are domestic for each authority
+AUTHORITY_COUNTRIES = {
+    "FDA": ["USA", "US", "United States", "United States of America"],
+    "EMA": _EEA,
+    "MHRA": ["UK", "United Kingdom", "Great Britain", "England", "Scotland", "Wales", "Northern Ireland"],
+    "PMDA": ["Japan"],
+    "Health Canada": ["Canada"],
+    "CDSCO": ["India"],
+    "TGA": ["Australia"],
+}
+# Rule column -> the case attribute it tests
+CONDITIONS = {"report_types": "report_type", "seriousness": "seriousness", "criteria": "seriousness_detail",
+              "expectedness": "expectedness"}
+# Case columns evaluate() reads (expectedness is derived from drug and event when absent)
+CASE_COLUMNS = ["case_id", "case_received_date", "report_type", "country", "seriousness", "seriousness_detail",
+                "suspected_drug", "ae_verbatim"]
+_NONE = np.iinfo(np.int64).max
+
+
+def _accepted(value):
+    value = str(value).strip()
+    return None if value in ("", "*") else frozenset(v.strip().casefold() for v in value.split("|"))
+
+
+def _factorized(values):
+    # Factorized first, so cleaning touches only the distinct values
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=False)
+    return codes, np.array([u.strip().casefold() if isinstance(u, str) else "" for u in uniques], dtype=object)
+
+
+def expectedness(cases, listedness=None):
+    """"Expected"/"Unexpected" per case: the expectedness column if filled, else the event's listedness for the drug."""
+    listedness = listedness or ListednessIndex()
+    drug_codes, drugs = _factorized(cases["suspected_drug"])
+    event_codes, events = _factorized(cases["ae_verbatim"])
+    # Each distinct drug-event pair is looked up once
+    pairs, inverse = np.unique(drug_codes.astype(np.int64) * max(len(events), 1) + event_codes, return_inverse=True)
+    listed = listedness.listed_mask(pd.Series(drugs[pairs // max(len(events), 1)]), pd.Series(events[pairs % max(len(events), 1)]))
+    derived = np.where(listed, "Expected", "Unexpected")[inverse.ravel()]
+    if "expectedness" in cases:
+        codes, given = _factorized(cases["expectedness"])
+        return np.where(given[codes] != "", given[codes], derived)
+    return derived
+
+
+@dataclass
+class Obligations:
+    case_ids: np.ndarray
+    authorities: list
+    due: np.ndarray      # days since 1970-01-01, (cases, authorities); max int64 where nothing is due
+    rule: np.ndarray     # row of the rules table that set each due date; -1 where nothing is due
+    rules: pd.DataFrame
+
+    def __len__(self):
+        return int((self.rule >= 0).sum())
+
+    def due_dates(self):
+        """Case x authority matrix of due dates (NaT where not reportable)."""
+        dates = np.where(self.rule >= 0, self.due, np.iinfo(np.int64).min).astype("datetime64[D]")
+        return pd.DataFrame(dates, index=pd.Index(self.case_ids, name="case_id"), columns=self.authorities)
+
+    def table(self, authority=None):
+        """One row per reportable case and authority: report, clock start and due date."""
+        rows, columns = np.nonzero(self.rule >= 0)
+        if authority is not None:
+            keep = columns == self.authorities.index(authority)
+            rows, columns = rows[keep], columns[keep]
+        rules = self.rules.iloc[self.rule[rows, columns]]
+        return pd.DataFrame({
+            "case_id": self.case_ids[rows],
+            "authority": np.array(self.authorities, dtype=object)[columns],
+            "report": rules["report"].to_numpy(),
+            "due_days": rules["due_days"].to_numpy(),
+            "due_date": self.due[rows, columns].astype("datetime64[D]"),
+        })
+
+    def summary(self):
+        """Reportable cases and earliest and latest due date per authority."""
+        reportable = self.rule >= 0
+        due = np.where(reportable, self.due, _NONE)
+        latest = np.where(reportable, self.due, np.iinfo(np.int64).min)
+        return pd.DataFrame({
+            "Authority": self.authorities,
+            "Reportable Cases": reportable.sum(axis=0),
+            "Earliest Due": [pd.Timestamp(d, unit="D") if d != _NONE else pd.NaT for d in due.min(axis=0)],
+            "Latest Due": [pd.Timestamp(d, unit="D") if n else pd.NaT for d, n in zip(latest.max(axis=0), reportable.sum(axis=0))],
+        })
+
+
+class ObligationRules:
+    def __init__(self, rules=None, countries=None):
+        rules = pd.DataFrame(REPORTING_RULES, columns=RULE_COLUMNS) if rules is None else rules.reindex(columns=RULE_COLUMNS)
+        rules = rules.fillna("*").astype({"due_days": int}).reset_index(drop=True)
+        for column in ["authority", "report", "origin", "clock_start"]:
+            rules[column] = rules[column].astype(str).str.strip()
+        unknown = set(rules["origin"]) - {"*", "domestic", "foreign"}
+        if unknown:
+            raise ValueError(f"origin must be domestic, foreign or *, not {sorted(unknown)}")
+        self.rules = rules
+        self.authorities = list(dict.fromkeys(rules["authority"]))
+        countries = countries or AUTHORITY_COUNTRIES
+        self.countries = {a: frozenset(c.casefold() for c in countries.get(a, [])) for a in self.authorities}
+        # Compiled once: per rule, the accepted values of each condition (None for "*")
+        self.conditions = [{attribute: _accepted(rule[column]) for column, attribute in CONDITIONS.items()}
+                           for rule in rules.to_dict("records")]
+
+    @classmethod
+    def from_csv(cls, path, countries=None):
+        """Rules from a CSV with RULE_COLUMNS."""
+        return cls(pd.read_csv(path, dtype=str, keep_default_na=False), countries)
+
+    def evaluate(self, cases, listedness=None):
+        """Obligations of a case table (CASE_COLUMNS) under every rule."""
+        n = len(cases)
+        attributes = {attribute: _factorized(cases[attribute]) if attribute in cases else _factorized([""] * n)
+                      for attribute in CONDITIONS.values() if attribute != "expectedness"}
+        attributes["expectedness"] = _factorized(expectedness(cases, listedness))
+        country_codes, countries = _factorized(cases["country"])
+        clocks = {}
+        for column in self.rules["clock_start"].unique():
+            codes, uniques = pd.factorize(cases[column].to_numpy(dtype=object), use_na_sentinel=False)
+            days = pd.to_datetime(pd.Series(uniques, dtype=object).astype(str).str[:10], format="%Y-%m-%d",
+                                  errors="coerce").to_numpy().astype("datetime64[D]")
+            clocks[column] = (days.astype(np.int64)[codes], ~np.isnat(days)[codes])
+
+        due = np.full((n, len(self.authorities)), _NONE, dtype=np.int64)
+        rule_of = np.full((n, len(self.authorities)), -1, dtype=np.int16)
+        for i, (rule, conditions) in enumerate(zip(self.rules.to_dict("records"), self.conditions)):
+            column = self.authorities.index(rule["authority"])
+            clock, known = clocks[rule["clock_start"]]
+            mask = known.copy()
+            for attribute, accepted in conditions.items():
+                if accepted is not None:
+                    codes, uniques = attributes[attribute]
+                    mask &= np.isin(uniques, list(accepted))[codes]
+            if rule["origin"] != "*":
+                domestic = np.isin(countries, list(self.countries[rule["authority"]]))[country_codes]
+                mask &= domestic if rule["origin"] == "domestic" else ~domestic
+            days = clock + rule["due_days"]
+            earlier = mask & (days < due[:, column])
+            due[earlier, column] = days[earlier]
+            rule_of[earlier, column] = i
+        case_ids = cases["case_id"].astype(str).to_numpy() if "case_id" in cases else np.arange(n).astype(str)
+        return Obligations(case_ids, self.authorities, due, rule_of, self.rules)
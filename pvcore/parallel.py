@@ -0,0 +1,16 @@
+"""Process pool shared by the batch engines."""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def process_pool(workers=None):
+    # "spawn" keeps workers independent of the threads Streamlit runs in the parent.
+    return ProcessPoolExecutor(
+        max_workers=workers or default_workers(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
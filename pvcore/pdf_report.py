@@ -0,0 +1,90 @@
+"""ICSR PDF rendering, single case or batch into one ZIP.
+
+Everything is rendered in memory: no file is written to the working
+directory, so concurrent sessions never share or overwrite output.
+"""
+import re
+import zipfile
+
+from fpdf import FPDF
+
+from pvcore.icsr import ICSR_SECTIONS
+from pvcore.parallel import process_pool
+
+# Below this many cases the pool start-up costs more than it saves.
+MIN_POOL_BATCH = 64
+
+
+def _latin1(value):
+    # The built-in PDF fonts only cover Latin-1.
+    if value is None:
+        return ""
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def render_icsr_pdf(case):
+    """Render one case (a field -> value mapping) and return the PDF bytes."""
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, "ICSR Case Report", new_x="LMARGIN", new_y="NEXT", align="C")
+    pdf.ln(5)
+
+    for section, fields in ICSR_SECTIONS.items():
+        pdf.set_font("Helvetica", "B", 12)
+        pdf.cell(0, 8, section, new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", "", 10)
+        for key, label in fields:
+            pdf.multi_cell(0, 6, f"{label}: {_latin1(case.get(key, ''))}", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+    return bytes(pdf.output())
+
+
+def pdf_file_name(case, position):
+    case_id = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(case.get("case_id") or "")).strip("_")
+    return f"ICSR_{case_id or position + 1}.pdf"
+
+
+def member_name(name, used):
+    """name, with a _2, _3, ... suffix if it is in used (the archive's names so far), which it is added to.
+
+    Cases sharing a case_id would otherwise overwrite each other when extracted.
+    """
+    stem, extension = name.rsplit(".", 1)
+    unique, repeat = name, 1
+    while unique in used:
+        repeat += 1
+        unique = f"{stem}_{repeat}.{extension}"
+    used.add(unique)
+    return unique
+
+
+def _render_named(item):
+    position, case = item
+    return pdf_file_name(case, position), render_icsr_pdf(case)
+
+
+def cases_from_table(df):
+    """Turn a case table (one row per case) into the dicts render_icsr_pdf expects."""
+    return df.astype(object).where(df.notna(), "").to_dict("records")
+
+
+def iter_rendered(cases, workers=None, chunksize=16):
+    """Yield (file name, PDF bytes) in input order, using a process pool for large batches."""
+    items = list(enumerate(cases))
+    if len(items) < MIN_POOL_BATCH or workers == 1:
+        yield from map(_render_named, items)
+        return
+    with process_pool(workers) as pool:
+        yield from pool.map(_render_named, items, chunksize=chunksize)
+
+
+def write_pdf_zip(cases, fileobj, workers=None, chunksize=16):
+    """Write the batch ZIP into fileobj and return the number of PDFs written."""
+    used = set()
+    # PDF streams are already deflated, so the members are stored as-is.
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, data in iter_rendered(cases, workers, chunksize):
+            archive.writestr(member_name(name, used), data)
+    return len(used)
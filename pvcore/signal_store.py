@@ -0,0 +1,170 @@
+"""Persisted drug x event counts, updated incrementally as case batches arrive.
+
+The store keeps each case's drug-event pairs, the sparse cell counts (a),
+the drug and event marginals and N in SQLite. A batch only touches the cases
+it contains: their previous contribution is subtracted, the new one added,
+and statistics are recomputed only for the pairs whose cell count changed.
+Nullified and duplicate cases are reversed the same way.
+
+Other pairs keep their last statistics; the small drift from the batch's
+effect on the drug/event marginals and N is picked up by refresh(), e.g. in
+a nightly job.
+"""
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from pvcore.signals import add_signal_flags, complete_rows, disproportionality_arrays
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS case_pairs (
+    case_id TEXT NOT NULL, drug TEXT NOT NULL, event TEXT NOT NULL,
+    PRIMARY KEY (case_id, drug, event)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cells (
+    drug TEXT NOT NULL, event TEXT NOT NULL, a INTEGER NOT NULL,
+    PRIMARY KEY (drug, event)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cells_event ON cells (event);
+CREATE TABLE IF NOT EXISTS drug_totals (drug TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS event_totals (event TEXT PRIMARY KEY, n INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pair_stats (
+    drug TEXT NOT NULL, event TEXT NOT NULL,
+    a INTEGER, b INTEGER, c INTEGER, d INTEGER, expected REAL,
+    prr REAL, prr_lower REAL, prr_upper REAL,
+    ror REAL, ror_lower REAL, ror_upper REAL,
+    ic REAL, ic025 REAL, ic975 REAL, chi2 REAL,
+    PRIMARY KEY (drug, event)
+) WITHOUT ROWID;
+"""
+
+STAT_COLUMNS = ["a", "b", "c", "d", "expected", "prr", "prr_lower", "prr_upper",
+                "ror", "ror_lower", "ror_upper", "ic", "ic025", "ic975", "chi2"]
+
+
+def _net(added, removed, keys):
+    # +1 for every new distinct row, -1 for every old one, summed per key
+    delta = pd.concat([added[keys].assign(n=1), removed[keys].assign(n=-1)])
+    delta = delta.groupby(keys, sort=False)["n"].sum()
+    return delta[delta != 0].reset_index()
+
+
+class SignalCountStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_cases (case_id TEXT PRIMARY KEY)")
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch_pairs (drug TEXT, event TEXT, PRIMARY KEY (drug, event))")
+
+    def close(self):
+        self._conn.close()
+
+    @property
+    def n_reports(self):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'n_reports'").fetchone()
+        return row[0] if row else 0
+
+    @property
+    def version(self):
+        """Bumped by every apply() and refresh(); a cache key for stats()."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def apply(self, reports, removed_case_ids=()):
+        """Fold new or changed cases into the counts and reverse removed ones.
+
+        reports holds the full current content (case_id, drug, event rows) of
+        every case in the batch; a case already in the store is replaced.
+        Rows missing the drug or event are not counted, as in
+        contingency_counts; a case left with none has its old pairs removed.
+        Returns the recomputed statistics for the affected pairs.
+        """
+        reports = reports[["case_id", "drug", "event"]]
+        new = complete_rows(reports, ["case_id", "drug", "event"]).astype(str).drop_duplicates()
+        case_ids = set(reports["case_id"].dropna().astype(str)) | {str(c) for c in removed_case_ids}
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM batch_cases")
+            self._conn.executemany("INSERT OR IGNORE INTO batch_cases VALUES (?)", ((c,) for c in case_ids))
+            old = pd.read_sql_query(
+                "SELECT case_id, drug, event FROM batch_cases JOIN case_pairs USING (case_id)", self._conn
+            )
+
+            cells = _net(new, old, ["drug", "event"])
+            drugs = _net(new[["case_id", "drug"]].drop_duplicates(), old[["case_id", "drug"]].drop_duplicates(), ["drug"])
+            events = _net(new[["case_id", "event"]].drop_duplicates(), old[["case_id", "event"]].drop_duplicates(), ["event"])
+            n_delta = new["case_id"].nunique() - old["case_id"].nunique()
+
+            self._conn.executemany(
+                "INSERT INTO cells VALUES (?, ?, ?) ON CONFLICT (drug, event) DO UPDATE SET a = a + excluded.a",
+                cells.itertuples(index=False, name=None),
+            )
+            self._conn.executemany(
+                "INSERT INTO drug_totals VALUES (?, ?) ON CONFLICT (drug) DO UPDATE SET n = n + excluded.n",
+                drugs.itertuples(index=False, name=None),
+            )
+            self._conn.executemany(
+                "INSERT INTO event_totals VALUES (?, ?) ON CONFLICT (event) DO UPDATE SET n = n + excluded.n",
+                events.itertuples(index=False, name=None),
+            )
+            self._conn.execute(
+                "INSERT INTO meta VALUES ('n_reports', ?) ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",
+                (n_delta,),
+            )
+            for table in ("cells", "drug_totals", "event_totals"):
+                column = "a" if table == "cells" else "n"
+                self._conn.execute(f"DELETE FROM {table} WHERE {column} <= 0")
+
+            self._conn.execute("DELETE FROM case_pairs WHERE case_id IN (SELECT case_id FROM batch_cases)")
+            self._conn.executemany("INSERT INTO case_pairs VALUES (?, ?, ?)", new.itertuples(index=False, name=None))
+
+            self._conn.execute("DELETE FROM batch_pairs")
+            self._conn.executemany("INSERT INTO batch_pairs VALUES (?, ?)", cells[["drug", "event"]].itertuples(index=False, name=None))
+            return self._recompute(batch_only=True)
+
+    def refresh(self):
+        """Recompute statistics for every pair, e.g. after many batches have moved N."""
+        with self._lock, self._conn:
+            return self._recompute(batch_only=False)
+
+    def _recompute(self, batch_only):
+        pairs = "batch_pairs JOIN cells USING (drug, event)" if batch_only else "cells"
+        affected = pd.read_sql_query(
+            "SELECT drug, event, a, drug_totals.n AS n_drug, event_totals.n AS n_event "
+            f"FROM {pairs} JOIN drug_totals USING (drug) JOIN event_totals USING (event)",
+            self._conn,
+        )
+        stats = pd.DataFrame(disproportionality_arrays(
+            affected["a"].to_numpy(), affected["n_drug"].to_numpy(), affected["n_event"].to_numpy(), self.n_reports,
+        ))
+        stats.insert(0, "drug", affected["drug"])
+        stats.insert(1, "event", affected["event"])
+
+        # Also drops the pairs whose last case was removed
+        if batch_only:
+            self._conn.execute("DELETE FROM pair_stats WHERE (drug, event) IN (SELECT drug, event FROM batch_pairs)")
+        else:
+            self._conn.execute("DELETE FROM pair_stats")
+        self._conn.executemany(
+            f"INSERT INTO pair_stats VALUES ({', '.join('?' * (len(STAT_COLUMNS) + 2))})",
+            stats.astype(object).to_numpy().tolist(),
+        )
+        self._conn.execute("INSERT INTO meta VALUES ('version', 1) ON CONFLICT (key) DO UPDATE SET value = value + 1")
+        return add_signal_flags(stats)
+
+    def stats(self):
+        """All persisted pair statistics, in the layout of signals.disproportionality()."""
+        with self._lock:
+            table = pd.read_sql_query("SELECT * FROM pair_stats", self._conn)
+        for column in STAT_COLUMNS:
+            table[column] = table[column].astype(float)
+        for column in ["a", "b", "c", "d"]:
+            table[column] = table[column].astype(np.int64)
+        return add_signal_flags(table)
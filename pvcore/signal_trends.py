@@ -0,0 +1,224 @@
+"""Period-by-period disproportionality trends and sequential alerts per drug-event pair.
+
+Each case counts once, in the month or quarter of its received date. The
+counts are kept as prefix sums: after period t there is, for every pair,
+drug and event seen so far, its count over periods [0, t). A window's
+count is the difference of two prefixes, so cumulative and rolling PRR/IC
+for any period are array lookups, and appending a period only counts that
+period's reports. Labels and pairs first seen later are zero in the
+earlier, shorter prefixes.
+
+The sequential test is the Poisson MaxSPRT (Kulldorff et al., 2011). A
+pair's expected count under independence is summed period by period from
+each period's margins; against the observed cumulative count c, with
+expected u, LLR = u - c + c ln(c / u) when c > u, else 0. A pair alerts
+the first period its LLR reaches the critical value with at least
+min_cases reports. The critical value for an exact alpha depends on the
+surveillance length (Kulldorff et al. tabulate it); across thousands of
+pairs the alerts are a screening aid, not a test result.
+"""
+import numpy as np
+import pandas as pd
+
+from pvcore.signals import add_signal_flags, contingency_counts, disproportionality_arrays
+
+PERIOD_FREQUENCIES = {"Quarter": "Q", "Month": "M"}
+DATE_COLUMN = "case_received_date"
+MAXSPRT_CRITICAL_VALUE = 3.0
+ROLLING_STATS = ["prr", "prr_lower", "ic", "ic025"]
+TREND_COLUMNS = (["period", "reports", "a", "expected", "prr", "prr_lower", "ic", "ic025", "rolling_a"]
+                 + [f"rolling_{name}" for name in ROLLING_STATS] + ["llr", "alert"])
+
+
+def maxsprt_llr(observed, expected):
+    """Poisson MaxSPRT log-likelihood ratio, one-sided (0 unless observed > expected)."""
+    observed = np.asarray(observed, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        llr = expected - observed + observed * np.log(observed / expected)
+    return np.where(observed > expected, llr, 0.0)
+
+
+def report_periods(dates, freq="Q"):
+    """PeriodIndex of dates or date strings; NaT where missing or unparsable."""
+    codes, uniques = pd.factorize(pd.Series(dates).to_numpy(dtype=object), use_na_sentinel=False)
+    days = pd.to_datetime(pd.Series(uniques, dtype=object).astype(str).str[:10], format="%Y-%m-%d", errors="coerce")
+    return pd.PeriodIndex(days, freq=freq)[codes]
+
+
+def _padded(values, size):
+    return values if len(values) == size else np.concatenate((values, np.zeros(size - len(values), values.dtype)))
+
+
+def _grow(index, labels):
+    # Codes of labels (unique) in index, appending the new ones
+    codes = index.get_indexer(labels)
+    new = codes < 0
+    if new.any():
+        codes[new] = len(index) + np.arange(new.sum())
+        index = index.append(pd.Index(np.asarray(labels)[new], dtype=index.dtype))
+    return codes, index
+
+
+class SignalTrends:
+    def __init__(self, freq="Q", critical_value=MAXSPRT_CRITICAL_VALUE, min_cases=3):
+        self.freq = freq
+        self.critical_value = critical_value
+        self.min_cases = min_cases
+        self.periods = []
+        self.drugs = pd.Index([], dtype=object)
+        self.events = pd.Index([], dtype=object)
+        self.pair_drug = np.zeros(0, dtype=np.int64)
+        self.pair_event = np.zeros(0, dtype=np.int64)
+        self._pairs = pd.Index([], dtype=np.int64)   # drug code << 32 | event code
+        # Prefix sums, entry t covering periods [0, t)
+        self._a = [np.zeros(0, dtype=np.int32)]
+        self._drug = [np.zeros(0, dtype=np.int64)]
+        self._event = [np.zeros(0, dtype=np.int64)]
+        self._n = [0]
+        self.expected = np.zeros(0)                  # summed per-period expected count of each pair
+        self.first_alert = np.zeros(0, dtype=np.int32)   # period number of the first alert, -1 if none
+        self._alerts = {}                            # window -> alerts(window), until the next period
+
+    @classmethod
+    def from_reports(cls, reports, date_col=DATE_COLUMN, freq="Q", **options):
+        trends = cls(freq, **options)
+        trends.add(reports, date_col)
+        return trends
+
+    def __len__(self):
+        return len(self.pair_drug)
+
+    def add(self, reports, date_col=DATE_COLUMN):
+        """Append the periods of a (case_id, drug, event, date) table in date order; returns the periods added.
+
+        Rows without a valid date are left out. Every period must be after
+        the last one already added.
+        """
+        periods = report_periods(reports[date_col], self.freq)
+        valid = ~periods.isna()
+        codes, uniques = pd.factorize(periods[valid], sort=True)
+        if len(uniques) and self.periods and uniques[0] <= self.periods[-1]:
+            raise ValueError(f"Reports for {uniques[0]} are not after the last period, {self.periods[-1]}.")
+        rows = reports[valid]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for k, period in enumerate(uniques):
+            self.append(rows.iloc[order[bounds[k]:bounds[k + 1]]], period)
+        return list(uniques)
+
+    def append(self, reports, period):
+        """Add one period's (case_id, drug, event) reports; skipped periods are added empty."""
+        period = pd.Period(period, freq=self.freq)
+        if self.periods and period <= self.periods[-1]:
+            raise ValueError(f"Period {period} is not after the last period, {self.periods[-1]}.")
+        # Empty periods still count, so windows are calendar periods
+        while self.periods and self.periods[-1] + 1 < period:
+            self._append_counts(self.periods[-1] + 1, None)
+        self._append_counts(period, contingency_counts(reports) if len(reports) else None)
+
+    def _append_counts(self, period, counts):
+        self._alerts.clear()
+        known = len(self.pair_drug)
+        if counts is not None:
+            drug_codes, self.drugs = _grow(self.drugs, counts.drugs)
+            event_codes, self.events = _grow(self.events, counts.events)
+            keys = drug_codes[counts.pair_drug].astype(np.int64) << 32 | event_codes[counts.pair_event]
+            pair_codes, self._pairs = _grow(self._pairs, keys)
+            added = self._pairs.to_numpy()[known:]
+            self.pair_drug = np.concatenate((self.pair_drug, added >> 32))
+            self.pair_event = np.concatenate((self.pair_event, added & 0xFFFFFFFF))
+
+        n_pairs = len(self.pair_drug)
+        drug, event = np.zeros(len(self.drugs), dtype=np.int64), np.zeros(len(self.events), dtype=np.int64)
+        a, n = np.zeros(n_pairs, dtype=np.int32), 0
+        if counts is not None:
+            drug[drug_codes], event[event_codes] = counts.drug_totals, counts.event_totals
+            a[pair_codes], n = counts.a, counts.n_reports
+
+        # New pairs were not reported before, but their drug and event may have been
+        expected = _padded(self.expected, n_pairs)
+        if n_pairs > known:
+            new_drug, new_event = self.pair_drug[known:], self.pair_event[known:]
+            for t in range(len(self.periods)):
+                n_t = self._n[t + 1] - self._n[t]
+                if n_t:
+                    drug_t = _padded(self._drug[t + 1], len(drug)) - _padded(self._drug[t], len(drug))
+                    event_t = _padded(self._event[t + 1], len(event)) - _padded(self._event[t], len(event))
+                    expected[known:] += drug_t[new_drug] * event_t[new_event] / n_t
+        if n:
+            expected += drug[self.pair_drug] * event[self.pair_event] / n
+
+        self.periods.append(period)
+        self._a.append(_padded(self._a[-1], n_pairs) + a)
+        self._drug.append(_padded(self._drug[-1], len(drug)) + drug)
+        self._event.append(_padded(self._event[-1], len(event)) + event)
+        self._n.append(self._n[-1] + n)
+        self.expected = expected
+
+        cumulative = self._a[-1]
+        self.first_alert = np.concatenate((self.first_alert, np.full(n_pairs - known, -1, dtype=np.int32)))
+        alert = ((self.first_alert < 0) & (cumulative >= self.min_cases)
+                 & (maxsprt_llr(cumulative, expected) >= self.critical_value))
+        self.first_alert[alert] = len(self.periods) - 1
+
+    def _window(self, start, end):
+        """a, drug total, event total per pair and N over periods [start, end)."""
+        n_pairs, n_drugs, n_events = len(self.pair_drug), len(self.drugs), len(self.events)
+        a = _padded(self._a[end], n_pairs) - _padded(self._a[start], n_pairs)
+        drug = _padded(self._drug[end], n_drugs) - _padded(self._drug[start], n_drugs)
+        event = _padded(self._event[end], n_events) - _padded(self._event[start], n_events)
+        return a, drug[self.pair_drug], event[self.pair_event], self._n[end] - self._n[start]
+
+    def table(self, window=4):
+        """Every pair's cumulative statistics, PRR/IC over the last window periods, LLR and first alert."""
+        end = len(self.periods)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cumulative = disproportionality_arrays(*self._window(0, end))
+            rolling = disproportionality_arrays(*self._window(max(end - window, 0), end))
+        table = add_signal_flags(pd.DataFrame({"drug": self.drugs.take(self.pair_drug),
+                                               "event": self.events.take(self.pair_event), **cumulative}))
+        table["rolling_a"] = rolling["a"]
+        for name in ROLLING_STATS:
+            table[f"rolling_{name}"] = rolling[name]
+        table["period_expected"] = self.expected
+        table["llr"] = maxsprt_llr(table["a"], self.expected)
+        # -1 (no alert) picks the trailing None
+        table["first_alert"] = np.array([str(period) for period in self.periods] + [None], dtype=object)[self.first_alert]
+        return table
+
+    def alerts(self, window=4):
+        """Pairs with a sequential alert, most recent alert first; kept until the next period is added."""
+        if window not in self._alerts:
+            table = self.table(window)
+            alerting = table[self.first_alert >= 0].assign(_order=self.first_alert[self.first_alert >= 0])
+            self._alerts[window] = alerting.sort_values(["_order", "llr"], ascending=False, kind="stable") \
+                .drop(columns="_order").reset_index(drop=True)
+        return self._alerts[window]
+
+    def trend(self, drug, event, window=4):
+        """TREND_COLUMNS of one pair, one row per period; empty if the pair was never reported."""
+        drug_code, event_code = self.drugs.get_indexer([drug])[0], self.events.get_indexer([event])[0]
+        pair = self._pairs.get_indexer([np.int64(drug_code) << 32 | event_code])[0] \
+            if drug_code >= 0 and event_code >= 0 else -1
+        if pair < 0:
+            return pd.DataFrame(columns=TREND_COLUMNS)
+
+        def prefix(values, code):
+            return np.array([counts[code] if code < len(counts) else 0 for counts in values], dtype=np.int64)
+
+        a, drug_counts = prefix(self._a, pair), prefix(self._drug, drug_code)
+        event_counts, n = prefix(self._event, event_code), np.array(self._n, dtype=np.int64)
+        per_period = [np.diff(values) for values in (drug_counts, event_counts, n)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            expected = np.cumsum(np.where(per_period[2] > 0, per_period[0] * per_period[1] / per_period[2], 0.0))
+            cumulative = disproportionality_arrays(a[1:], drug_counts[1:], event_counts[1:], n[1:])
+            start = np.maximum(np.arange(1, len(a)) - window, 0)
+            rolling = disproportionality_arrays(a[1:] - a[start], drug_counts[1:] - drug_counts[start],
+                                                event_counts[1:] - event_counts[start], n[1:] - n[start])
+        llr = maxsprt_llr(a[1:], expected)
+        return pd.DataFrame({"period": [str(period) for period in self.periods], "reports": np.diff(a),
+                              "a": a[1:], "expected": expected,
+                              **{name: cumulative[name] for name in ROLLING_STATS}, "rolling_a": rolling["a"],
+                              **{f"rolling_{name}": rolling[name] for name in ROLLING_STATS},
+                              "llr": llr, "alert": (llr >= self.critical_value) & (a[1:] >= self.min_cases)})
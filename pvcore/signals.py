@@ -0,0 +1,140 @@
+"""Disproportionality statistics (PRR, ROR, IC/BCPNN, chi-square) for every drug-event pair.
+
+Counts are built in one grouped pass over a long report table (one row per
+case/drug/event mention) and every statistic is computed on whole NumPy
+arrays, so there is no per-pair Python loop.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+Z95 = 1.959963984540054
+
+
+@dataclass
+class ContingencyCounts:
+    drugs: pd.Index           # drug labels, position = drug code
+    events: pd.Index          # event labels, position = event code
+    pair_drug: np.ndarray     # drug code of each observed pair
+    pair_event: np.ndarray    # event code of each observed pair
+    a: np.ndarray             # reports with the drug and the event
+    drug_totals: np.ndarray   # reports with the drug, indexed by drug code
+    event_totals: np.ndarray  # reports with the event, indexed by event code
+    n_reports: int
+
+    def __len__(self):
+        return len(self.a)
+
+
+def _distinct(keys):
+    # Sort-based; faster than np.unique here on multi-million int64 keys
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+
+
+def complete_rows(reports, columns):
+    """The rows with a value in each of columns (blank cells read as NaN are left out)."""
+    # factorize codes a missing value -1, which the key arithmetic would wrap onto another drug or event
+    missing = reports[columns].isna().any(axis=1).to_numpy()
+    return reports[~missing] if missing.any() else reports
+
+
+def contingency_counts(reports, case_col="case_id", drug_col="drug", event_col="event"):
+    """Count a, drug and event marginals and N for all pairs in one pass.
+
+    Each case counts once per drug, per event and per drug-event pair, however
+    many times the combination is repeated in the table. Rows missing the
+    case, drug or event are left out.
+    """
+    reports = complete_rows(reports, [case_col, drug_col, event_col])
+    case_codes, _ = pd.factorize(reports[case_col])
+    drug_codes, drugs = pd.factorize(reports[drug_col])
+    event_codes, events = pd.factorize(reports[event_col])
+    case_codes = case_codes.astype(np.int64)
+    n_drugs, n_events = len(drugs), len(events)
+
+    drug_totals = np.bincount(_distinct(case_codes * n_drugs + drug_codes) % n_drugs, minlength=n_drugs)
+    event_totals = np.bincount(_distinct(case_codes * n_events + event_codes) % n_events, minlength=n_events)
+
+    pair_codes = drug_codes.astype(np.int64) * n_events + event_codes
+    case_pairs = _distinct(case_codes * (n_drugs * n_events) + pair_codes)
+    pairs, a = np.unique(case_pairs % (n_drugs * n_events), return_counts=True)
+
+    return ContingencyCounts(
+        drugs=drugs,
+        events=events,
+        pair_drug=pairs // n_events,
+        pair_event=pairs % n_events,
+        a=a,
+        drug_totals=drug_totals,
+        event_totals=event_totals,
+        n_reports=int(case_codes.max() + 1) if len(case_codes) else 0,
+    )
+
+
+def disproportionality_arrays(a, n_drug, n_event, n_reports):
+    """PRR, ROR, IC and chi-square for aligned arrays of a, drug total, event total."""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(n_drug, dtype=np.float64) - a
+    c = np.asarray(n_event, dtype=np.float64) - a
+    d = np.asarray(n_reports, dtype=np.float64) - a - b - c
+    n = a + b + c + d
+    expected = (a + b) * (a + c) / n
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Haldane correction only where a cell is empty, so the ratios stay finite
+        zero = (a == 0) | (b == 0) | (c == 0) | (d == 0)
+        ah, bh, ch, dh = (x + 0.5 * zero for x in (a, b, c, d))
+
+        prr = (ah / (ah + bh)) / (ch / (ch + dh))
+        prr_se = np.sqrt(1 / ah - 1 / (ah + bh) + 1 / ch - 1 / (ch + dh))
+        ror = (ah * dh) / (bh * ch)
+        ror_se = np.sqrt(1 / ah + 1 / bh + 1 / ch + 1 / dh)
+
+        # Yates-corrected chi-square
+        chi2 = n * np.maximum(np.abs(a * d - b * c) - n / 2, 0) ** 2 / ((a + b) * (c + d) * (a + c) * (b + d))
+
+    # BCPNN information component with the Noren et al. (2006) credibility interval
+    shrunk = a + 0.5
+    ic = np.log2(shrunk / (expected + 0.5))
+
+    return {
+        "a": a.astype(np.int64), "b": b.astype(np.int64), "c": c.astype(np.int64), "d": d.astype(np.int64),
+        "expected": expected,
+        "prr": prr, "prr_lower": prr * np.exp(-Z95 * prr_se), "prr_upper": prr * np.exp(Z95 * prr_se),
+        "ror": ror, "ror_lower": ror * np.exp(-Z95 * ror_se), "ror_upper": ror * np.exp(Z95 * ror_se),
+        "ic": ic,
+        "ic025": ic - 3.3 * shrunk ** -0.5 - 2 * shrunk ** -1.5,
+        "ic975": ic + 2.4 * shrunk ** -0.5 - 0.5 * shrunk ** -1.5,
+        "chi2": chi2,
+    }
+
+
+def disproportionality(counts):
+    """Return one row of statistics per observed drug-event pair."""
+    stats = disproportionality_arrays(
+        counts.a,
+        counts.drug_totals[counts.pair_drug],
+        counts.event_totals[counts.pair_event],
+        counts.n_reports,
+    )
+    table = pd.DataFrame({
+        "drug": counts.drugs.take(counts.pair_drug),
+        "event": counts.events.take(counts.pair_event),
+        **stats,
+    })
+    return add_signal_flags(table)
+
+
+def add_signal_flags(table):
+    # Evans et al. (2001) criteria, plus a positive lower IC bound
+    table["signal"] = (table["a"] >= 3) & (table["prr"] >= 2) & (table["chi2"] >= 4)
+    table["ic_signal"] = table["ic025"] > 0
+    return table
+
+
+def rank_signals(table, by="prr_lower", min_cases=3, top=None):
+    """Sort pairs by a statistic, keeping pairs with at least min_cases reports."""
+    ranked = table[table["a"] >= min_cases].sort_values(by, ascending=False, kind="stable").reset_index(drop=True)
+    return ranked.head(top) if top else ranked
@@ -0,0 +1,319 @@
+"""Asynchronous ICSR submission to the regulatory authorities' gateways.
+
+Each authority has its own queue, worker tasks (its concurrency limit) and
+token bucket (its rate limit), so a slow or throttling gateway only holds
+up its own submissions. A failed attempt (connection error, 429, 5xx) is
+put back on the queue after an exponential backoff with jitter, honouring
+Retry-After. Every submission carries an idempotency key derived from the
+authority, case ID and case content, so a retried or re-run submission is
+never filed twice. ACKs are recorded in a SQLite submission log; messages that
+already have an accepting ACK are skipped.
+"""
+import asyncio
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from pvcore.gateway import read_message, write_message
+
+
+@dataclass
+class AuthorityLimits:
+    concurrency: int   # requests in flight at once
+    rate: float        # requests per second, sustained
+    burst: int = 10    # requests allowed at once after a quiet spell
+
+
+AUTHORITIES = {
+    "FDA": AuthorityLimits(16, 100),
+    "EMA": AuthorityLimits(16, 100),
+    "MHRA": AuthorityLimits(8, 50),
+    "PMDA": AuthorityLimits(8, 50),
+    "Health Canada": AuthorityLimits(8, 50),
+    "CDSCO": AuthorityLimits(4, 25),
+    "TGA": AuthorityLimits(4, 25),
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+    idempotency_key TEXT PRIMARY KEY,
+    case_id TEXT NOT NULL, authority TEXT NOT NULL,
+    status TEXT NOT NULL, attempts INTEGER NOT NULL, ack_id TEXT, ack_code TEXT, error TEXT,
+    submitted_at REAL, acked_at REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS submissions_case ON submissions (case_id, authority);
+"""
+
+
+def idempotency_key(authority, case_id, content):
+    """Key of one version of a case for one authority; content is the message or the case's fields."""
+    if isinstance(content, dict):
+        content = json.dumps(content, sort_keys=True, default=str).encode()
+    return hashlib.sha256(b"\0".join([authority.encode(), str(case_id).encode(), content])).hexdigest()
+
+
+@dataclass
+class Submission:
+    case_id: str
+    authority: str
+    message: bytes
+    key: str = ""
+    attempts: int = 0
+    status: str = "Queued"   # Queued, Acknowledged, Rejected, Failed, Skipped
+    ack_id: str = ""
+    ack_code: str = ""
+    error: str = ""
+    queued_at: float = 0.0
+    done_at: float = 0.0
+
+    def __post_init__(self):
+        self.key = self.key or idempotency_key(self.authority, self.case_id, self.message)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.updated = float(burst), time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SubmissionLog:
+    """Submission status and ACKs per idempotency key, in SQLite."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(LOG_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def acknowledged(self, keys):
+        """The keys among keys that already have an accepting ACK."""
+        found = set()
+        with self._lock:
+            keys = list(keys)
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT idempotency_key FROM submissions WHERE status = 'Acknowledged' "
+                    f"AND idempotency_key IN ({', '.join('?' * len(batch))})", batch))
+        return found
+
+    def record(self, submissions):
+        rows = [(s.key, s.case_id, s.authority, s.status, s.attempts, s.ack_id, s.ack_code, s.error,
+                 s.queued_at, s.done_at or None) for s in submissions if s.status != "Skipped"]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (idempotency_key) DO UPDATE SET "
+                "status = excluded.status, attempts = submissions.attempts + excluded.attempts, ack_id = excluded.ack_id, "
+                "ack_code = excluded.ack_code, error = excluded.error, acked_at = excluded.acked_at", rows)
+
+    def acknowledged_cases(self):
+        """case_id and authority of every case an authority has acknowledged, in any version."""
+        with self._lock:
+            return pd.read_sql_query("SELECT DISTINCT case_id, authority FROM submissions WHERE status = 'Acknowledged'",
+                                     self._conn)
+
+    def history(self, case_id=None, limit=200):
+        sql = "SELECT * FROM submissions" + (" WHERE case_id = ?" if case_id else "") + " ORDER BY submitted_at DESC LIMIT ?"
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=([case_id] if case_id else []) + [limit])
+
+
+@dataclass
+class SubmissionMetrics:
+    started: float = 0.0
+    elapsed: float = 0.0
+    attempts: int = 0
+    retries: int = 0
+    by_status: dict = field(default_factory=dict)
+    latencies: list = field(default_factory=list)      # seconds from queued to final status
+    depth: list = field(default_factory=list)          # (seconds since start, submissions waiting or in flight)
+
+    def summary(self):
+        done = sum(n for status, n in self.by_status.items() if status != "Skipped")
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        depths = np.array([d for _, d in self.depth]) if self.depth else np.zeros(1)
+        return {
+            "submissions": done, **self.by_status, "attempts": self.attempts, "retries": self.retries,
+            "seconds": round(self.elapsed, 2), "submissions_per_sec": round(done / self.elapsed, 1) if self.elapsed else 0.0,
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 1),
+            "latency_p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 1),
+            "queue_depth_max": int(depths.max()), "queue_depth_mean": round(float(depths.mean()), 1),
+        }
+
+
+class _Connection:
+    # One keep-alive HTTP/1.1 connection to the gateway, owned by one worker
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.reader = self.writer = None
+
+    async def post(self, path, headers, body, timeout):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        try:
+            write_message(self.writer, f"POST {path} HTTP/1.1", {"Host": self.host, **headers}, body)
+            await self.writer.drain()
+            response = await asyncio.wait_for(read_message(self.reader), timeout)
+            if response is None:
+                raise ConnectionError("gateway closed the connection")
+        except BaseException:
+            self.close()
+            raise
+        start, headers, body = response
+        return int(start.split(" ")[1]), headers, body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class SubmissionQueue:
+    def __init__(self, gateway_url, log=None, limits=None, max_attempts=5, backoff=0.5, max_backoff=30.0, timeout=30.0):
+        self.gateway_url = gateway_url
+        self.log = log
+        self.limits = limits or AUTHORITIES
+        self.max_attempts, self.backoff, self.max_backoff, self.timeout = max_attempts, backoff, max_backoff, timeout
+        self.metrics = SubmissionMetrics()
+
+    def _delay(self, attempts, retry_after):
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempts - 1)))
+        return max(delay, float(retry_after or 0))
+
+    async def _attempt(self, connection, submission):
+        submission.attempts += 1
+        self.metrics.attempts += 1
+        headers = {"AS2-To": submission.authority, "AS2-From": "PVHUB", "Idempotency-Key": submission.key,
+                   "Content-Type": "application/hl7-v3+xml"}
+        try:
+            status, headers, body = await connection.post("/submissions", headers, submission.message, self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            return True, None, f"{type(error).__name__}: {error}"
+        if status == 200:
+            ack = json.loads(body)
+            submission.ack_id, submission.ack_code = ack["ack_id"], ack["code"]
+            submission.status = "Acknowledged" if ack["code"] == "AA" else "Rejected"
+            return False, None, ""
+        return status in RETRY_STATUSES, headers.get("retry-after"), f"HTTP {status}"
+
+    async def _worker(self, authority, queue, bucket, pending, finished, all_done):
+        connection = _Connection(self.gateway_url)
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                submission = await queue.get()
+                await bucket.acquire()
+                retry, retry_after, submission.error = await self._attempt(connection, submission)
+                if retry and submission.attempts < self.max_attempts:
+                    # Back on the queue later, so the wait does not hold a worker
+                    self.metrics.retries += 1
+                    loop.call_later(self._delay(submission.attempts, retry_after), queue.put_nowait, submission)
+                else:
+                    if submission.status == "Queued":
+                        submission.status = "Failed"
+                    submission.done_at = time.time()
+                    self.metrics.latencies.append(submission.done_at - submission.queued_at)
+                    finished.append(submission)
+                    pending[authority] -= 1
+                    if not any(pending.values()):
+                        all_done.set()
+        finally:
+            connection.close()
+
+    async def _sample_depth(self, pending, started):
+        while True:
+            self.metrics.depth.append((time.monotonic() - started, sum(pending.values())))
+            await asyncio.sleep(0.1)
+
+    async def run(self, submissions, on_progress=None):
+        """Submit every Submission; returns them with their final status.
+
+        on_progress(done, total) is called about ten times a second.
+        """
+        submissions = list(submissions)
+        skip = self.log.acknowledged(s.key for s in submissions) if self.log else set()
+        started = time.monotonic()
+        self.metrics.started = time.time()
+        queues, pending, finished = {}, {}, []
+        for submission in submissions:
+            if submission.key in skip:
+                submission.status = "Skipped"
+                continue
+            if submission.authority not in self.limits:
+                raise ValueError(f"no limits configured for authority {submission.authority!r}")
+            submission.queued_at = time.time()
+            queues.setdefault(submission.authority, asyncio.Queue()).put_nowait(submission)
+            pending[submission.authority] = pending.get(submission.authority, 0) + 1
+
+        all_done = asyncio.Event()
+        workers = []
+        for authority, queue in queues.items():
+            limits = self.limits[authority]
+            bucket = TokenBucket(limits.rate, limits.burst)
+            workers += [asyncio.create_task(self._worker(authority, queue, bucket, pending, finished, all_done))
+                        for _ in range(min(limits.concurrency, pending[authority]))]
+        sampler = asyncio.create_task(self._sample_depth(pending, started))
+        total, recorded = sum(pending.values()), 0
+        try:
+            while any(pending.values()):
+                try:
+                    await asyncio.wait_for(all_done.wait(), 0.1)
+                except asyncio.TimeoutError:
+                    pass
+                for worker in workers:
+                    if worker.done():
+                        worker.result()   # a worker only stops on an unexpected error
+                if self.log and len(finished) > recorded:
+                    self.log.record(finished[recorded:])
+                    recorded = len(finished)
+                if on_progress:
+                    on_progress(len(finished), total)
+        finally:
+            sampler.cancel()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, sampler, return_exceptions=True)
+            if self.log and len(finished) > recorded:
+                self.log.record(finished[recorded:])
+
+        self.metrics.elapsed = time.monotonic() - started
+        for submission in submissions:
+            self.metrics.by_status[submission.status] = self.metrics.by_status.get(submission.status, 0) + 1
+        return submissions
+
+
+def submissions_table(submissions):
+    """One row per submission, without the messages."""
+    columns = ["case_id", "authority", "status", "attempts", "ack_id", "ack_code", "error"]
+    return pd.DataFrame([[getattr(s, c) for c in columns] for s in submissions], columns=columns)
+
+
+def submit(gateway_url, submissions, log=None, on_progress=None, **options):
+    """Run a SubmissionQueue to completion from synchronous code; returns (submissions, metrics summary)."""
+    queue = SubmissionQueue(gateway_url, log, **options)
+    submissions = asyncio.run(queue.run(submissions, on_progress))
+    return submissions, queue.metrics.summary()
@@ -0,0 +1,337 @@
+"""Synthetic data for demos and benchmarks. Values are random, not real cases."""
+import gzip
+import os
+from xml.sax.saxutils import escape
+
+import numpy as np
+import pandas as pd
+
+from pvcore.icsr import ICSR_FIELDS
+
+COUNTRIES = ["India", "USA", "UK", "Germany", "France", "Japan", "Canada", "Australia", "Brazil", "Spain"]
+DRUGS = ["Paracetamol", "Ibuprofen", "Amoxicillin", "Metformin", "Atorvastatin",
+         "Omeprazole", "Amlodipine", "Lisinopril", "Sertraline", "Warfarin"]
+EVENTS = ["Nausea", "Headache", "Rash", "Dizziness", "Fatigue", "Diarrhea", "Vomiting",
+          "Hepatotoxicity", "Anaphylaxis", "Pruritus", "Insomnia", "Myalgia"]
+# MedDRA primary SOC of each synthetic event term
+EVENT_SOCS = {
+    "Nausea": "Gastrointestinal disorders", "Diarrhea": "Gastrointestinal disorders",
+    "Vomiting": "Gastrointestinal disorders", "Headache": "Nervous system disorders",
+    "Dizziness": "Nervous system disorders", "Rash": "Skin and subcutaneous tissue disorders",
+    "Pruritus": "Skin and subcutaneous tissue disorders",
+    "Fatigue": "General disorders and administration site conditions",
+    "Hepatotoxicity": "Hepatobiliary disorders", "Anaphylaxis": "Immune system disorders",
+    "Insomnia": "Psychiatric disorders", "Myalgia": "Musculoskeletal and connective tissue disorders",
+}
+SERIOUSNESS_CRITERIA = ["Death", "Life Threatening", "Inpatient Hospitalization",
+                        "Disability", "Congenital Anomaly", "Medically Significant"]
+
+
+def icsr_cases(n, seed=0, start="2024-01-01", days=730):
+    """Return n synthetic ICSR cases with the dashboard's fields as columns."""
+    rng = np.random.default_rng(seed)
+    received = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n), unit="D")
+    serious = rng.random(n) < 0.3
+    drug_start = received - pd.to_timedelta(rng.integers(1, 60, n), unit="D")
+    cases = pd.DataFrame({
+        "case_id": [f"PV-{seed:02d}-{i:08d}" for i in range(n)],
+        "case_received_date": received.strftime("%Y-%m-%d"),
+        "report_type": rng.choice(["Spontaneous", "Clinical Trial", "Literature", "Other"], n, p=[0.7, 0.15, 0.1, 0.05]),
+        "country": rng.choice(COUNTRIES, n),
+        "seriousness": np.where(serious, "Serious", "Non Serious"),
+        "seriousness_detail": np.where(serious, rng.choice(SERIOUSNESS_CRITERIA, n), "Non Serious"),
+        "reporter_name": [f"Reporter {i % 5000}" for i in range(n)],
+        "reporter_qualification": rng.choice(["Physician", "Pharmacist", "Consumer", "Nurse"], n),
+        "patient_age": rng.integers(1, 95, n),
+        "gender": rng.choice(["Male", "Female", "Other", "Unknown"], n, p=[0.47, 0.47, 0.02, 0.04]),
+        "ae_verbatim": rng.choice(EVENTS, n),
+        "ae_outcome": rng.choice(["Recovered", "Recovering", "Not Recovered", "Fatal", "Unknown"], n),
+        "suspected_drug": rng.choice(DRUGS, n),
+        "dose": rng.choice(["500 mg", "250 mg", "10 mg", "1 g"], n),
+        "route": rng.choice(["Oral", "IV", "IM", "Subcutaneous", "Other"], n, p=[0.7, 0.1, 0.1, 0.05, 0.05]),
+        "start_date": drug_start.strftime("%Y-%m-%d"),
+        "end_date": (drug_start + pd.to_timedelta(rng.integers(1, 30, n), unit="D")).strftime("%Y-%m-%d"),
+        "dechallenge": rng.choice(["Positive", "Negative", "Not Applicable"], n),
+        "rechallenge": rng.choice(["Positive", "Negative", "Not Applicable"], n, p=[0.1, 0.1, 0.8]),
+    })
+    return cases.reindex(columns=ICSR_FIELDS).fillna("")
+
+
+def _names(base, n, prefix):
+    return list(base[:n]) + [f"{prefix} {i:05d}" for i in range(len(base), n)]
+
+
+def drug_event_reports(n_cases, n_drugs=200, n_events=500, seed=0, signals=5, months=None, start="2024-01-01"):
+    """Long report table (case_id, drug, event), 1-3 drugs and 1-3 events per case.
+
+    Drug and event frequencies are skewed like a real database, and the first
+    `signals` drugs are over-reported with one specific event each. With
+    months, each case also gets a case_received_date in that many months from
+    start, and signal k only appears from month k * months // (signals + 1).
+    """
+    rng = np.random.default_rng(seed)
+    drug_names = np.array(_names(DRUGS, n_drugs, "Drug"))
+    event_names = np.array(_names(EVENTS, n_events, "Event"))
+    drug_p = 1 / np.arange(1, n_drugs + 1) ** 0.8
+    event_p = 1 / np.arange(1, n_events + 1) ** 0.9
+
+    per_case_drugs = rng.integers(1, 4, n_cases)
+    per_case_events = rng.integers(1, 4, n_cases)
+    drug_rows = pd.DataFrame({
+        "case_id": np.repeat(np.arange(n_cases), per_case_drugs),
+        "drug": rng.choice(n_drugs, per_case_drugs.sum(), p=drug_p / drug_p.sum()),
+    })
+    event_case = np.repeat(np.arange(n_cases), per_case_events)
+    events = rng.choice(n_events, per_case_events.sum(), p=event_p / event_p.sum())
+
+    # Planted signals: a share of the cases with drug k report event n_events - 1 - k
+    first_drug = drug_rows.groupby("case_id")["drug"].first().to_numpy()
+    planted = (first_drug[event_case] < signals) & (rng.random(len(events)) < 0.4)
+    if months:
+        # A separate generator, so the undated table is unchanged
+        month = np.random.default_rng(seed + 1).integers(0, months, n_cases)
+        planted &= month[event_case] >= first_drug[event_case] * months // (signals + 1)
+    events[planted] = n_events - 1 - first_drug[event_case][planted]
+
+    reports = drug_rows.merge(pd.DataFrame({"case_id": event_case, "event": events}), on="case_id")
+    reports["drug"] = pd.Categorical.from_codes(reports["drug"], drug_names)
+    reports["event"] = pd.Categorical.from_codes(reports["event"], event_names)
+    reports["case_id"] = reports["case_id"].astype(np.int64)
+    if months:
+        received = pd.date_range(start, periods=months, freq="MS")[month] + pd.to_timedelta(
+            np.random.default_rng(seed + 2).integers(0, 28, n_cases), unit="D")
+        reports["case_received_date"] = received.strftime("%Y-%m-%d")[reports["case_id"].to_numpy()]
+    return reports
+
+
+def _sequence(counts):
+    # 1..k for each count k, concatenated
+    return np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+
+
+def faers_extract(directory, n_cases, quarter="24Q1", n_drugs=3000, n_events=5000, seed=0, updated=0.1):
+    """Write a FAERS-shaped quarterly extract (DEMO, DRUG, REAC, OUTC `$`-delimited files) of n_cases cases.
+
+    A share (updated) of the cases has a second, later version in the same
+    extract. Drugs are 1-8 per case (the first primary suspect, some
+    secondary suspect, the rest concomitant) and reactions 1-5.
+    """
+    rng = np.random.default_rng(seed)
+    year, q = 2000 + int(quarter[:2]), int(quarter[-1])
+    caseid = 10_000_000 + rng.choice(10 * n_cases, n_cases, replace=False)
+    versions = np.where(rng.random(n_cases) < updated, 2, 1)
+    demo = pd.DataFrame({"caseid": np.repeat(caseid, versions), "caseversion": _sequence(versions)})
+    demo.insert(0, "primaryid", demo["caseid"] * 100 + demo["caseversion"])
+    n = len(demo)
+    fda_dt = pd.Timestamp(year=year, month=3 * q - 2, day=1) + pd.to_timedelta(rng.integers(0, 90, n), unit="D")
+    demo["i_f_code"] = np.where(demo["caseversion"] > 1, "F", "I")
+    demo["event_dt"] = (fda_dt - pd.to_timedelta(rng.integers(5, 400, n), unit="D")).strftime("%Y%m%d")
+    demo["fda_dt"] = fda_dt.strftime("%Y%m%d")
+    demo["rept_cod"] = rng.choice(["EXP", "PER", "DIR"], n, p=[0.7, 0.25, 0.05])
+    demo["age"] = np.where(rng.random(n) < 0.7, rng.integers(1, 95, n).astype(str), "")
+    demo["age_cod"] = np.where(demo["age"] != "", "YR", "")
+    demo["sex"] = rng.choice(["F", "M", "UNK", ""], n, p=[0.55, 0.38, 0.02, 0.05])
+    demo["wt"] = np.where(rng.random(n) < 0.3, np.round(rng.normal(75, 15, n), 1).astype(str), "")
+    demo["wt_cod"] = np.where(demo["wt"] != "", "KG", "")
+    demo["occp_cod"] = rng.choice(["CN", "MD", "HP", "PH", "LW"], n, p=[0.5, 0.25, 0.15, 0.08, 0.02])
+    demo["occr_country"] = rng.choice(["US", "GB", "JP", "FR", "DE", "CA", "BR", "IN"], n,
+                                      p=[0.65, 0.06, 0.06, 0.05, 0.05, 0.05, 0.04, 0.04])
+
+    drug_names = np.char.upper(np.array(_names(DRUGS, n_drugs, "Drug")))
+    drug_p = 1 / np.arange(1, n_drugs + 1) ** 0.8
+    per_drugs = rng.integers(1, 9, n)
+    seq = _sequence(per_drugs)
+    drug = pd.DataFrame({"primaryid": np.repeat(demo["primaryid"].to_numpy(), per_drugs),
+                         "caseid": np.repeat(demo["caseid"].to_numpy(), per_drugs), "drug_seq": seq,
+                         "role_cod": np.where(seq == 1, "PS", np.where(rng.random(len(seq)) < 0.3, "SS", "C")),
+                         "drugname": drug_names[rng.choice(n_drugs, len(seq), p=drug_p / drug_p.sum())]})
+    drug["prod_ai"] = drug["drugname"]
+    drug["val_vbm"] = "1"
+    drug["route"] = rng.choice(["Oral", "Intravenous", "Subcutaneous", "Unknown"], len(seq), p=[0.6, 0.15, 0.15, 0.1])
+    drug["dose_vbm"] = rng.choice(["10 MG, QD", "500 MG, BID", "UNK", ""], len(seq))
+    drug["dechal"] = rng.choice(["Y", "N", "U", "D", ""], len(seq))
+    drug["rechal"] = rng.choice(["Y", "N", "U", "D", ""], len(seq), p=[0.05, 0.05, 0.3, 0.3, 0.3])
+
+    event_names = np.array(_names(EVENTS, n_events, "Event"))
+    event_p = 1 / np.arange(1, n_events + 1) ** 0.9
+    per_events = rng.integers(1, 6, n)
+    reac = pd.DataFrame({"primaryid": np.repeat(demo["primaryid"].to_numpy(), per_events),
+                         "caseid": np.repeat(demo["caseid"].to_numpy(), per_events),
+                         "pt": event_names[rng.choice(n_events, per_events.sum(), p=event_p / event_p.sum())],
+                         "drug_rec_act": ""})
+    serious = rng.random(n) < 0.6
+    outc = pd.DataFrame({"primaryid": demo["primaryid"].to_numpy()[serious],
+                         "caseid": demo["caseid"].to_numpy()[serious],
+                         "outc_cod": rng.choice(["OT", "HO", "DE", "LT", "DS", "RI", "CA"], serious.sum(),
+                                                p=[0.5, 0.3, 0.08, 0.05, 0.03, 0.02, 0.02])})
+
+    os.makedirs(directory, exist_ok=True)
+    for name, table in [("DEMO", demo), ("DRUG", drug), ("REAC", reac), ("OUTC", outc)]:
+        # FAERS lists rows in no particular case order
+        table.iloc[rng.permutation(len(table))].to_csv(f"{directory}/{name}{quarter}.txt", sep="$", index=False)
+
+
+def literature_records(n, seed=0):
+    """Article screening rows (PMID, title, drug, reaction, reporter, patient identifier)."""
+    rng = np.random.default_rng(seed)
+    reactions = np.array(EVENTS + [e.upper() for e in EVENTS] + [e.lower() + "s" for e in EVENTS])
+    drugs = rng.choice(DRUGS, n)
+    picked = rng.choice(reactions, n)
+    return pd.DataFrame({
+        "PMID": rng.integers(10_000_000, 40_000_000, n).astype(str),
+        "Title": [f"Case report: {r.lower()} after {d.lower()}" for d, r in zip(drugs, picked)],
+        "Drug": drugs,
+        "Reaction": picked,
+        "Reporter": np.where(rng.random(n) < 0.9, "Author et al.", ""),
+        "Patient Identifier": np.where(rng.random(n) < 0.85, "Patient", ""),
+        "MAH Marketed": np.where(rng.random(n) < 0.95, "Yes", "No"),
+    })
+
+
+_ARTICLE_TEMPLATE = (
+    "<PubmedArticle><MedlineCitation Status=\"MEDLINE\"><PMID Version=\"1\">{pmid}</PMID><Article><Journal>"
+    "<JournalIssue><PubDate><Year>{year}</Year><Month>{month}</Month></PubDate></JournalIssue><Title>{journal}</Title>"
+    "</Journal><ArticleTitle>{title}</ArticleTitle><Abstract><AbstractText Label=\"BACKGROUND\">{background}"
+    "</AbstractText><AbstractText Label=\"RESULTS\">{results}</AbstractText></Abstract></Article></MedlineCitation>"
+    "<PubmedData><History><PubMedPubDate PubStatus=\"pubmed\"><Year>{year}</Year><Month>{month_number}</Month>"
+    "<Day>{day}</Day></PubMedPubDate></History></PubmedData></PubmedArticle>\n"
+)
+
+
+def medline_files(directory, n_articles, files=1, seed=0, start="2024-01-01", days=730, drugs=DRUGS, events=EVENTS,
+                  deleted=0.001):
+    """Write MEDLINE-shaped XML files (pubmed_0001.xml.gz, ...) of n_articles random abstracts.
+
+    Most articles mention one of drugs and a few of events, in varying case
+    and with inline markup; the last file also deletes a fraction of the
+    earlier PMIDs, like a daily update file.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array([a + b + c + d for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES
+                           for d in ["", "al", "ic", "ity", "ed", "ion"]])
+    published = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n_articles), unit="D")
+    pmids = 30_000_000 + rng.permutation(n_articles * 2)[:n_articles]
+    journals = [f"Journal of {word.capitalize()} Pharmacology" for word in rng.choice(vocabulary, 200)]
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    os.makedirs(directory, exist_ok=True)
+    bounds = np.linspace(0, n_articles, files + 1).astype(int)
+    for number in range(files):
+        path = os.path.join(directory, f"pubmed_{number + 1:04d}.xml.gz")
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=1) as f:
+            f.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<PubmedArticleSet>\n")
+            for i in range(bounds[number], bounds[number + 1]):
+                text = list(rng.choice(vocabulary, rng.integers(60, 200)))
+                drug = rng.choice(drugs)
+                if rng.random() < 0.8:
+                    text.insert(rng.integers(0, len(text)), rng.choice([drug, drug.lower(), drug.upper()]))
+                for event in rng.choice(events, rng.integers(0, 4)):
+                    text.insert(rng.integers(0, len(text)), rng.choice([event.lower(), f"<i>{event}</i>"]))
+                middle = len(text) // 2
+                day = published[i]
+                f.write(_ARTICLE_TEMPLATE.format(
+                    pmid=pmids[i], year=day.year, month=months[day.month - 1], month_number=day.month, day=day.day,
+                    journal=escape(journals[i % len(journals)]),
+                    title=f"{escape(drug)} and {escape(rng.choice(events).lower())}: a case report",
+                    background=" ".join(text[:middle]) + ".", results=" ".join(text[middle:]) + "."))
+            if number == files - 1 and deleted:
+                gone = rng.choice(pmids[:bounds[number + 1]], int(bounds[number + 1] * deleted), replace=False)
+                f.write("<DeleteCitation>" + "".join(f"<PMID Version=\"1\">{pmid}</PMID>" for pmid in gone)
+                        + "</DeleteCitation>\n")
+            f.write("</PubmedArticleSet>\n")
+
+
+_SYLLABLES = ["ab", "cor", "den", "fal", "gen", "hep", "lin", "mar", "neu", "ost", "pal", "ren", "sil", "tor", "vex", "zan"]
+_PT_SUFFIXES = ["disorder", "pain", "syndrome", "infection", "increased", "decreased", "inflammation", "neoplasm"]
+_LLT_VARIANTS = ["{} aggravated", "{} NOS", "acute {}", "chronic {}", "{} recurrent", "worsening of {}"]
+
+
+def meddra_files(directory, n_llt=80_000, n_pt=25_000, seed=0):
+    """Write a MedDRA-shaped llt.asc, mdhier.asc and meddra_release.asc with random terms.
+
+    Only the file layout follows MedDRA; the codes and all terms other than
+    EVENTS and the SOC names are made up.
+    """
+    rng = np.random.default_rng(seed)
+    socs = sorted(set(EVENT_SOCS.values()) | {
+        "Blood and lymphatic system disorders", "Cardiac disorders", "Eye disorders", "Infections and infestations",
+        "Investigations", "Metabolism and nutrition disorders", "Renal and urinary disorders",
+        "Respiratory, thoracic and mediastinal disorders", "Vascular disorders"})
+    words = np.array([a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in ["a", "ia", "is", "osis"]])
+
+    pt_names = list(EVENTS) + list(np.char.add(np.char.add(
+        np.char.capitalize(rng.choice(words, n_pt - len(EVENTS))), " "), rng.choice(_PT_SUFFIXES, n_pt - len(EVENTS))))
+    n_hlt = max(n_pt // 15, len(socs))
+    hlt_soc = np.arange(n_hlt) % len(socs)
+    pt_hlt = rng.integers(0, n_hlt, n_pt)
+    for i, event in enumerate(EVENTS):
+        pt_hlt[i] = socs.index(EVENT_SOCS[event])
+    hierarchy = pd.DataFrame({
+        "pt_code": 90_000_000 + np.arange(n_pt), "hlt_code": 91_000_000 + pt_hlt,
+        "hlgt_code": 92_000_000 + hlt_soc[pt_hlt] * 10 + pt_hlt % 3, "soc_code": 93_000_000 + hlt_soc[pt_hlt],
+        "pt_name": pt_names, "hlt_name": [f"{pt_names[p].split()[0]} conditions" for p in pt_hlt],
+        "hlgt_name": [f"{socs[s].split()[0]} group {h % 3}" for s, h in zip(hlt_soc[pt_hlt], pt_hlt)],
+        "soc_name": np.array(socs)[hlt_soc[pt_hlt]], "soc_abbrev": "", "null_field": "",
+        "pt_soc_code": 93_000_000 + hlt_soc[pt_hlt], "primary_soc_fg": "Y",
+    })
+
+    # Every PT has an LLT of the same name; the rest are variants of random PTs
+    variant_pt = rng.integers(0, n_pt, n_llt - n_pt)
+    variants = [rng.choice(_LLT_VARIANTS).format(pt_names[p].lower()) for p in variant_pt]
+    llt_pt = np.concatenate([np.arange(n_pt), variant_pt])
+    llts = pd.DataFrame({"llt_code": 80_000_000 + np.arange(n_llt), "llt_name": pt_names + variants,
+                         "pt_code": 90_000_000 + llt_pt})
+    for column in ["llt_whoart_code", "llt_harts_code", "llt_costart_sym", "llt_icd9_code", "llt_icd9cm_code",
+                   "llt_icd10_code"]:
+        llts[column] = ""
+    llts["llt_currency"] = np.where(rng.random(n_llt) < 0.95, "Y", "N")
+    llts.loc[:n_pt - 1, "llt_currency"] = "Y"
+    llts["llt_jart_code"] = ""
+
+    os.makedirs(directory, exist_ok=True)
+    for name, table in [("llt.asc", llts), ("mdhier.asc", hierarchy)]:
+        with open(f"{directory}/{name}", "w") as f:
+            for row in table.astype(str).itertuples(index=False):
+                f.write("$".join(row) + "$\n")
+    with open(f"{directory}/meddra_release.asc", "w") as f:
+        f.write("0.0 synthetic$English$$$\n")
+
+
+_DRUG_STEMS = ["pril", "sartan", "olol", "statin", "mab", "vir", "cillin", "azole", "dipine", "tinib", "oxetine", "floxacin"]
+_DRUG_FORMS = ["", " tablets", " TAB", " 500mg", " 10 mg film-coated tablets", " caps", " 250 mg/5 ml oral suspension",
+               " injection", " hcl", " ER"]
+
+
+def drug_dictionary(n_products=5000, synonyms=2, seed=0):
+    """A WHO-Drug-style dictionary: each product's preferred name plus random trade names."""
+    rng = np.random.default_rng(seed)
+
+    def words(shape, endings):
+        syllables = [rng.choice(_SYLLABLES, shape) for _ in range(3)]
+        return np.char.capitalize(np.char.add(np.char.add(np.char.add(*syllables[:2]), syllables[2]),
+                                              rng.choice(endings, shape)))
+
+    preferred = pd.unique(words(2 * n_products, _DRUG_STEMS))[:n_products]
+    ids = np.array([f"D{i:06d}" for i in range(len(preferred))])
+    return pd.DataFrame({
+        "drug_id": np.concatenate([ids, np.repeat(ids, synonyms)]),
+        "preferred_name": np.concatenate([preferred, np.repeat(preferred, synonyms)]),
+        "name": np.concatenate([preferred, words((len(preferred), synonyms), ["ex", "on", "ix", "al", "ane"]).ravel()]),
+    }).drop_duplicates("name", keep=False)
+
+
+def drug_verbatims(dictionary, n, distinct=20_000, seed=0):
+    """n verbatim drug names written the way reporters do (case, strength, form, the odd typo).
+
+    Returns (verbatims, true drug_id), drawn from a pool of distinct verbatims.
+    """
+    rng = np.random.default_rng(seed)
+    rows = dictionary.iloc[rng.integers(0, len(dictionary), distinct)]
+    names = rows["name"].to_numpy(dtype=str)
+    typo = rng.random(distinct) < 0.1
+    at = rng.integers(1, np.char.str_len(names) - 1)
+    names = np.where(typo, [name[:i] + name[i + 1:] for name, i in zip(names, at)], names)
+    case = rng.integers(0, 3, distinct)
+    names = np.where(case == 1, np.char.upper(names), np.where(case == 2, np.char.lower(names), names))
+    pool = np.char.add(names, rng.choice(_DRUG_FORMS, distinct))
+    picked = rng.integers(0, distinct, n)
+    return pd.Series(pool[picked]), rows["drug_id"].to_numpy()[picked]
@@ -0,0 +1,145 @@
+"""Summary tabulations and line listings for PSUR/PBRER/DSUR preparation.
+
+Cases are read in chunks and only the event counts per (SOC, PT,
+seriousness) are kept, so the case source can be far larger than memory.
+A Tabulation covers one reporting period. The tabulation of a new interval
+is merged onto the previous cumulative one, so older data is never
+rescanned. Received dates are compared as ISO strings (YYYY-MM-DD).
+"""
+import json
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+TABULATION_KEYS = ["soc", "pt", "seriousness"]
+LINE_LISTING_COLUMNS = [
+    "case_id", "case_received_date", "report_type", "country", "patient_age", "gender",
+    "suspected_drug", "dose", "route", "start_date", "end_date",
+    "ae_verbatim", "pt", "soc", "seriousness", "seriousness_detail", "ae_outcome", "causality_result",
+]
+UNCLASSIFIED = "Unclassified"
+NOT_REPORTED = "Not reported"
+
+
+def _empty_counts():
+    return pd.Series(0, index=pd.MultiIndex.from_arrays([[], [], []], names=TABULATION_KEYS), dtype=np.int64)
+
+
+def _day_before(day):
+    return (pd.Timestamp(day) - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+@dataclass
+class Tabulation:
+    start: str | None   # first received date included; None means from the first case
+    end: str            # data lock point, included
+    counts: pd.Series = field(default_factory=_empty_counts)  # events per (soc, pt, seriousness)
+
+    @property
+    def n_events(self):
+        return int(self.counts.sum())
+
+    def contains(self, received):
+        inside = received <= self.end
+        return inside & (received >= self.start) if self.start else inside
+
+    def add(self, coded):
+        """Count a chunk that already has pt, soc and seriousness columns."""
+        if len(coded):
+            sizes = coded.groupby(TABULATION_KEYS, sort=False).size()
+            self.counts = self.counts.add(sizes, fill_value=0).astype(np.int64)
+
+    def merge(self, interval):
+        """The cumulative tabulation up to the end of the next, adjacent interval."""
+        if interval.start is None or _day_before(interval.start) != self.end:
+            raise ValueError(f"interval starting {interval.start} does not follow a tabulation ending {self.end}")
+        return Tabulation(self.start, interval.end, self.counts.add(interval.counts, fill_value=0).astype(np.int64))
+
+    def summary(self):
+        """One row per SOC and PT with Serious, Non Serious and Total event counts."""
+        table = self.counts.unstack("seriousness", fill_value=0).reindex(columns=["Serious", "Non Serious"], fill_value=0)
+        table["Total"] = table.sum(axis=1)
+        table = table.rename_axis(columns=None).reset_index().rename(columns={"soc": "SOC", "pt": "PT"})
+        return table.sort_values(["SOC", "Total", "PT"], ascending=[True, False, True], kind="stable").reset_index(drop=True)
+
+    def to_json(self):
+        rows = [[*key, int(n)] for key, n in self.counts.items()]
+        return json.dumps({"start": self.start, "end": self.end, "counts": rows})
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        tabulation = cls(data["start"], data["end"])
+        if data["counts"]:
+            rows = pd.DataFrame(data["counts"], columns=TABULATION_KEYS + ["n"])
+            tabulation.counts = rows.set_index(TABULATION_KEYS)["n"].astype(np.int64)
+        return tabulation
+
+
+def _per_value(values, func):
+    # Columns here hold few distinct values, so work on those and broadcast back
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return func(pd.Series(uniques, dtype=object).fillna("").astype(str)).to_numpy()[codes]
+
+
+def code_events(chunk, soc_map=None):
+    """Add pt, soc and normalized seriousness columns to a case chunk.
+
+    MedDRA-coded pt/soc columns are used when present. Otherwise the PT is
+    the verbatim term and the SOC comes from soc_map (PT -> SOC, any case).
+    """
+    if "pt" not in chunk:
+        chunk["pt"] = _per_value(chunk["ae_verbatim"], lambda terms: terms.str.strip().replace("", NOT_REPORTED))
+    if "soc" not in chunk:
+        socs = pd.Series({str(pt).casefold(): soc for pt, soc in (soc_map or {}).items()}, dtype=object)
+        chunk["soc"] = _per_value(chunk["pt"], lambda pts: pts.str.casefold().map(socs).fillna(UNCLASSIFIED))
+    chunk["seriousness"] = _per_value(
+        chunk["seriousness"], lambda values: values.str.strip().str.casefold().map({"serious": "Serious"}).fillna("Non Serious"))
+    return chunk
+
+
+def _scan(chunks, tabulations, product, report_types, soc_map, listing):
+    # Every row goes to the tabulation whose period holds its received date;
+    # the line listing gets the rows of the last one
+    end = tabulations[-1].end
+    header = True
+    for chunk in chunks:
+        received = _per_value(chunk["case_received_date"], lambda dates: dates.str[:10])
+        keep = (received != "") & (received <= end)
+        if product:
+            drugs = chunk["drug_name"] if "drug_name" in chunk else chunk["suspected_drug"]
+            keep &= _per_value(drugs, lambda drugs: drugs.str.strip().str.casefold() == product.strip().casefold())
+        if report_types:
+            keep &= chunk["report_type"].isin(report_types).to_numpy()
+        if not keep.any():
+            continue
+        coded = code_events(chunk[keep].copy(), soc_map)
+        received = received[keep]
+        for tabulation in tabulations:
+            tabulation.add(coded[tabulation.contains(received)])
+        if listing is not None:
+            rows = coded[tabulations[-1].contains(received)]
+            if len(rows):
+                rows.reindex(columns=LINE_LISTING_COLUMNS).to_csv(listing, header=header, index=False)
+                header = False
+    return tabulations
+
+
+def tabulate(chunks, start, end, product=None, report_types=None, soc_map=None, listing=None):
+    """Interval tabulation of cases received from start to end, in one pass over the chunks.
+
+    chunks is any iterable of case DataFrames (a chunked CSV reader,
+    CaseStore.iter_cases, read_e2b). product is matched against the
+    normalized drug_name column when chunks have one, else suspected_drug.
+    When listing is a text file object, the interval's line listing is
+    written to it as CSV.
+    """
+    return _scan(chunks, [Tabulation(start, end)], product, report_types, soc_map, listing)[0]
+
+
+def tabulate_with_history(chunks, start, end, product=None, report_types=None, soc_map=None, listing=None):
+    """(interval, cumulative) tabulations from one pass, when no earlier cumulative is saved."""
+    history, interval = _scan(chunks, [Tabulation(None, _day_before(start)), Tabulation(start, end)],
+                              product, report_types, soc_map, listing)
+    return interval, history.merge(interval)
@@ -0,0 +1,306 @@
+"""Columnar case warehouse: Parquet datasets partitioned by receipt quarter and product.
+
+Two datasets live under the warehouse directory, each laid out as
+<dataset>/quarter=2024Q1/bucket=17/part-*.parquet, where the bucket is a
+hash of the product (drug dictionary name), so sources with thousands of
+distinct drug names still make a few dozen partitions per quarter:
+
+- cases: one row per case with the ICSR fields and status
+- reports: one row per case, drug and event (REPORT_COLUMNS), for signal detection
+
+Low-cardinality text columns are dictionary-encoded and come back as pandas
+categoricals. Reads memory-map the files, prune partitions on quarter and
+product bucket before a file is opened, project to the requested columns, and
+stream record batches, so memory follows the query rather than the
+warehouse.
+
+A write replaces the cases it contains and keeps every other case. Its
+chunks are staged next to the dataset; once every chunk is written, each
+partition it writes, or that holds an earlier version of one of its
+cases, is rewritten as the partition's other cases plus the staged rows
+and swapped in. replace_all swaps in the whole dataset instead.
+"""
+import functools
+import operator
+import os
+import shutil
+import threading
+import uuid
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from pvcore.case_store import CASE_COLUMNS, NUMERIC_FIELDS
+from pvcore.signal_trends import report_periods
+
+DATASETS = ["cases", "reports"]
+REPORT_COLUMNS = ["case_id", "drug", "event", "case_received_date", "patient_age", "gender"]
+PARTITIONING = ds.partitioning(pa.schema([("quarter", pa.string()), ("bucket", pa.int32())]), flavor="hive")
+PRODUCT_BUCKETS = 64
+UNKNOWN = "Unknown"
+# Text columns with few distinct values; the rest (IDs, names, free text, dates) stay plain strings
+DICTIONARY_COLUMNS = {
+    "report_type", "country", "seriousness", "seriousness_detail", "reporter_qualification", "gender",
+    "parent_case_status", "ae_verbatim", "ae_meddra", "ae_outcome", "suspected_drug", "dose", "route",
+    "indication", "causality_method", "causality_result", "dechallenge", "rechallenge", "status", "drug", "event",
+}
+_TYPES = {"patient_age": pa.int32(), "weight": pa.float64(), "height": pa.float64()}
+_WRITE_OPTIONS = dict(format="parquet", partitioning=PARTITIONING, existing_data_behavior="overwrite_or_ignore",
+                      max_partitions=1_000_000,
+                      file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"))
+
+
+def _arrow_type(name):
+    if name in _TYPES:
+        return _TYPES[name]
+    return pa.dictionary(pa.int32(), pa.string()) if name in DICTIONARY_COLUMNS else pa.string()
+
+
+SCHEMAS = {"cases": pa.schema([(name, _arrow_type(name)) for name in CASE_COLUMNS]),
+           "reports": pa.schema([(name, _arrow_type(name)) for name in REPORT_COLUMNS])}
+
+
+def quarters(dates):
+    """Receipt quarter ("2024Q1") of each date or date string; UNKNOWN where missing."""
+    periods = report_periods(dates, "Q")
+    return pd.Series(periods.astype(str), dtype=object).where(~periods.isna(), UNKNOWN).to_numpy()
+
+
+def product_buckets(products):
+    """The bucket partition of each product name."""
+    codes, uniques = pd.factorize(pd.Series(products).to_numpy(dtype=object), use_na_sentinel=False)
+    return np.array([zlib.crc32(str(u).encode()) % PRODUCT_BUCKETS for u in uniques], dtype=np.int32)[codes]
+
+
+def _text(values):
+    values = pd.Series(values).to_numpy(dtype=object)
+    try:
+        return pa.array(values, pa.string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Not all strings: distinct values are converted once, missing stays missing
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        return pa.array(pd.Series([None if pd.isna(u) else str(u) for u in uniques], dtype=object).to_numpy()[codes],
+                        pa.string())
+
+
+def _to_arrow(frame, schema, quarter, product):
+    arrays = []
+    for field in schema:
+        values = frame[field.name] if field.name in frame else pd.Series(None, index=frame.index, dtype=object)
+        if field.name in NUMERIC_FIELDS:
+            arrays.append(pa.array(pd.to_numeric(values, errors="coerce"), from_pandas=True).cast(field.type, safe=False))
+        else:
+            arrays.append(_text(values).cast(field.type))
+    table = pa.Table.from_arrays(arrays, schema=schema).append_column("product", _text(product)) \
+        .append_column("quarter", pa.array(quarter, pa.string())) \
+        .append_column("bucket", pa.array(product_buckets(product), pa.int32()))
+    # Rows of one partition together, so each chunk opens each partition's file once; products sorted within
+    # a file give row groups narrow product statistics
+    table = table.sort_by([("quarter", "ascending"), ("bucket", "ascending"), ("product", "ascending")])
+    return table.set_column(len(schema), "product", table["product"].dictionary_encode())
+
+
+def case_reports(cases, products):
+    """REPORT_COLUMNS rows of cases (one drug and one event each): the product and the MedDRA term, else the verbatim.
+
+    The result is indexed by the position of each case in cases.
+    """
+    events = cases["ae_meddra"] if "ae_meddra" in cases else pd.Series("", index=cases.index)
+    events = events.fillna("").astype(str).str.strip()
+    verbatim = cases["ae_verbatim"].fillna("").astype(str).str.strip() if "ae_verbatim" in cases else events
+    reports = pd.DataFrame({"case_id": cases["case_id"].to_numpy(), "drug": products,
+                            "event": events.where(events != "", verbatim).to_numpy()})
+    for column in ["case_received_date", "patient_age", "gender"]:
+        reports[column] = cases[column].to_numpy() if column in cases else None
+    return reports[reports["event"] != ""]
+
+
+def pair_reports(cases, pairs, products):
+    """REPORT_COLUMNS rows of (case_id, drug, event) pairs of cases, with products as the drugs.
+
+    For sources with several drugs and events per case. The result is
+    indexed by the position of each pair's case in cases; pairs of other
+    cases are left out.
+    """
+    positions = pd.Index(cases["case_id"]).get_indexer(pairs["case_id"])
+    events = pairs["event"].fillna("").astype(str).str.strip().to_numpy()
+    keep = (positions >= 0) & (events != "")
+    reports = pd.DataFrame({"case_id": pairs["case_id"].to_numpy()[keep], "drug": products[keep],
+                            "event": events[keep]}, index=positions[keep])
+    for column in ["case_received_date", "patient_age", "gender"]:
+        reports[column] = cases[column].to_numpy()[positions[keep]] if column in cases else None
+    return reports
+
+
+def _products(drugs, canonical):
+    drugs = pd.Series(drugs).fillna("").astype(str).str.strip()
+    products = pd.Series(canonical(drugs) if canonical else drugs, index=drugs.index).fillna("").astype(str)
+    return products.where(products != "", UNKNOWN).to_numpy()
+
+
+class CaseWarehouse:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._datasets = {}   # name -> (version, dataset), rediscovered after a write
+        self._filesystem = fs.LocalFileSystem(use_mmap=True)
+
+    @property
+    def version(self):
+        """Changes with every write; a cache key for query results."""
+        marker = self.root / "_version"
+        return marker.read_text() if marker.exists() else ""
+
+    def _held(self, target, case_ids):
+        # The (quarter, bucket) partitions holding rows of these cases
+        held = ds.dataset(str(target), format="parquet", partitioning=PARTITIONING) \
+            .to_table(columns=["quarter", "bucket"], filter=ds.field("case_id").isin(case_ids))
+        return {Path(f"quarter={row['quarter']}", f"bucket={row['bucket']}")
+                for row in held.group_by(["quarter", "bucket"]).aggregate([]).to_pylist()}
+
+    def _swap(self, name, staging, case_ids, replace_all):
+        target = self.root / name
+        if replace_all or not target.exists():
+            retired = self.root / f".retired-{name}-{uuid.uuid4().hex}"
+            if target.exists():
+                os.replace(target, retired)
+            if staging.exists():
+                os.replace(staging, target)
+            shutil.rmtree(retired, ignore_errors=True)
+            return
+        partitions = {partition.relative_to(staging) for partition in staging.glob("*/*")} | self._held(target, case_ids)
+        # Each partition's rows of other cases are staged next to the written ones
+        for partition in partitions:
+            if not (target / partition).exists():
+                continue
+            kept = ds.dataset(str(target / partition), format="parquet").to_table()
+            kept = kept.filter(pc.invert(pc.is_in(kept["case_id"], value_set=case_ids)))
+            if kept.num_rows:
+                (staging / partition).mkdir(parents=True, exist_ok=True)
+                pq.write_table(kept, staging / partition / f"part-{uuid.uuid4().hex}-0.parquet", compression="zstd")
+        for partition in partitions:
+            destination = target / partition
+            shutil.rmtree(destination, ignore_errors=True)
+            if (staging / partition).exists():
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(staging / partition, destination)
+        shutil.rmtree(staging, ignore_errors=True)
+
+    def write(self, chunks, canonical=None, replace_all=False):
+        """Write case chunks (DataFrames with CASE_COLUMNS) to both datasets; returns the cases written.
+
+        A chunk may also be a (cases, pairs) tuple, pairs holding every
+        (case_id, drug, event) of those cases; the reports are then the
+        pairs rather than each case's suspected_drug and event. canonical
+        maps drug names to product names (e.g. DrugNormalizer.canonical);
+        without it the product is the stripped drug name. Earlier rows of
+        the written cases are replaced; other cases are kept unless
+        replace_all is set, which leaves only the written cases.
+        """
+        staged = {name: self.root / f".staging-{name}-{uuid.uuid4().hex}" for name in DATASETS}
+        written, case_ids = 0, []
+        try:
+            for chunk in chunks:
+                chunk, pairs = chunk if isinstance(chunk, tuple) else (chunk, None)
+                products = _products(chunk["suspected_drug"], canonical)
+                quarter = quarters(chunk["case_received_date"])
+                reports = case_reports(chunk, products) if pairs is None \
+                    else pair_reports(chunk, pairs, _products(pairs["drug"], canonical))
+                template = f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+                ds.write_dataset(_to_arrow(chunk, SCHEMAS["cases"], quarter, products), staged["cases"],
+                                 basename_template=template, **_WRITE_OPTIONS)
+                ds.write_dataset(_to_arrow(reports, SCHEMAS["reports"], quarter[reports.index], reports["drug"].to_numpy()),
+                                 staged["reports"], basename_template=template, **_WRITE_OPTIONS)
+                written += len(chunk)
+                case_ids.append(_text(chunk["case_id"]))
+            case_ids = pc.unique(pc.drop_null(pa.chunked_array(case_ids, pa.string()))) \
+                if case_ids else pa.array([], pa.string())
+            with self._lock:
+                for name in DATASETS:
+                    self._swap(name, staged[name], case_ids, replace_all)
+                (self.root / "_version").write_text(uuid.uuid4().hex)
+                self._datasets.clear()
+        finally:
+            for path in staged.values():
+                shutil.rmtree(path, ignore_errors=True)
+        return written
+
+    def dataset(self, name):
+        """The pyarrow Dataset of cases or reports, or None before the first write."""
+        with self._lock:
+            version = self.version
+            cached = self._datasets.get(name)
+            if cached is None or cached[0] != version:
+                path = self.root / name
+                dataset = ds.dataset(str(path.resolve()), format="parquet", partitioning=PARTITIONING,
+                                     filesystem=self._filesystem) if path.exists() else None
+                cached = self._datasets[name] = (version, dataset)
+            return cached[1]
+
+    def _filter(self, received_from, received_to, products):
+        # Conditions on quarter and bucket prune whole partitions; the date and product ones then apply per row
+        conditions = []
+        if received_from:
+            conditions += [ds.field("quarter") >= quarters([received_from])[0],
+                           ds.field("case_received_date") >= str(received_from)[:10]]
+        if received_to:
+            conditions += [ds.field("quarter") <= quarters([received_to])[0],
+                           ds.field("case_received_date") <= str(received_to)[:10]]
+        if products:
+            conditions += [ds.field("bucket").isin(sorted(set(product_buckets(list(products))))),
+                           ds.field("product").isin(list(products))]
+        return functools.reduce(operator.and_, conditions) if conditions else None
+
+    def scan(self, name, columns=None, received_from=None, received_to=None, products=None, batch_size=100_000):
+        """Yield DataFrame chunks of a dataset: the given columns (quarter, bucket and product included) of the matching rows.
+
+        Dates are ISO strings compared inclusively; products are exact
+        product names, as written.
+        """
+        dataset = self.dataset(name)
+        if dataset is None:
+            return
+        batches = dataset.to_batches(columns=columns, filter=self._filter(received_from, received_to, products),
+                                     batch_size=batch_size)
+        for batch in batches:
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def read(self, name, columns=None, received_from=None, received_to=None, products=None):
+        """The matching rows of a dataset as one DataFrame (empty before the first write)."""
+        dataset = self.dataset(name)
+        if dataset is None:
+            return pd.DataFrame(columns=columns or SCHEMAS[name].names)
+        return dataset.to_table(columns=columns, filter=self._filter(received_from, received_to, products)).to_pandas()
+
+    def summary(self):
+        """Rows, files, partitions and bytes per dataset."""
+        rows = []
+        for name in DATASETS:
+            dataset = self.dataset(name)
+            files = dataset.files if dataset is not None else []
+            rows.append({"dataset": name, "rows": dataset.count_rows() if dataset is not None else 0,
+                         "files": len(files), "partitions": len({os.path.dirname(f) for f in files}),
+                         "bytes": sum(os.path.getsize(f) for f in files)})
+        return pd.DataFrame(rows)
+
+
+_warehouses = {}
+_warehouses_lock = threading.Lock()
+
+
+def get_warehouse(path):
+    """The process-wide CaseWarehouse for a directory, created on first use."""
+    key = str(path)
+    with _warehouses_lock:
+        if key not in _warehouses:
+            _warehouses[key] = CaseWarehouse(key)
+        return _warehouses[key]
@@ -0,0 +1,47 @@
+import pandas as pd
+
+from pvcore.faers import ingest
+from pvcore.synthetic import faers_extract, icsr_cases
+from pvcore.warehouse import CaseWarehouse
+
+
+def test_write_keeps_earlier_batches(tmp_path):
+    warehouse = CaseWarehouse(tmp_path)
+    first, second = icsr_cases(1000, seed=0), icsr_cases(5, seed=1)
+    warehouse.write([first])
+    warehouse.write([second])
+
+    cases = warehouse.read("cases", ["case_id"])["case_id"]
+    assert len(cases) == 1005
+    assert set(cases) == set(first["case_id"]) | set(second["case_id"])
+    assert set(warehouse.read("reports", ["case_id"])["case_id"]) == set(cases)
+
+
+def test_write_replaces_earlier_rows_of_its_cases(tmp_path):
+    warehouse = CaseWarehouse(tmp_path)
+    cases = icsr_cases(200)
+    warehouse.write([cases])
+    updated = cases.iloc[:3].assign(suspected_drug="Newdrug", case_received_date="2030-01-15")
+    warehouse.write([updated])
+
+    stored = warehouse.read("cases", ["case_id", "suspected_drug", "quarter"])
+    assert len(stored) == 200
+    moved = stored[stored["case_id"].isin(updated["case_id"])]
+    assert list(moved["suspected_drug"].astype(str)) == ["Newdrug"] * 3
+    assert set(moved["quarter"]) == {"2030Q1"}
+    reports = warehouse.read("reports", ["case_id", "drug"])
+    assert set(reports.loc[reports["case_id"].isin(updated["case_id"]), "drug"].astype(str)) == {"Newdrug"}
+
+
+def test_faers_ingest_keeps_earlier_extracts(tmp_path):
+    warehouse = CaseWarehouse(tmp_path / "warehouse")
+    faers_extract(tmp_path / "24Q1", 2000, quarter="24Q1", seed=0)
+    faers_extract(tmp_path / "24Q2", 2000, quarter="24Q2", seed=1)
+    ingest(tmp_path / "24Q1", warehouse=warehouse)
+    first = warehouse.read("cases", ["case_id"])["case_id"]
+    ingest(tmp_path / "24Q2", warehouse=warehouse)
+
+    cases = warehouse.read("cases", ["case_id"])["case_id"]
+    assert first.isin(cases).all()
+    assert cases.is_unique
+    assert len(cases) > len(first)
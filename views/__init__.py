@@ -0,0 +1,116 @@
+"""Sidebar pages, one module each.
+
+A page module is imported the first time its page is opened, so its heavy
+imports (FPDF, the stores, the signal engine) and cached setup are only paid
+for by the sessions that use it.
+
+With PV_METRICS=1 every page render is timed (see pvcore.instrumentation),
+and a page can split its time into sections with section("name"). Pages
+declare fragments with @fragment rather than @st.fragment, so a fragment's
+own reruns are timed too.
+"""
+import functools
+import importlib
+import threading
+import time
+import uuid
+from datetime import date
+
+import streamlit as st
+
+from pvcore.instrumentation import ENABLED, FRAGMENT, WHOLE_PAGE, approximate_size, get_recorder
+
+PAGES = {
+    "Home": "home",
+    "ICSR Processing": "icsr",
+    "Literature Monitoring": "literature",
+    "Aggregate Reports Preparation": "aggregate",
+    "Signal Management": "signals",
+    "Risk Management": "risk",
+    "Regulatory Reporting / Submissions": "regulatory",
+    "Automation / PV Technology": "automation",
+}
+TOP = "(top)"
+_run = threading.local()   # the render in progress on this script thread
+
+
+def _fingerprint(value):
+    return value if isinstance(value, (str, int, float, bool, type(None), date)) else id(value)
+
+
+def _widget_state():
+    return {str(key): _fingerprint(value) for key, value in st.session_state.items() if not str(key).startswith("_pv_")}
+
+
+def _trigger(page):
+    """What caused this rerun: first run, navigation, or the session-state keys changed since the last run ended."""
+    state = st.session_state
+    current = _widget_state()
+    previous, previous_page = state.get("_pv_widgets"), state.get("_pv_page")
+    state["_pv_page"] = page
+    if previous is None:
+        return "first run"
+    if previous_page != page:
+        return "navigation"
+    changed = sorted(key for key, value in current.items() if key not in previous or previous[key] != value)
+    # A clicked button is True for one rerun, then resets to False; the reset is not what triggered this one
+    reset = {key for key in changed if previous.get(key) is True and current[key] is False}
+    return ", ".join(([key for key in changed if key not in reset] or changed)[:3]) or "unkeyed widget"
+
+
+def _close_section():
+    get_recorder().record(_run.session, _run.page, _run.section, _run.trigger,
+                          time.perf_counter() - _run.section_started)
+
+
+def section(name):
+    """Start a timed section of the page being rendered; it lasts until the next section or the page's end."""
+    if ENABLED and getattr(_run, "page", None) is not None:
+        _close_section()
+        _run.section, _run.section_started = name, time.perf_counter()
+
+
+def render_admin():
+    """The hidden metrics page, outside the sidebar and not itself timed."""
+    importlib.import_module("views.admin").render()
+
+
+def _timed(page, name, render):
+    # One rerun of the page, or of one of its fragments, timed as section name with its sections inside
+    _run.session = st.session_state.setdefault("_pv_session", uuid.uuid4().hex[:12])
+    _run.page, _run.trigger = page, _trigger(page)
+    started = time.perf_counter()
+    _run.section, _run.section_started = TOP, started
+    try:
+        return render()
+    finally:
+        if _run.section != TOP:
+            _close_section()
+        recorder = get_recorder()
+        recorder.record(_run.session, page, name, _run.trigger, time.perf_counter() - started)
+        state_bytes = sum(approximate_size(value) for key, value in st.session_state.items()
+                          if not str(key).startswith("_pv_"))
+        recorder.rerun(_run.session, page, state_bytes)
+        # Compared with at the next rerun; widgets first drawn in this one are in it already
+        st.session_state["_pv_widgets"] = _widget_state()
+        _run.page = None
+
+
+def fragment(func):
+    """st.fragment whose own reruns are timed under the page as FRAGMENT + the function name."""
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if not ENABLED or getattr(_run, "page", None) is not None:
+            # Rendered with the page, so already timed as part of it
+            return func(*args, **kwargs)
+        return _timed(st.session_state.get("_pv_page", ""), FRAGMENT + func.__name__,
+                      functools.partial(func, *args, **kwargs))
+    return st.fragment(run)
+
+
+def render_page(page):
+    module = importlib.import_module(f"views.{PAGES[page]}")
+    if not ENABLED:
+        module.render()
+        return
+    _timed(page, WHOLE_PAGE, module.render)
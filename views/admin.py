@@ -0,0 +1,61 @@
+"""Hidden admin page with the render-time metrics, opened with ?admin=metrics."""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from pvcore.instrumentation import ENABLED, FRAGMENT, SAMPLE_COLUMNS, WHOLE_PAGE, get_recorder
+
+
+def _latency_table(rows):
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    for column in ["p50", "p95", "max"]:
+        table[column] = (table[column] * 1000).round(1)
+    return table.rename(columns={"p50": "p50 (ms)", "p95": "p95 (ms)", "max": "max (ms)"})
+
+
+def render():
+    st.header("Render Metrics")
+    if not ENABLED:
+        st.info("Instrumentation is off. Start the app with PV_METRICS=1 to record render times and reruns.")
+        return
+    recorder = get_recorder()
+    snapshot = recorder.snapshot()
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Reruns", f"{sum(snapshot['reruns'].values()):,}")
+    metric_cols[1].metric("Sessions", snapshot["sessions"])
+    metric_cols[2].metric("Largest session state", f"{snapshot['session_state_bytes_max'] / 1e6:.1f} MB")
+    if snapshot["peak_memory_bytes"] is not None:
+        metric_cols[3].metric("Peak memory", f"{snapshot['peak_memory_bytes'] / 1e6:.0f} MB")
+    st.caption(f"Latencies are over the last {len(recorder.samples):,} samples; "
+               f"metrics are written to {recorder.path}.")
+
+    latency = _latency_table(snapshot["latency"])
+    if latency.empty:
+        st.info("No pages rendered yet.")
+        return
+    runs = (latency["section"] == WHOLE_PAGE) | latency["section"].str.startswith(FRAGMENT)
+    st.subheader("Render latency per page")
+    st.caption("Fragment rows are the fragment's own reruns, without the rest of the page.")
+    st.dataframe(latency[runs].rename(columns={"section": "rerun"}), hide_index=True)
+    st.subheader("Per section")
+    st.dataframe(latency[~runs], hide_index=True)
+    st.subheader("Per widget interaction")
+    st.caption("The trigger is the session-state keys that changed before the rerun; "
+               "widgets without a key show as \"unkeyed widget\".")
+    by_trigger = _latency_table(recorder.latency(("page", "section", "trigger")))
+    runs = (by_trigger["section"] == WHOLE_PAGE) | by_trigger["section"].str.startswith(FRAGMENT)
+    st.dataframe(by_trigger[runs].rename(columns={"section": "rerun"}), hide_index=True)
+    st.subheader("Reruns per page")
+    st.bar_chart(pd.Series(snapshot["reruns"], name="reruns"))
+
+    with st.expander("Recent samples"):
+        samples = pd.DataFrame(recorder.sample_rows()[-500:], columns=SAMPLE_COLUMNS)
+        samples["timestamp"] = pd.to_datetime(samples["timestamp"], unit="s")
+        st.dataframe(samples.iloc[::-1], hide_index=True)
+    with st.expander("Prometheus metrics"):
+        st.code(recorder.prometheus(), language="text")
+    st.download_button("Download Metrics (JSON)", lambda: json.dumps(recorder.snapshot(), indent=2),
+                       "pv_metrics.json", "application/json")
@@ -0,0 +1,104 @@
+"""Aggregate Reports Preparation page."""
+import io
+import time
+from datetime import date as Date
+
+import streamlit as st
+import pandas as pd
+
+from pvcore.case_store import get_case_store
+from pvcore.config import data_path
+from pvcore.content import AGGREGATE_REPORTS
+from pvcore.drugs import get_drug_normalizer
+from pvcore.meddra import get_meddra_index
+from pvcore.tabulation import LINE_LISTING_COLUMNS, Tabulation, tabulate, tabulate_with_history
+from pvcore.warehouse import get_warehouse
+from views import section
+
+# Case sources DSURs are built from; PSURs and PBRERs use every source
+DSUR_REPORT_TYPES = ["Clinical Trial"]
+
+
+@st.cache_resource
+def aggregate_reports_table():
+    # List cells are joined so the table serializes to Arrow without fallbacks
+    table = pd.DataFrame(AGGREGATE_REPORTS)
+    return table.map(lambda cell: ", ".join(cell) if isinstance(cell, list) else cell)
+
+
+def render():
+    st.header("Aggregate Safety Reports")
+    st.table(aggregate_reports_table())
+
+    section("Summary Tabulations")
+    st.subheader("Summary Tabulations")
+    report = st.selectbox("Report", list(AGGREGATE_REPORTS))
+    source = st.radio("Cases from", ["Case store", "Case warehouse", "Uploaded case table"], horizontal=True)
+    warehouse = get_warehouse(data_path("warehouse"))
+    if source == "Case warehouse":
+        with st.expander("Case warehouse"):
+            st.dataframe(warehouse.summary(), hide_index=True)
+            if st.button("Rebuild from Case Store"):
+                started = time.perf_counter()
+                written = warehouse.write(get_case_store(data_path("cases.db")).iter_cases(),
+                                          canonical=get_drug_normalizer(data_path("drug_dictionary.csv")).canonical,
+                                          replace_all=True)
+                st.success(f"{written} cases written in {time.perf_counter() - started:.1f} s.")
+    case_file = st.file_uploader("Case table (CSV, one row per case)", type=["csv"]) if source == "Uploaded case table" else None
+    product = st.text_input("Product (suspected drug; leave empty for all)")
+    period_cols = st.columns(2)
+    data_lock = period_cols[1].date_input("Data Lock Point", Date.today())
+    interval_start = period_cols[0].date_input("Interval Start", data_lock - pd.DateOffset(months=6) + pd.Timedelta(days=1))
+    previous_file = st.file_uploader("Previous cumulative tabulation (JSON from the last report; optional)", type=["json"])
+
+    if st.button("Build Tabulations"):
+        start, end = interval_start.isoformat(), data_lock.isoformat()
+        previous = Tabulation.from_json(previous_file.getvalue()) if previous_file is not None else None
+        drugs = get_drug_normalizer(data_path("drug_dictionary.csv")) if product.strip() else None
+        if drugs:
+            product = drugs.normalize(product)["drug_name"]
+            st.caption(f"Product: {product}")
+        columns = [c for c in LINE_LISTING_COLUMNS if c not in ("pt", "soc")]
+        if source == "Case store":
+            # With a saved cumulative only the interval is read, through the received-date index
+            chunks = get_case_store(data_path("cases.db")).iter_cases(
+                columns=columns, received_from=start if previous else None, received_to=end)
+        elif source == "Case warehouse":
+            # Only the product's partitions, the quarters up to the lock point and the listed columns are read;
+            # the warehouse product is the normalized drug name
+            chunks = (chunk.rename(columns={"product": "drug_name"}) for chunk in warehouse.scan(
+                "cases", columns=columns + ["product"], received_from=start if previous else None, received_to=end,
+                products=[product] if drugs else None))
+        elif case_file is not None:
+            chunks = pd.read_csv(case_file, dtype=str, keep_default_na=False, chunksize=100_000)
+        else:
+            st.warning("Upload a case table first.")
+            return
+        if drugs and source != "Case warehouse":
+            # Every spelling of the product in the cases counts, e.g. "acetaminophen 500mg" for Paracetamol
+            chunks = (chunk.assign(drug_name=drugs.canonical(chunk["suspected_drug"]).to_numpy()) for chunk in chunks)
+        # Verbatim terms that are MedDRA PTs are tabulated under their primary SOC
+        index = get_meddra_index(data_path("meddra"), data_path("meddra_index"))
+        options = {"product": product.strip() or None, "report_types": DSUR_REPORT_TYPES if report == "DSUR" else None,
+                   "soc_map": index.pt_soc_map() if index else None, "listing": io.StringIO()}
+        started = time.perf_counter()
+        try:
+            if previous:
+                interval = tabulate(chunks, start, end, **options)
+                cumulative = previous.merge(interval)
+            else:
+                interval, cumulative = tabulate_with_history(chunks, start, end, **options)
+        except ValueError as error:
+            st.error(str(error))
+            return
+        st.caption(f"Tabulated in {time.perf_counter() - started:.1f} s: {interval.n_events} events in the interval, "
+                   f"{cumulative.n_events} cumulative.")
+
+        st.write(f"Interval summary tabulation ({start} to {end})")
+        st.dataframe(interval.summary())
+        st.write(f"Cumulative summary tabulation (to {end})")
+        st.dataframe(cumulative.summary())
+        st.download_button("Download Cumulative Tabulation (JSON, for the next report)", cumulative.to_json(),
+                           file_name=f"{report}_cumulative_{end}.json", mime="application/json")
+        st.download_button("Download Interval Line Listing", options["listing"].getvalue(),
+                           file_name=f"{report}_line_listing_{start}_{end}.csv", mime="text/csv")
@@ -0,0 +1,31 @@
+"""Automation / PV Technology page."""
+import streamlit as st
+
+
+def render():
+    st.header("Automation in Pharmacovigilance")
+    tool = st.selectbox("Technology", ["AI Case Processing", "NLP Literature Screening", "Automation Bots"])
+
+    if tool == "AI Case Processing":
+        st.markdown("""
+**AI Case Processing** automates ICSR handling:
+- Extracts patient, drug, and event information automatically.
+- Classifies cases by seriousness and completeness.
+- Flags urgent or duplicate cases for review.
+**Benefits:** Faster processing, fewer errors, more time for medical review.
+""")
+    elif tool == "NLP Literature Screening":
+        st.markdown("""
+**NLP Literature Screening** helps detect adverse events in publications:
+- Screens journals, abstracts, and medical reports.
+- Highlights relevant safety signals.
+**Benefits:** Early detection of new safety issues, less manual reading.
+""")
+    elif tool == "Automation Bots":
+        st.markdown("""
+**Automation Bots** (RPA) handle repetitive tasks:
+- Download reports from portals.
+- Check drug listedness.
+- Generate routine PV reports automatically.
+**Benefits:** Saves time, improves accuracy, operates continuously.
+""")
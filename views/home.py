@@ -0,0 +1,20 @@
+"""Home page."""
+import streamlit as st
+
+
+def render():
+    st.info("This application demonstrates core pharmacovigilance functional areas aligned with global regulatory guidelines.")
+
+    st.subheader("Major PV Domains")
+    st.write("• Individual Case Safety Report (ICSR) Management")
+    st.write("• Literature Monitoring")
+    st.write("• Signal Detection and Evaluation")
+    st.write("• Periodic Safety Reports")
+    st.write("• Risk Management Plans")
+    st.write("• PV Quality Systems")
+    st.write("• Regulatory Submissions")
+    st.write("• PV Technology and Automation")
+    st.subheader("Global Guidelines")
+    st.write("Good Pharmacovigilance Practices (GVP)")
+    st.write("ICH Guidelines (E2A, E2B, E2C, E2D, E2E)")
+    st.write("CIOMS Recommendations")
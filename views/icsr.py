@@ -0,0 +1,433 @@
+"""ICSR Processing page: case entry, duplicate check, PDF/E2B export and the case store."""
+import io
+import time
+from datetime import date as Date
+
+import streamlit as st
+import pandas as pd
+
+from pvcore.case_store import get_case_store
+from pvcore.causality import ALTERNATIVE_CAUSES, WHO_UMC_CATEGORIES, assess_case
+from pvcore.config import data_path
+from pvcore.content import CASE_WORKFLOW
+from pvcore.drugs import get_drug_normalizer
+from pvcore.duplicates import DuplicateIndex, cluster_duplicates
+from pvcore.e2b import iter_e2b, read_e2b, write_e2b
+from pvcore.icsr import case_validity
+from pvcore.meddra import RECODE_COLUMNS, get_meddra_index
+from pvcore.pdf_report import cases_from_table, render_icsr_pdf, write_pdf_zip
+from views import fragment, section
+
+
+@st.cache_resource
+def case_workflow_table():
+    return pd.DataFrame(CASE_WORKFLOW.items(), columns=["Step", "Description"])
+
+
+@st.cache_resource(show_spinner="Indexing cases for duplicate check...")
+def duplicate_index(case_table_bytes):
+    index = DuplicateIndex()
+    index.add(pd.read_csv(io.BytesIO(case_table_bytes), dtype=str))
+    return index
+
+
+def meddra_index():
+    return get_meddra_index(data_path("meddra"), data_path("meddra_index"))
+
+
+# The fragment reruns with the same search text on every interaction in the tab
+@st.cache_resource(max_entries=1000)
+def meddra_suggestions(text):
+    return meddra_index().autocomplete(text)
+
+
+def case_e2b(case):
+    xml_buffer = io.BytesIO()
+    write_e2b([case], xml_buffer)
+    return xml_buffer.getvalue()
+
+
+def case_draft():
+    """The case being entered in this session, as applied so far."""
+    if "icsr_case" not in st.session_state:
+        today = Date.today()
+        st.session_state["icsr_case"] = {
+            # Empty until the first save; later saves update the same stored case
+            "case_id": "",
+            "case_received_date": today, "report_type": "Spontaneous", "country": "",
+            "seriousness": "Non Serious", "seriousness_detail": "Death",
+            "reporter_name": "", "reporter_email": "", "reporter_contact": "", "reporter_qualification": "",
+            "patient_age": None, "gender": "Unknown", "weight": 0.0, "height": 0.0, "medical_history": "",
+            "parent_case_id": "", "parent_case_status": "Open", "related_cases": "",
+            "ae_verbatim": "", "ae_meddra": "", "ae_outcome": "Recovered",
+            "suspected_drug": "", "dose": "", "route": "Oral", "start_date": today, "end_date": today, "indication": "",
+            "causality_method": "WHO-UMC", "causality_result": "Certain", "reporter_comments": "",
+            "dechallenge": "Positive", "rechallenge": "Positive", "alternative_causes": "Unknown",
+            "case_summary": "",
+        }
+    return st.session_state["icsr_case"]
+
+
+def case_record(draft):
+    case = dict(draft)
+    if case["seriousness"] != "Serious":
+        case["seriousness_detail"] = "Non Serious"
+    return case
+
+
+def _new_case():
+    st.session_state.pop("icsr_case", None)
+    # New form keys, so no tab keeps the previous case's unsubmitted input
+    st.session_state["icsr_case_no"] = st.session_state.get("icsr_case_no", 0) + 1
+
+
+def _save_case():
+    # A callback, so the case ID is on the form in the rerun the click starts
+    draft = case_draft()
+    draft["case_id"] = get_case_store(data_path("cases.db")).upsert_cases([case_record(draft)])[0]
+
+
+def _form(section):
+    return st.form(f"icsr_{section}_{st.session_state.get('icsr_case_no', 0)}")
+
+
+def _select(label, options, current):
+    return st.selectbox(label, options, index=options.index(current))
+
+
+def _apply(draft, values, section):
+    # Widgets in a form send nothing until submitted, then commit together
+    if st.form_submit_button("Apply", key=f"icsr_apply_{section}"):
+        draft.update(values)
+
+
+def drug_caption(verbatim):
+    drug = get_drug_normalizer(data_path("drug_dictionary.csv")).normalize(verbatim)
+    if not drug["drug_id"]:
+        return "Not found in the drug dictionary; counted under the name as entered."
+    return f"Drug dictionary product: {drug['drug_name']} ({drug['drug_id']}, match {drug['drug_match_score']:.0%})"
+
+
+def _term_label(term):
+    return f"{term['llt_name']} ({term['llt_code']}) - PT {term['pt']}, {term['soc']}"
+
+
+def meddra_coding(draft):
+    """Autocomplete over the MedDRA LLTs for the applied verbatim term."""
+    st.subheader("MedDRA Coding")
+    index = meddra_index()
+    if index is None:
+        st.info(f"Place the MedDRA ASCII files (llt.asc, mdhier.asc, meddra_release.asc) in {data_path('meddra')} "
+                "to enable coding.")
+        return
+    if draft["ae_meddra"].strip().isdigit() and (coded := index.lookup(draft["ae_meddra"].strip())):
+        st.caption(f"Coded: {_term_label(coded)}; HLT {coded['hlt']}, HLGT {coded['hlgt']}")
+    search = st.text_input(f"Search MedDRA {index.version or ''} LLTs", draft["ae_verbatim"])
+    suggestions = meddra_suggestions(search.strip()) if search.strip() else pd.DataFrame()
+    if suggestions.empty:
+        st.caption("No matching terms." if search.strip() else "Type a term to search.")
+        return
+    choice = st.selectbox("Suggested terms", suggestions.index, format_func=lambda i: _term_label(suggestions.loc[i]))
+    # Applied from a callback so the form above already shows the code on this rerun
+    st.button("Use This Code", key="icsr_use_code", on_click=draft.update,
+              args=({"ae_meddra": str(suggestions.loc[choice, "llt_code"])},))
+
+
+@fragment
+def case_entry():
+    """The ICSR tabs; submitting a tab reruns only this fragment, not the whole page."""
+    tabs = st.tabs([
+        "General", "Reporter", "Patient", "Parent Case", "Adverse Event",
+        "Suspected Drug", "Causality", "Analysis", "Reporting"
+    ])
+    draft = case_draft()
+
+    # General Tab
+    with tabs[0], _form("general"):
+        st.header("General Case Information")
+        values = {
+            "case_received_date": st.date_input("Case Received Date", draft["case_received_date"]),
+            "report_type": _select("Report Type", ["Spontaneous", "Clinical Trial", "Literature", "Other"], draft["report_type"]),
+            "country": st.text_input("Country", draft["country"]),
+            "seriousness": _select("Seriousness", ["Non Serious", "Serious"], draft["seriousness"]),
+            "seriousness_detail": _select(
+                "Seriousness Criteria (serious cases only)",
+                ["Death", "Life Threatening", "Inpatient Hospitalization", "Disability", "Congenital Anomaly", "Medically Significant"],
+                draft["seriousness_detail"],
+            ),
+        }
+        _apply(draft, values, "general")
+
+    # Reporter Tab
+    with tabs[1], _form("reporter"):
+        st.header("Reporter Information")
+        values = {
+            "reporter_name": st.text_input("Reporter Name", draft["reporter_name"]),
+            "reporter_email": st.text_input("Reporter Email", draft["reporter_email"]),
+            "reporter_contact": st.text_input("Reporter Contact Number", draft["reporter_contact"]),
+            "reporter_qualification": st.text_input("Reporter Qualification", draft["reporter_qualification"]),
+        }
+        _apply(draft, values, "reporter")
+
+    # Patient Tab
+    with tabs[2], _form("patient"):
+        st.header("Patient Information")
+        values = {
+            "patient_age": st.number_input("Patient Age", 0, 120, draft["patient_age"]),
+            "gender": _select("Gender", ["Male", "Female", "Other", "Unknown"], draft["gender"]),
+            "weight": st.number_input("Weight (kg)", 0.0, 300.0, draft["weight"]),
+            "height": st.number_input("Height (cm)", 0.0, 250.0, draft["height"]),
+            "medical_history": st.text_area("Relevant Medical History", draft["medical_history"]),
+        }
+        _apply(draft, values, "patient")
+
+    # Parent Case Tab
+    with tabs[3], _form("parent_case"):
+        st.header("Parent Case Information")
+        values = {
+            "parent_case_id": st.text_input("Parent Case ID", draft["parent_case_id"]),
+            "parent_case_status": _select("Parent Case Status", ["Open", "Closed", "Ongoing"], draft["parent_case_status"]),
+            "related_cases": st.text_area("Related Cases", draft["related_cases"]),
+        }
+        _apply(draft, values, "parent_case")
+
+    # Adverse Event Tab
+    with tabs[4]:
+        with _form("adverse_event"):
+            st.header("Adverse Event Information")
+            values = {
+                "ae_verbatim": st.text_area("Adverse Event - Verbatim", draft["ae_verbatim"]),
+                "ae_meddra": st.text_area("Adverse Event - MedDRA Code", draft["ae_meddra"]),
+                "ae_outcome": _select("Outcome", ["Recovered", "Recovering", "Not Recovered", "Fatal", "Unknown"], draft["ae_outcome"]),
+            }
+            _apply(draft, values, "adverse_event")
+        meddra_coding(draft)
+
+    # Suspected Drug Tab
+    with tabs[5]:
+        with _form("suspected_drug"):
+            st.header("Suspected Drug Information")
+            values = {
+                "suspected_drug": st.text_input("Drug Name", draft["suspected_drug"]),
+                "dose": st.text_input("Dose", draft["dose"]),
+                "route": _select("Route of Administration", ["Oral", "IV", "IM", "Subcutaneous", "Other"], draft["route"]),
+                "start_date": st.date_input("Start Date", draft["start_date"]),
+                "end_date": st.date_input("End Date", draft["end_date"]),
+                "indication": st.text_area("Indication / Reason for Use", draft["indication"]),
+            }
+            _apply(draft, values, "suspected_drug")
+        if draft["suspected_drug"].strip():
+            st.caption(drug_caption(draft["suspected_drug"]))
+
+    # Causality Tab
+    with tabs[6]:
+        with _form("causality"):
+            st.header("Causality Assessment")
+            values = {
+                "causality_method": _select("Causality Assessment Method", ["WHO-UMC", "Naranjo", "Other"], draft["causality_method"]),
+                "causality_result": _select("Assessment Result", WHO_UMC_CATEGORIES, draft["causality_result"]),
+                "reporter_comments": st.text_area("Reporter Comments", draft["reporter_comments"]),
+                "dechallenge": _select("Dechallenge", ["Positive", "Negative", "Not Applicable"], draft["dechallenge"]),
+                "rechallenge": _select("Rechallenge", ["Positive", "Negative", "Not Applicable"], draft["rechallenge"]),
+                "alternative_causes": _select("Alternative Causes (disease or other drugs)", ALTERNATIVE_CAUSES,
+                                              draft.get("alternative_causes", "Unknown")),
+            }
+            _apply(draft, values, "causality")
+        suggestion = assess_case(draft)
+        st.caption(f"Suggested from the case fields: WHO-UMC **{suggestion['who_umc_category']}**, Naranjo score "
+                   f"{suggestion['naranjo_score']} (**{suggestion['naranjo_category']}**); temporal relation "
+                   f"{suggestion['temporal_relation']}.")
+        st.button("Use Suggested WHO-UMC Category", key="icsr_use_who_umc", on_click=draft.update,
+                  args=({"causality_method": "WHO-UMC", "causality_result": suggestion["who_umc_category"]},))
+
+    # Analysis Tab
+    with tabs[7], _form("analysis"):
+        st.header("Narrative and Analysis")
+        values = {"case_summary": st.text_area("Case Summary", draft["case_summary"])}
+        _apply(draft, values, "analysis")
+
+    # Reporting Tab
+    with tabs[8]:
+        st.header("Submit Case")
+        st.caption(f"Case ID: {draft['case_id']}" if draft["case_id"] else "Not saved yet; saving assigns a case ID.")
+        case = case_record(draft)
+        validity = case_validity(pd.DataFrame([case])).iloc[0]
+        if not validity["valid"]:
+            st.warning(f"Not a valid ICSR yet. Missing: {validity['missing_criteria']}.")
+        st.button("Start New Case", key="icsr_new_case", on_click=_new_case)
+        st.subheader("Duplicate Check")
+        existing_cases = st.file_uploader("Existing cases (CSV, one row per case)", type=["csv"], key="duplicate_cases")
+        if existing_cases is not None:
+            if st.button("Check This Case for Duplicates", key="icsr_check_duplicates"):
+                matches = duplicate_index(existing_cases.getvalue()).query(pd.DataFrame([case]))
+                if matches.empty:
+                    st.success("No potential duplicates found. Case is unique.")
+                else:
+                    st.warning(f"{len(matches)} potential duplicate(s) found.")
+                    st.dataframe(matches[["duplicate_of", "score"]])
+            if st.button("Cluster All Uploaded Cases", key="icsr_cluster"):
+                clustered = cluster_duplicates(pd.read_csv(existing_cases, dtype=str))
+                groups = clustered[clustered["group_size"] > 1].sort_values("duplicate_group", kind="stable")
+                st.write(f"{groups['duplicate_group'].nunique()} duplicate groups covering {len(groups)} cases.")
+                st.dataframe(groups.head(1000))
+                st.download_button("Download Duplicate Groups", clustered.to_csv(index=False), file_name="duplicate_groups.csv", mime="text/csv")
+
+        if st.button("Save Case", key="icsr_save", on_click=_save_case):
+            st.success(f"Case saved as {draft['case_id']}.")
+
+        if st.button("Generate PDF", key="icsr_pdf"):
+            # Rendered in memory so concurrent sessions never share a file on disk
+            st.download_button("Download PDF", render_icsr_pdf(case), file_name="ICSR_CDSCO_Report.pdf", mime="application/pdf")
+            st.success("PDF generated successfully!")
+
+        st.subheader("Batch PDF Export")
+        case_table = st.file_uploader("Case table (CSV, one row per case, columns named like the fields above)", type=["csv"])
+        if case_table is not None and st.button("Generate PDF Batch", key="icsr_pdf_batch"):
+            cases = cases_from_table(pd.read_csv(case_table, dtype=str))
+            zip_buffer = io.BytesIO()
+            started = time.perf_counter()
+            written = write_pdf_zip(cases, zip_buffer)
+            elapsed = time.perf_counter() - started
+            st.download_button("Download ZIP", zip_buffer.getvalue(), file_name="ICSR_Reports.zip", mime="application/zip")
+            st.success(f"{written} PDFs generated in {elapsed:.1f} s ({written / max(elapsed, 1e-9):.0f} PDFs/sec).")
+        if case_table is not None and st.button("Generate E2B(R3) Batch", key="icsr_e2b_batch"):
+            xml_buffer = io.BytesIO()
+            written = write_e2b(cases_from_table(pd.read_csv(case_table, dtype=str)), xml_buffer)
+            st.download_button("Download E2B(R3) XML", xml_buffer.getvalue(), file_name="ICSR_E2B_R3.xml", mime="application/xml")
+            st.success(f"{written} ICSRs written to one E2B(R3) batch.")
+
+        st.subheader("E2B(R3) Exchange")
+        # Generated only when the button is clicked, not on every rerun
+        st.download_button("Download This Case as E2B(R3) XML", lambda: case_e2b(case), file_name="ICSR_E2B_R3.xml", mime="application/xml")
+        e2b_file = st.file_uploader("Import E2B(R3) XML", type=["xml"])
+        if e2b_file is not None and st.button("Import ICSRs", key="icsr_import_e2b"):
+            started = time.perf_counter()
+            frames = list(read_e2b(e2b_file))
+            imported = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+            elapsed = time.perf_counter() - started
+            st.success(f"{len(imported)} ICSRs imported in {elapsed:.1f} s.")
+            st.dataframe(imported.head(1000))
+            st.download_button("Download Imported Cases (CSV)", imported.to_csv(index=False), file_name="imported_icsrs.csv", mime="text/csv")
+
+
+def render():
+    url = "https://www.ema.europa.eu/en/documents/regulatory-procedural-guideline/guideline-good-pharmacovigilance-practices-gvp-module-vi-collection-management-submission-reports-suspected-adverse-reactions-medicinal-products-rev-2_en.pdf"
+    st.markdown(f"[📄 Guideline GVP Module VI (PDF)]({url})")
+
+    # Display introductory text
+    st.text(
+        "📊 ICSR management is a fundamental activity of pharmacovigilance\n\n"
+        "✨ ICSR = identifiable reporter, an identifiable patient, a suspect product, and an adverse event. "
+        "Without all four, it’s a non-valid case."
+    )
+
+    # Display workflow as a table
+    st.table(case_workflow_table())
+
+    st.text(
+    """
+Validated safety systems help capture, manage, and evaluate safety cases in alignment with Good Pharmacovigilance Practices (GVP) from the European Medicines Agency.
+
+Common pharmacovigilance platforms include:
+
+• Oracle Argus Safety
+• ARISg
+• Veeva Vault Safety
+• LifeSphere MultiVigilance
+• Clinevo Safety etc...
+
+These systems support structured workflows such as case intake, triage, data entry, medical review, quality control, and regulatory reporting.
+
+📈 Where Safety Information Comes From
+
+1️⃣ ***Clinical Development ***
+
+During clinical trials, safety is monitored closely according to guidelines from the International Council for Harmonisation.
+
+• SAE (Serious Adverse Event)
+Events that result in death, hospitalization, disability, life-threatening situations, or other medically important conditions.
+
+• SUSAR (Suspected Unexpected Serious Adverse Reaction)
+Serious reactions that are unexpected based on the Investigator’s Brochure or product information.
+
+These findings contribute to annual submissions such as the Development Safety Update Report (DSUR).
+
+2️⃣ ***Post-Marketing Surveillance***
+Once medicines reach the market, safety monitoring expands to real-world sources.
+
+✨Solicited sources (organized programs)
+
+• Patient Support Programs
+• Disease registries
+• Post-Authorization Safety Studies (PASS)
+• Non-interventional studies
+• Compassionate use programs
+• Named patient programs
+
+✨Unsolicited sources (spontaneous reporting)
+
+• Healthcare professional reports
+• Consumer or patient reports
+• Medical information contacts
+• Health authority communications
+• Scientific and medical literature
+• Social media monitoring
+"""
+    )
+
+    st.title("ICSR Processing Model Dashboard")
+
+    case_entry()
+
+    section("Case Store")
+    st.subheader("Case Store")
+    case_store = get_case_store(data_path("cases.db"))
+    lookup_id = st.text_input("Look up Case ID")
+    if lookup_id:
+        stored = case_store.get_case(lookup_id.strip())
+        if stored:
+            st.json(stored)
+        else:
+            st.warning("No case with this ID.")
+
+    filter_cols = st.columns(5)
+    filter_drug = filter_cols[0].text_input("Filter: Drug")
+    filter_meddra = filter_cols[1].text_input("Filter: MedDRA Code")
+    filter_country = filter_cols[2].text_input("Filter: Country")
+    filter_seriousness = filter_cols[3].selectbox("Filter: Seriousness", ["", "Serious", "Non Serious"])
+    filter_received = filter_cols[4].date_input("Filter: Received Between", value=(), format="YYYY-MM-DD")
+    received_from, received_to = (list(filter_received) + [None, None])[:2]
+    st.dataframe(case_store.list_cases(
+        columns=["case_id", "case_received_date", "suspected_drug", "ae_verbatim", "ae_meddra", "seriousness", "country", "status"],
+        limit=200, received_from=received_from, received_to=received_to,
+        suspected_drug=filter_drug.strip(), ae_meddra=filter_meddra.strip(), country=filter_country.strip(), seriousness=filter_seriousness,
+    ))
+
+    bulk_file = st.file_uploader("Bulk import into the case store (CSV case table or E2B(R3) XML)", type=["csv", "xml"])
+    if bulk_file is not None and st.button("Import Into Case Store"):
+        started = time.perf_counter()
+        if bulk_file.name.lower().endswith(".xml"):
+            imported_ids = case_store.upsert_cases(iter_e2b(bulk_file))
+        else:
+            imported_ids = []
+            for chunk in pd.read_csv(bulk_file, dtype=str, chunksize=50_000):
+                imported_ids += case_store.upsert_cases(chunk)
+        st.success(f"{len(imported_ids)} cases stored in {time.perf_counter() - started:.1f} s.")
+
+    section("Bulk MedDRA Recoding")
+    st.subheader("Bulk MedDRA Recoding")
+    recode_file = st.file_uploader("Cases to code (CSV with an ae_verbatim column)", type=["csv"])
+    if recode_file is not None and st.button("Recode Verbatim Terms"):
+        index = meddra_index()
+        if index is None:
+            st.warning(f"No MedDRA files in {data_path('meddra')}.")
+            return
+        cases = pd.read_csv(recode_file, dtype=str, keep_default_na=False)
+        started = time.perf_counter()
+        coded = index.recode(cases["ae_verbatim"])
+        cases = cases.drop(columns=RECODE_COLUMNS, errors="ignore").join(coded)
+        uncoded = int((coded["llt_code"] == 0).sum())
+        st.success(f"{len(cases) - uncoded} of {len(cases)} cases coded in {time.perf_counter() - started:.1f} s; "
+                   f"{uncoded} left for manual coding.")
+        st.dataframe(cases[coded["llt_code"] == 0].head(200))
+        st.download_button("Download Coded Cases", cases.to_csv(index=False), file_name="coded_cases.csv", mime="text/csv")
@@ -0,0 +1,184 @@
+"""Literature Monitoring page."""
+import time
+from pathlib import Path
+
+import streamlit as st
+import pandas as pd
+
+from pvcore.config import data_path
+from pvcore.drugs import get_drug_normalizer
+from pvcore.literature import LISTED, LISTED_ADVERSE_EVENTS, NOT_MARKETED, ListednessIndex, screen_article, screen_articles
+from pvcore.meddra import get_meddra_index
+from pvcore.medline import LiteratureIndex, corpus_terms, get_literature_index, medline_sources, terms_fingerprint
+from pvcore.synthetic import EVENTS, medline_files
+from views import section
+
+
+@st.cache_resource
+def listed_events_table():
+    return pd.DataFrame(LISTED_ADVERSE_EVENTS, columns=["Listed Adverse Events"])
+
+
+@st.cache_resource
+def default_listedness():
+    return ListednessIndex()
+
+
+def vocabulary_stamps():
+    # The MedDRA source files and the drug dictionary mtime the corpus vocabularies follow
+    meddra = get_meddra_index(data_path("meddra"), data_path("meddra_index"))
+    dictionary = Path(data_path("drug_dictionary.csv"))
+    return (meddra.meta["sources"] if meddra is not None else None,
+            dictionary.stat().st_mtime_ns if dictionary.exists() else None)
+
+
+# Normalizing every LLT and hashing the vocabularies takes ~0.4 s, so it is done once per MedDRA release and
+# dictionary version rather than on every rerun
+@st.cache_resource(max_entries=2)
+def corpus_vocabularies(meddra_sources, dictionary_mtime):
+    """drug_terms, event_terms and their terms_fingerprint; without MedDRA, the demo events stand in for reactions."""
+    meddra = get_meddra_index(data_path("meddra"), data_path("meddra_index"))
+    drug_terms, event_terms = corpus_terms(get_drug_normalizer(data_path("drug_dictionary.csv")), meddra, EVENTS)
+    return drug_terms, event_terms, terms_fingerprint(drug_terms, event_terms)
+
+
+def render():
+    st.header("Literature Monitoring")
+    url = "https://www.ema.europa.eu/en/documents/regulatory-procedural-guideline/guideline-good-pharmacovigilance-practices-gvp-module-vi-collection-management-submission-reports-suspected-adverse-reactions-medicinal-products-rev-2_en.pdf"
+    st.markdown(f"[📄 Guideline GVP Module VI (PDF)-Literature Screening]({url})")
+    st.info(
+        "The medical literature is a significant source of information for the monitoring of the safety profile and of the risk-benefit balance of medicinal products, particularly in relation to the detection of new safety signals or emerging safety issues. Marketing authorisation holders are therefore expected to maintain awareness of possible publications through a systematic literature review of widely used reference databases (e.g. Medline, Excerpta Medica or Embase) no less frequently than once a week."
+        " Reports of suspected adverse reactions from the medical literature, including relevant published abstracts from meetings and draft manuscripts, should be reviewed and assessed by marketing authorisation holders to identify and record ICSRs."
+        " If multiple medicinal products are mentioned in the publication, only those which are identified by the publication's author(s) as having at least a possible causal relationship with the suspected adverse reaction should be considered for literature review by the concerned marketing authorisation holder(s)."
+    )
+
+    # Example list of listed adverse events
+    st.title("Literature Monitoring Model Dashboard")
+    listedness = default_listedness()
+    st.write ("Example listed adverse events for the drug (for screening purposes):")
+    st.table(listed_events_table())
+    st.write("If you write an adverse reaction that is not in the listed adverse events, it will be flagged as potential safety information.")
+    # Choose data type
+    data_type = st.selectbox(
+        "Choose single patient or aggregate data for literature screening", 
+        ["Single Patient", "Aggregate Data"]
+    )
+
+    # Only show the instructions if nothing is selected yet
+    if not data_type:
+        st.write("Choose single patient or aggregate data for literature screening")
+
+    # Inputs common to both
+    PMID = st.text_input("PMID")
+    if PMID:
+        st.markdown(f"🔗 [View Article on PubMed](https://pubmed.ncbi.nlm.nih.gov/{PMID}/)")
+    article_title = st.text_input("Article Title")
+    drug = st.text_input("Drug")
+    drugs = get_drug_normalizer(data_path("drug_dictionary.csv"))
+    if drug.strip():
+        resolved = drugs.normalize(drug)
+        st.caption(f"Product: {resolved['drug_name']} ({resolved['drug_id']})" if resolved["drug_id"]
+                   else "Product not found in the drug dictionary.")
+    reaction = st.text_input("Adverse Reaction")
+    
+    # Inputs specific to Single Patient
+    reporter_name = patient_identifier = ""
+    MAH_marketing = "Yes"
+    if data_type == "Single Patient":
+        reporter_name = st.text_input("Primary Reporter Name")
+        Country_name = st.text_input("Country of Reporter")
+        patient_identifier = st.text_input("Patient Identifier")
+        MAH_marketing = st.selectbox(
+            "Did MAH market the drug in the reporter's country?", 
+            ["Yes", "No"]
+        )
+
+    if st.button("Screen Article"):
+        is_icsr, finding = screen_article(listedness, data_type, drug, reaction, reporter_name, patient_identifier, MAH_marketing)
+        if is_icsr:
+            st.success("This qualifies as an ICSR.")
+        if finding in (LISTED, NOT_MARKETED):
+            st.info(finding)
+        else:
+            st.warning(finding)
+
+    # Bulk screening of an exported search result
+    section("Bulk Literature Screening")
+    st.subheader("Bulk Literature Screening")
+    st.write("Upload a CSV/TSV with PMID, Title, Drug, Reaction, Reporter and Patient Identifier columns "
+             "(optional: MAH Marketed, Data Type). Each row is screened with the same rules as above.")
+    article_file = st.file_uploader("Article file", type=["csv", "tsv", "txt"])
+    label_file = st.file_uploader("Product labels (optional CSV with drug, event columns)", type=["csv"])
+    if article_file is not None and st.button("Screen File"):
+        if label_file is not None:
+            labels = pd.read_csv(label_file, dtype=str)
+            labels["drug"] = drugs.canonical(labels["drug"])
+            listedness = ListednessIndex.from_table(labels)
+        progress = st.empty()
+        chunks = []
+        started = time.perf_counter()
+        for chunk in screen_articles(article_file, listedness, data_type, drugs=drugs):
+            chunks.append(chunk)
+            progress.caption(f"{sum(map(len, chunks))} articles screened...")
+        elapsed = time.perf_counter() - started
+        triage = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        progress.caption(f"{len(triage)} articles screened in {elapsed:.2f} s ({len(triage) / max(elapsed, 1e-9):,.0f} rows/sec).")
+        if not triage.empty:
+            st.dataframe(triage["finding"].value_counts().rename_axis("Finding").reset_index(name="Articles"))
+            st.dataframe(triage.head(1000))
+            st.download_button("Download Triage Table", triage.to_csv(index=False), file_name="literature_triage.csv", mime="text/csv")
+
+    # Co-mention search over a local MEDLINE copy
+    section("Literature Corpus Search")
+    st.subheader("Literature Corpus Search")
+    st.write("Weekly screening of a local MEDLINE/PubMed copy: articles since a date that mention one of the products "
+             "together with a reaction, by default only reactions not on its label. Put the baseline and update XML "
+             "files (.xml or .xml.gz) in the data directory's medline folder and build the index here, or nightly "
+             "with `python -m pvcore medline <folder> <data directory>`.")
+    sources = medline_sources(data_path("medline"))
+    drug_terms, event_terms, terms = corpus_vocabularies(*vocabulary_stamps())
+    corpus = get_literature_index(data_path("literature_index"))
+    if st.button("Rebuild Index" if corpus is not None else "Build Index"):
+        if not sources:
+            st.caption("No MEDLINE files found; indexing a demo corpus of 20,000 synthetic abstracts.")
+            medline_files(data_path("medline"), 20_000, files=2)
+            sources = medline_sources(data_path("medline"))
+        progress = st.empty()
+        LiteratureIndex.build(sources, data_path("literature_index"), drug_terms, event_terms,
+                              on_progress=lambda n, seconds: progress.caption(
+                                  f"{n:,} articles indexed ({n / max(seconds, 1e-9):,.0f}/sec)..."))
+        progress.empty()
+        corpus = get_literature_index(data_path("literature_index"))
+    if corpus is None:
+        st.info("No literature index yet.")
+        return
+    summary = corpus.summary()
+    st.dataframe(pd.DataFrame([summary]), hide_index=True)
+    if not LiteratureIndex.is_current(data_path("literature_index"), sources, terms):
+        st.caption("The MEDLINE files or the drug/MedDRA dictionaries changed since the index was built; rebuild to "
+                   "include the changes.")
+
+    products = st.multiselect("Products", corpus.meta["drug_names"], default=corpus.meta["drug_names"][:1])
+    last = pd.Timestamp(summary["last date"] or "today")
+    since = st.date_input("Articles since", value=(last - pd.Timedelta(days=7)).date())
+    words = st.text_input("Also containing all of these words (optional)")
+    unlisted_only = st.checkbox("Only reactions not listed for the product", value=True)
+    st.caption("Listedness follows the product labels uploaded above, else the example listed events.")
+    if products and st.button("Search Corpus"):
+        if label_file is not None:
+            label_file.seek(0)
+            labels = pd.read_csv(label_file, dtype=str)
+            labels["drug"] = drugs.canonical(labels["drug"])
+            listedness = ListednessIndex.from_table(labels)
+        started = time.perf_counter()
+        found = corpus.co_mentions(products, listedness, since=since, words=words.split(), unlisted_only=unlisted_only)
+        elapsed = time.perf_counter() - started
+        st.caption(f"{found['pmid'].nunique()} articles, {len(found)} product-reaction mentions in "
+                   f"{elapsed * 1000:.1f} ms across {len(corpus):,} articles.")
+        if not found.empty:
+            st.dataframe(found.groupby(["product", "event"]).size().rename("Articles").reset_index()
+                         .sort_values("Articles", ascending=False), hide_index=True)
+            st.dataframe(found.assign(link="https://pubmed.ncbi.nlm.nih.gov/" + found["pmid"].astype(str) + "/"),
+                         column_config={"link": st.column_config.LinkColumn("PubMed")}, hide_index=True)
+            st.download_button("Download Co-mentions", found.to_csv(index=False),
+                               file_name="literature_co_mentions.csv", mime="text/csv")
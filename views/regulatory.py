@@ -0,0 +1,179 @@
+"""Regulatory Reporting / Submissions page."""
+import io
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from pvcore.case_store import get_case_store
+from pvcore.compliance import CLOCK_STATUSES, DueBuckets, at_risk, clock, load_holidays
+from pvcore.config import data_path
+from pvcore.content import AUTHORITY_DETAILS
+from pvcore.e2b import write_e2b
+from pvcore.gateway import start_gateway_thread
+from pvcore.obligations import CASE_COLUMNS, ObligationRules
+from pvcore.submission import Submission, SubmissionLog, idempotency_key, submissions_table, submit
+from views import fragment, section
+
+
+@st.cache_resource
+def gateway_url():
+    """PV_GATEWAY_URL, or a local stand-in gateway started once per process."""
+    return os.environ.get("PV_GATEWAY_URL") or start_gateway_thread()[1]
+
+
+@st.cache_resource
+def submission_log():
+    return SubmissionLog(data_path("submissions.db"))
+
+
+@st.cache_resource
+def reporting_rules():
+    """Rules from reporting_rules.csv in the data directory if present, else the built-in ones."""
+    path = data_path("reporting_rules.csv")
+    return ObligationRules.from_csv(path) if path.exists() else ObligationRules()
+
+
+def case_messages(cases, authority):
+    for case in cases.to_dict("records"):
+        message = io.BytesIO()
+        write_e2b([case], message)
+        # Keyed on the case fields, as the message carries its creation time
+        yield Submission(case["case_id"], authority, message.getvalue(), idempotency_key(authority, case["case_id"], case))
+
+
+def start_clock(obligations):
+    """Compliance clock of the obligations not yet acknowledged, kept in the session with its per-day buckets."""
+    table = clock(obligations, holidays=load_holidays(data_path("holidays.csv")),
+                  completed=submission_log().acknowledged_cases())
+    st.session_state["compliance"] = table, DueBuckets.build(table, obligations.authorities)
+
+
+@fragment
+def compliance_dashboard(table, buckets):
+    """Compliance clock totals from the per-day buckets; changing the date reruns only this fragment."""
+    cols = st.columns(2)
+    as_of = cols[0].date_input("As of", date.today(), key="clock_as_of")
+    due_soon = cols[1].slider("Due soon within (days)", 0, 14, 3, key="clock_due_soon")
+    totals = buckets.totals(as_of, due_soon)
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Open obligations", f"{len(table):,}")
+    for col, status in zip(metric_cols[1:], CLOCK_STATUSES):
+        col.metric(status, f"{totals[status].sum():,}")
+    st.dataframe(totals, hide_index=True)
+    st.markdown("**Due per day, next 30 days**")
+    st.bar_chart(buckets.per_day(as_of, 30))
+    st.markdown("**Overdue and due soon**")
+    st.dataframe(at_risk(table, as_of, due_soon), hide_index=True)
+
+
+def render():
+    st.header("📄 Regulatory Safety Reporting")
+    st.subheader("Overview")
+    st.markdown("""
+Regulatory safety reporting is a **core pharmacovigilance activity**. It ensures that adverse events and safety data are reported to health authorities in compliance with regulations to **protect patient safety**.  
+
+Key points:
+- Compliance with global regulations.
+- Enables signal detection and risk management.
+- Protects public health and ensures ongoing monitoring of drugs.
+""")
+
+    authority = st.selectbox(
+        "Select Regulatory Authority", list(AUTHORITY_DETAILS),
+        format_func=lambda key: f"{key} ({AUTHORITY_DETAILS[key]['Region']})",
+    )
+
+    if authority:
+        st.markdown("### Authority Details:")
+        st.markdown("\n".join(f"- **{label}:** {text}" for label, text in AUTHORITY_DETAILS[authority].items()
+                               if label != "Region"))
+        rules = reporting_rules().rules
+        with st.expander(f"Expedited reporting rules for {authority}"):
+            st.dataframe(rules[rules["authority"] == authority].drop(columns="authority"), hide_index=True)
+
+    section("Reporting Obligations")
+    st.subheader("Reporting Obligations")
+    st.caption("Which cases must be reported to which authority, and by when, under the reporting rules. "
+               "Expectedness is read from an expectedness column, or else from the reference label listings.")
+    uploaded = st.file_uploader("Case table (CSV); leave empty to evaluate the open cases in the case store",
+                                type="csv", key="obligation_cases")
+    if st.button("Evaluate Obligations"):
+        if uploaded is not None:
+            cases = pd.read_csv(uploaded, dtype=str, keep_default_na=False)
+        else:
+            chunks = get_case_store(data_path("cases.db")).iter_cases(columns=CASE_COLUMNS, status="Open")
+            cases = pd.concat(chunks, ignore_index=True)
+        missing = [column for column in CASE_COLUMNS if column not in cases]
+        if cases.empty:
+            st.warning("No cases to evaluate.")
+        elif missing:
+            st.error(f"The case table is missing columns: {', '.join(missing)}")
+        else:
+            st.session_state["obligations"] = reporting_rules().evaluate(cases)
+            start_clock(st.session_state["obligations"])
+    obligations = st.session_state.get("obligations")
+    if obligations is not None:
+        st.dataframe(obligations.summary(), hide_index=True)
+        due = obligations.table(authority)
+        st.markdown(f"**{len(due):,} reports due to {authority}**")
+        st.dataframe(due.sort_values("due_date").head(1000), hide_index=True)
+        st.download_button("Download Obligations", lambda: obligations.table().to_csv(index=False), "obligations.csv",
+                           "text/csv")
+
+    section("Compliance Clock")
+    st.subheader("Compliance Clock")
+    st.caption("Day 0 is the case received date. Deadlines falling on a weekend, or on a holiday in holidays.csv "
+               "(authority, date) in the data directory, move to the next working day. Cases already acknowledged "
+               "by an authority are not counted.")
+    if "compliance" in st.session_state:
+        compliance_dashboard(*st.session_state["compliance"])
+    else:
+        st.info("Evaluate obligations above to start the compliance clock.")
+
+    section("Submit ICSRs")
+    st.subheader("Submit ICSRs")
+    url = gateway_url()
+    if not os.environ.get("PV_GATEWAY_URL"):
+        st.caption(f"Submitting to a local stand-in gateway at {url}. No data leaves this machine.")
+    n_cases = st.number_input("Cases to submit (newest in the case store)", 1, 100_000, 100)
+    only_reportable = st.checkbox(f"Only cases reportable to {authority}", value=obligations is not None,
+                                  disabled=obligations is None, help="Evaluate obligations above first.")
+    if st.button("Prepare Submission"):
+        cases = get_case_store(data_path("cases.db")).list_cases(limit=n_cases)
+        if only_reportable and obligations is not None:
+            cases = cases[cases["case_id"].isin(obligations.table(authority)["case_id"])]
+        if cases.empty:
+            st.warning("No cases to submit. Save or import cases on the ICSR Processing page first.")
+        else:
+            progress = st.progress(0.0, text="Submitting...")
+            submissions, summary = submit(url, case_messages(cases, authority), submission_log(),
+                                          on_progress=lambda done, total: progress.progress(done / total))
+            progress.empty()
+            if obligations is not None:
+                start_clock(obligations)
+            results = submissions_table(submissions)
+            st.success(f"✅ {summary.get('Acknowledged', 0)} acknowledged by {authority}; "
+                       f"{summary.get('Skipped', 0)} already acknowledged earlier.")
+            metric_cols = st.columns(4)
+            metric_cols[0].metric("Submissions/sec", summary["submissions_per_sec"])
+            metric_cols[1].metric("Retries", summary["retries"])
+            metric_cols[2].metric("Latency p95 (ms)", summary["latency_p95_ms"])
+            metric_cols[3].metric("Peak queue depth", summary["queue_depth_max"])
+            failed = results[results["status"].isin(["Rejected", "Failed"])]
+            if not failed.empty:
+                st.warning(f"{len(failed)} submissions were rejected or failed.")
+                st.dataframe(failed)
+    with st.expander("Submission log"):
+        st.dataframe(submission_log().history())
+
+    st.markdown("""
+### Typical Submission Steps:
+1. Case collection and validation.
+2. Aggregate report preparation (if applicable, e.g., PBRER or PADER).
+3. Review by Quality/Medical team.
+4. Prepare regulatory submission package.
+5. Submit via the respective authority portal.
+6. Track acknowledgement and follow-up.
+""")
@@ -0,0 +1,134 @@
+"""Risk Management page."""
+import streamlit as st
+
+
+def render():
+    st.header("Risk Management Plan")
+    url = "https://www.ema.europa.eu/en/documents/scientific-guideline/guideline-good-pharmacovigilance-practices-module-v-risk-management-systems-rev-2_en.pdf"
+    st.markdown(f"[📄 Guideline GVP Module V (PDF)]({url})")
+
+    st.markdown("""
+1. Signal Detection
+
+A signal is any information suggesting a potential causal association between a medicinal product and an adverse event. Signals can originate from:
+
+- Spontaneous adverse event reports
+- Clinical trials
+- Literature reports
+- Epidemiological studies
+
+Purpose: Identify new safety concerns or new aspects of known adverse events.
+
+Example: Reports of liver injury in patients taking Drug A.
+
+2. Signal Validation
+
+Once a signal is detected, it must be validated to confirm whether it represents a real safety concern:
+
+- Qualitative evaluation: Reviewing individual case narratives for medical plausibility.
+- Quantitative evaluation: Using statistical methods like disproportionality analysis (e.g., Reporting Odds Ratio) to detect unusual patterns.
+
+Outcome: Determination of whether the signal is clinically relevant and warrants further action.
+
+3. Risk Identification
+
+Validated signals are translated into risks for inclusion in the Risk Management Plan (RMP).
+
+- Identified Risk: A safety concern confirmed to be causally related to the drug.
+- Potential Risk: A plausible risk that is suspected but not confirmed.
+- Missing Information: Gaps in knowledge about certain populations, dosing, or long-term effects.
+
+Example: Signal of liver injury → Identified risk: hepatotoxicity associated with Drug A.
+
+4. Risk Characterization
+
+Each risk is described in terms of:
+
+- Nature: Type of adverse event (e.g., liver toxicity).
+- Frequency: How often it occurs (common, rare, very rare).
+- Severity: Mild, moderate, severe, or life-threatening.
+- Outcome: Reversible, irreversible, fatal.
+
+This ensures the risk is clearly understood and can guide appropriate management.
+
+5. Risk Minimization
+
+GVP emphasizes proactive measures to reduce the probability or impact of identified risks:
+
+- Routine measures:
+  - Product labeling
+  - Package inserts for patients
+  - Guidance for healthcare professionals
+- Additional measures (if needed):
+  - Restricted distribution
+  - Controlled use programs
+  - Special patient monitoring or registries
+
+Purpose: Protect patient safety and ensure the safe use of the drug in clinical practice.
+
+6. Risk Management Plan (RMP)
+
+An RMP is a structured document submitted to regulatory authorities, describing:
+
+- Identified risks
+- Potential risks
+- Missing information
+- Planned pharmacovigilance activities
+- Risk minimization strategies
+
+It is continuously updated throughout the product’s lifecycle to reflect new safety information.
+
+7. Signal-to-Risk Workflow (Summary)
+
+- Signal detection: New safety concern identified.
+- Signal validation: Confirm clinical relevance using qualitative and quantitative methods.
+- Risk identification: Transform validated signals into risks (identified, potential, or missing info).
+- Risk characterization: Describe nature, frequency, severity, and outcome.
+- Risk minimization planning: Implement routine and additional measures.
+- Documentation in RMP: Communicate and track safety measures over the product lifecycle.
+""")
+
+    # --- Inputs ---
+    source_signal = st.selectbox(
+        "Source Signal (from Signal Detection)", 
+        ["Drug A - Liver Injury", "Drug B - Rash", "Drug C - Headache"]
+    )
+
+    risk = st.text_input("Risk what we found (e.g., hepatotoxicity, dermatological reaction, etc.)")
+    risk_category = st.selectbox(
+        "Risk Category",
+        ["Identified Risk", "Potential Risk", "Missing Information"]
+    )
+
+    frequency = st.selectbox(
+        "Frequency of Risk", ["Very Common", "Common", "Uncommon", "Rare", "Very Rare"]
+    )
+    severity = st.selectbox(
+        "Severity", ["Mild", "Moderate", "Severe", "Life-threatening"]
+    )
+    outcome = st.text_input("Outcome (e.g., reversible, irreversible, fatal)")
+    mitigation = st.text_area("Risk Minimization Measure (Routine or Additional)")
+
+    # --- Save Button ---
+    if st.button("Save Risk"):
+        st.success("✅ Risk entry recorded in mini-RMP format.")
+        st.markdown(f"""
+### Risk Management Entry
+**Signal Source:** {source_signal}  
+**Identified Risk:** {risk}  
+**Risk Category:** {risk_category}  
+**Frequency:** {frequency}  
+**Severity:** {severity}  
+**Outcome:** {outcome}  
+**Risk Minimization Measures:** {mitigation}
+""")
+
+    st.markdown("""
+#### How Signals Transfer to Risks (GVP Module V)
+1. **Signal Detection:** Identified from safety databases, literature, or clinical trials.  
+2. **Validation:** Evaluated qualitatively and quantitatively to confirm clinical relevance.  
+3. **Risk Identification:** Transformed into an identified, potential, or missing risk in the RMP.  
+4. **Risk Characterization:** Nature, frequency, severity, and outcome of the risk are described.  
+5. **Risk Minimization:** Routine (labeling, guidance) and additional measures (restricted use, monitoring) are planned.  
+6. **Documentation:** Captured in the Risk Management Plan and updated throughout the product lifecycle.
+""")
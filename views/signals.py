@@ -0,0 +1,269 @@
+"""Signal Management page."""
+import io
+
+import streamlit as st
+import pandas as pd
+
+from pvcore.config import data_path
+from pvcore.drugs import get_drug_normalizer
+from pvcore.mgps import STRATA, add_ebgm, mgps
+from pvcore.signal_store import SignalCountStore
+from pvcore.signal_trends import DATE_COLUMN, MAXSPRT_CRITICAL_VALUE, PERIOD_FREQUENCIES, SignalTrends
+from pvcore.signals import contingency_counts, disproportionality, rank_signals
+from pvcore.synthetic import drug_event_reports
+from pvcore.warehouse import get_warehouse
+from views import fragment, section
+
+
+# The demo tables are shared read-only by every session
+@st.cache_resource
+def demo_reports():
+    return drug_event_reports(20000, n_drugs=60, n_events=120, months=24)
+
+
+@st.cache_resource(show_spinner="Computing disproportionality...", max_entries=8)
+def demo_signal_table(ebgm=False, strata=()):
+    if ebgm:
+        return mgps(demo_reports(), strata)
+    return disproportionality(contingency_counts(demo_reports()))
+
+
+@st.cache_resource(show_spinner="Computing signal trends...", max_entries=8)
+def demo_signal_trends(freq, critical_value):
+    return SignalTrends.from_reports(demo_reports(), freq=freq, critical_value=critical_value)
+
+
+def normalized_drugs(reports):
+    # Spellings of one product ("acetaminophen 500mg", "PARACETAMOL TAB") count as that product
+    reports["drug"] = get_drug_normalizer(data_path("drug_dictionary.csv")).canonical(reports["drug"])
+    return reports
+
+
+@st.cache_resource(show_spinner="Computing disproportionality...", max_entries=8)
+def signal_table(report_bytes, normalize=True, ebgm=False, strata=()):
+    columns = ["case_id", "drug", "event"] + [STRATA[name] for name in strata]
+    reports = pd.read_csv(io.BytesIO(report_bytes), dtype=str, usecols=lambda column: column in columns)
+    reports = normalized_drugs(reports) if normalize else reports
+    if ebgm:
+        return mgps(reports, strata)
+    return disproportionality(contingency_counts(reports))
+
+
+@st.cache_resource(show_spinner="Computing signal trends...", max_entries=8)
+def signal_trends(report_bytes, freq, critical_value, normalize=True):
+    """Trends of an uploaded table, or None if it has no DATE_COLUMN."""
+    reports = pd.read_csv(io.BytesIO(report_bytes), dtype=str,
+                          usecols=lambda column: column in ("case_id", "drug", "event", DATE_COLUMN))
+    if DATE_COLUMN not in reports:
+        return None
+    reports = normalized_drugs(reports) if normalize else reports
+    return SignalTrends.from_reports(reports, freq=freq, critical_value=critical_value)
+
+
+def case_warehouse():
+    return get_warehouse(data_path("warehouse"))
+
+
+# Keyed by the warehouse version, so a rebuild is picked up on the next rerun
+@st.cache_resource(show_spinner="Computing disproportionality...", max_entries=8)
+def warehouse_signal_table(version, ebgm=False, strata=()):
+    # Only the columns the statistics need are read; drugs are already dictionary products
+    reports = case_warehouse().read("reports", ["case_id", "drug", "event"] + [STRATA[name] for name in strata])
+    if ebgm:
+        return mgps(reports, strata)
+    return disproportionality(contingency_counts(reports))
+
+
+@st.cache_resource(show_spinner="Computing signal trends...", max_entries=8)
+def warehouse_signal_trends(version, freq, critical_value):
+    reports = case_warehouse().read("reports", ["case_id", "drug", "event", DATE_COLUMN])
+    return SignalTrends.from_reports(reports, freq=freq, critical_value=critical_value)
+
+
+def trend_lines(trend, columns, title):
+    # A plain Vega-Lite spec; st.line_chart builds it through Altair, which costs ~150 ms a chart per rerun
+    st.vega_lite_chart(trend[["period", *columns]].rename(columns=columns), {
+        "title": title,
+        "transform": [{"fold": list(columns.values()), "as": ["statistic", "value"]}],
+        "mark": {"type": "line", "point": True},
+        "encoding": {"x": {"field": "period", "type": "ordinal", "title": None},
+                     "y": {"field": "value", "type": "quantitative", "title": None},
+                     "color": {"field": "statistic", "type": "nominal", "title": None}},
+    }, width="stretch")
+
+
+@fragment
+def trend_chart(trends, pairs, window):
+    choice = st.selectbox("Drug - event pair", range(len(pairs)), key="trend_pair",
+                          format_func=lambda i: f"{pairs['drug'].iloc[i]} - {pairs['event'].iloc[i]}")
+    trend = trends.trend(pairs["drug"].iloc[choice], pairs["event"].iloc[choice], window)
+    if trend.empty:
+        st.info("This pair has no dated reports.")
+        return
+    alerted = trend.loc[trend["alert"], "period"]
+    st.caption(f"First sequential alert: {alerted.iloc[0]}" if len(alerted) else "No sequential alert.")
+    trend_lines(trend, {"prr": "PRR (cumulative)", "prr_lower": "PRR lower 95% (cumulative)",
+                        "rolling_prr": f"PRR (last {window})", "rolling_prr_lower": f"PRR lower 95% (last {window})"},
+                "PRR")
+    trend_lines(trend, {"ic025": "IC025 (cumulative)", "rolling_ic025": f"IC025 (last {window})"}, "IC025")
+    trend_lines(trend, {"reports": "Reports in period", "llr": "MaxSPRT LLR"}, "Reports and MaxSPRT LLR")
+    st.dataframe(trend, hide_index=True)
+
+
+@st.cache_resource
+def signal_store():
+    return SignalCountStore(data_path("signal_counts.db"))
+
+
+# Keyed by the store version, which every apply() and refresh() bumps
+@st.cache_resource(show_spinner="Computing disproportionality...", max_entries=8)
+def store_signal_table(version, ebgm=False):
+    signals = signal_store().stats()
+    return add_ebgm(signals) if ebgm else signals
+
+
+def render():
+    st.header("Signal Detection and Management")
+    url = "https://www.ema.europa.eu/en/documents/scientific-guideline/guideline-good-pharmacovigilance-practices-gvp-module-ix-signal-management-rev-1_en.pdf"
+    st.markdown(f"[📄 Guideline GVP Module IX (PDF)]({url})")
+    st.subheader("Signal Detection Concepts")
+
+    st.markdown("""
+**1. Types of Signal Detection:**
+
+- **Quantitative Signal Detection:**  
+  - Uses statistical methods to identify disproportionality in adverse event reporting.  
+  - Metrics include **Reporting Odds Ratio (ROR)**, **Proportional Reporting Ratio (PRR)**, **Bayesian Confidence Propagation Neural Network (BCPNN)**, and **Empirical Bayes Geometric Mean (EBGM)**.  
+  - Objective: Detect unusual patterns or higher-than-expected reporting of specific adverse events associated with drugs.  
+
+- **Qualitative Signal Detection:**  
+  - Based on expert review of case reports, literature, clinical trial data, and regulatory intelligence.  
+  - Focuses on **clinical relevance, seriousness, biological plausibility**, and temporal association.  
+  - Often used to support or prioritize quantitative findings.
+
+**2. Signal Evaluation Process:**
+
+1. **Detection:**  
+   - Identify potential signals using quantitative metrics or qualitative assessment.  
+
+2. **Validation:**  
+   - Check data quality, case completeness, duplicate reports, and confounding factors.  
+   - Ensure that signal is not due to reporting bias or chance.
+
+3. **Assessment / Analysis:**  
+   - Detailed clinical review by safety experts.  
+   - Consider patient demographics, dose-response relationship, concomitant medications, seriousness of the adverse event.  
+
+4. **Confirmation:**  
+   - Confirm whether the signal is likely to represent a true causal relationship.  
+   - May involve literature review, epidemiological studies, or additional data collection.
+
+**3. Signal Status:**
+
+- **Signal Under Evaluation:**  
+  - Signal has been detected but is still being analyzed and confirmed.  
+
+- **Confirmed Signal:**  
+  - Evidence supports that there is a likely causal relationship between the drug and the adverse event.  
+
+- **Closed / Rejected Signal:**  
+  - Signal investigation shows no causal relationship or insufficient evidence.  
+  - No further regulatory action is typically required, but monitoring continues.
+
+**4. Regulatory Implications:**
+
+- Confirmed signals may lead to:  
+  - Label changes / safety warnings  
+  - Risk minimization measures  
+  - Further clinical studies  
+  - Updates in PSUR/PBRER reports  
+
+- Signals under evaluation are tracked and monitored in safety databases.  
+- Closed signals are documented with rationale and archived.
+""")
+
+    section("Disproportionality Analysis")
+    st.subheader("Disproportionality Analysis")
+    source = st.radio("Data source", ["Uploaded table", "Persisted signal store", "Case warehouse"], horizontal=True)
+    normalize = st.checkbox("Count drugs by drug dictionary product", True)
+    ebgm = st.checkbox("Compute EBGM (MGPS empirical Bayes)", True)
+    if source == "Persisted signal store":
+        store = signal_store()
+        with st.expander("Apply a case batch"):
+            batch_file = st.file_uploader("New or changed cases (CSV with case_id, drug, event columns)", type=["csv"])
+            removed_ids = st.text_area("Nullified or duplicate case IDs (one per line)")
+            if st.button("Update Signal Store"):
+                if batch_file is not None:
+                    batch = pd.read_csv(batch_file, dtype=str, usecols=["case_id", "drug", "event"])
+                    if normalize:
+                        batch = normalized_drugs(batch)
+                else:
+                    batch = pd.DataFrame(columns=["case_id", "drug", "event"])
+                updated = store.apply(batch, removed_case_ids=removed_ids.split())
+                st.success(f"{len(updated)} drug-event pairs recomputed.")
+            if st.button("Refresh All Pairs"):
+                st.success(f"{len(store.refresh())} drug-event pairs recomputed.")
+        st.caption(f"{store.n_reports} cases in the signal store.")
+        signals = store_signal_table(store.version, ebgm)
+    else:
+        strata = ()
+        if ebgm:
+            strata = tuple(st.multiselect(
+                "Stratify EBGM by", list(STRATA),
+                help=f"From the {', '.join(STRATA.values())} columns; cases without one form an Unknown stratum."))
+    if source == "Case warehouse":
+        warehouse = case_warehouse()
+        st.caption("Drug-event reports of the case warehouse (rebuilt on the Aggregate Reports page, or loaded from "
+                   "FAERS extracts with `python -m pvcore faers`), counted by drug dictionary product.")
+        signals = warehouse_signal_table(warehouse.version, ebgm, strata)
+    elif source == "Uploaded table":
+        report_file = st.file_uploader(f"Drug-event report table (CSV with case_id, drug, event columns, "
+                                       f"and {DATE_COLUMN} for trends)", type=["csv"])
+        if report_file is not None:
+            signals = signal_table(report_file.getvalue(), normalize, ebgm, strata)
+        else:
+            st.caption("No report table uploaded; showing synthetic demo data.")
+            signals = demo_signal_table(ebgm, strata)
+
+    rank_by = {
+        "PRR (lower 95% CI)": "prr_lower",
+        "ROR (lower 95% CI)": "ror_lower",
+        "IC025 (BCPNN)": "ic025",
+        "Chi-square": "chi2",
+    }
+    if "eb05" in signals:
+        rank_by["EB05 (MGPS)"] = "eb05"
+        prior = signals.attrs["mgps_prior"]
+        st.caption("MGPS prior: {p:.3f} Gamma({alpha1:.3f}, {beta1:.3f}) + {q:.3f} Gamma({alpha2:.3f}, {beta2:.3f})"
+                   .format(q=1 - prior["p"], **prior))
+    score = st.selectbox("Rank by", list(rank_by))
+    min_cases = st.number_input("Minimum number of cases", 1, 1000, 3)
+
+    df = rank_signals(signals, by=rank_by[score], min_cases=min_cases)
+    df["Signal Status"] = df["signal"].map({True: "Under Evaluation", False: "No Signal"})
+
+# --- Display the DataFrame ---
+    st.dataframe(df.head(1000))
+
+    section("Signal Trends")
+    st.subheader("Signal Trends and Sequential Alerts")
+    trend_cols = st.columns(3)
+    period = trend_cols[0].radio("Period", list(PERIOD_FREQUENCIES), horizontal=True)
+    window = trend_cols[1].number_input("Rolling window (periods)", 1, 24, 4)
+    critical_value = trend_cols[2].number_input("MaxSPRT critical value", 1.0, 20.0, MAXSPRT_CRITICAL_VALUE, 0.5)
+    if source == "Persisted signal store":
+        trends = None
+        st.caption(f"The signal store has no report dates; upload a table with a {DATE_COLUMN} column for trends.")
+    elif source == "Case warehouse":
+        trends = warehouse_signal_trends(warehouse.version, PERIOD_FREQUENCIES[period], critical_value)
+    elif report_file is not None:
+        trends = signal_trends(report_file.getvalue(), PERIOD_FREQUENCIES[period], critical_value, normalize)
+        if trends is None:
+            st.caption(f"The uploaded table has no {DATE_COLUMN} column, so there are no trends.")
+    else:
+        trends = demo_signal_trends(PERIOD_FREQUENCIES[period], critical_value)
+    if trends is not None and not df.empty:
+        trend_chart(trends, df[["drug", "event"]].head(200).astype(str), window)
+        alerts = trends.alerts(window)
+        with st.expander(f"Sequential alerts ({len(alerts)} pairs, most recent first)"):
+            st.dataframe(alerts.head(1000), hide_index=True)